@@ -0,0 +1,64 @@
+import hashlib
+import json
+import marshal
+import os
+from array import array
+
+from compiled_afd import CompiledAFD
+
+# mude ao alterar o formato gravado ou a construção do AFD
+CACHE_VERSION = 1
+
+def cache_dir():
+    return os.environ.get("STARDUST_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "stardust")
+
+def spec_hash(afns):
+    spec = [
+        [name, afn.states, afn.alphabet, afn.start, sorted(afn.finals),
+         sorted([s, c, sorted(t)] for (s, c), t in afn.transitions.items())]
+        for name, afn in afns.items()
+    ]
+    data = json.dumps([CACHE_VERSION, spec], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def _path(key):
+    return os.path.join(cache_dir(), f"afd-{key}.bin")
+
+def _pack(afd):
+    return (afd.table.tobytes(), afd.num_states, afd.num_classes,
+            afd.class_of, afd.kinds, afd.finals)
+
+def _unpack(data):
+    table_bytes, num_states, num_classes, class_of, kinds, finals = data
+    table = array('i')
+    table.frombytes(table_bytes)
+    return CompiledAFD(table, num_states, num_classes, class_of, kinds, finals)
+
+def load(key):
+    try:
+        with open(_path(key), "rb") as f:
+            return _unpack(marshal.load(f))
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+def store(key, afd):
+    # grava num temporário e renomeia: leitores concorrentes nunca veem arquivo parcial
+    path = _path(key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(_pack(afd), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def load_or_build(afns, build):
+    """AFD compilado de `afns`, lido do cache ou construído por build(afns) e gravado."""
+    key = spec_hash(afns)
+    afd = load(key)
+    if afd is None:
+        afd = build(afns)
+        store(key, afd)
+    return afd
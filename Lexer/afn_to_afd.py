@@ -1,12 +1,15 @@
 from collections import defaultdict
+from compiled_afd import compile_afd
 
 class AFN:
-    def __init__(self, states, alphabet, transitions, start, finals):
+    def __init__(self, states, alphabet, transitions, start, finals, tags=None):
         self.states = states
         self.alphabet = alphabet
         self.transitions = transitions
         self.start = start
         self.finals = finals
+        # tags: estado final -> (prioridade, tipo de token); menor prioridade vence
+        self.tags = tags or {}
 
 def epsilon_closure(states, transitions):
     stack = list(states)
@@ -25,12 +28,41 @@ def move(states, symbol, transitions):
         result.update(transitions.get((state, symbol), []))
     return result
 
-def afn_to_afd(afn):
+def combine_afns(afns, start="S"):
+    """
+    Une os AFNs de `afns` (nome -> AFN) sob um novo estado inicial ligado por
+    transições-epsilon ao início de cada um. A ordem do dicionário define a
+    prioridade dos tipos de token em caso de empate no tamanho do lexema.
+    """
+    states = [start]
+    alphabet = []
+    transitions = {(start, ""): set()}
+    tags = {}
+    for priority, (name, afn) in enumerate(afns.items()):
+        prefix = name + ":"
+        symbols = set(afn.alphabet)
+        states.extend(prefix + s for s in afn.states)
+        for c in afn.alphabet:
+            if c not in alphabet:
+                alphabet.append(c)
+        for (state, symbol), targets in afn.transitions.items():
+            # afn_to_afd só segue símbolos do alfabeto do próprio AFN
+            if symbol != "" and symbol not in symbols:
+                continue
+            key = (prefix + state, symbol)
+            transitions.setdefault(key, set()).update(prefix + t for t in targets)
+        transitions[(start, "")].add(prefix + afn.start)
+        for f in afn.finals:
+            tags[prefix + f] = (priority, name)
+    return AFN(states, alphabet, transitions, start, set(tags), tags)
+
+def afn_to_afd(afn, compiled=False):
     start_closure = frozenset(epsilon_closure([afn.start], afn.transitions))
     unmarked = [start_closure]
     d_states = {start_closure: 'D0'}
     d_transitions = {}
     d_finals = set()
+    d_tokens = {}
     count = 1
 
     while unmarked:
@@ -48,10 +80,17 @@ def afn_to_afd(afn):
             d_transitions[(d_states[current], symbol)] = d_states[target]
         if any(s in afn.finals for s in current):
             d_finals.add(d_states[current])
+            tagged = [afn.tags[s] for s in current if s in afn.tags]
+            if tagged:
+                d_tokens[d_states[current]] = min(tagged)[1]
 
-    return {
+    afd = {
         "states": list(d_states.values()),
         "start": 'D0',
         "finals": list(d_finals),
-        "transitions": d_transitions
+        "transitions": d_transitions,
+        "tokens": d_tokens
     }
+    if compiled:
+        return compile_afd(afd)
+    return afd
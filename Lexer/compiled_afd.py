@@ -0,0 +1,148 @@
+from array import array
+
+class _ClassTable(dict):
+    # caracteres fora do alfabeto caem na classe 0 (sem transições)
+    def __missing__(self, code):
+        return "\x00"
+
+class CompiledAFD:
+    """
+    AFD minimizado com estados numerados 0..N-1 (0 é o inicial, -1 o estado morto)
+    e caracteres agrupados em classes de equivalência. A tabela de transições é
+    densa: table[state * num_classes + char_class].
+    """
+    def __init__(self, table, num_states, num_classes, class_of, kinds, finals):
+        self.table = table
+        self.num_states = num_states
+        self.num_classes = num_classes
+        self.class_of = class_of
+        self.kinds = kinds
+        self.finals = finals
+        self.start = 0
+        self._translation = _ClassTable({ord(c): chr(k) for c, k in class_of.items()})
+
+    def classify(self, text):
+        # uma única passada em C convertendo o texto em bytes de classes
+        return text.translate(self._translation).encode("latin-1")
+
+    def match(self, text, i, classes=None):
+        """Maior prefixo aceito a partir de i: (tipo, tamanho); tamanho 0 se nenhum."""
+        table, nc, finals = self.table, self.num_classes, self.finals
+        class_of = self.class_of
+        state = self.start
+        kind = None
+        end = i
+        j = i
+        n = len(text)
+        while j < n:
+            c = classes[j] if classes is not None else class_of.get(text[j], 0)
+            state = table[state * nc + c]
+            if state < 0:
+                break
+            j += 1
+            if finals[state]:
+                kind, end = self.kinds[state], j
+        return kind, end - i
+
+def _minimize(n, num_symbols, delta, labels):
+    # Hopcroft: refina a partição inicial (por rótulo) até estabilizar
+    inverse = [[[] for _ in range(n)] for _ in range(num_symbols)]
+    for s in range(n):
+        for a in range(num_symbols):
+            inverse[a][delta[s][a]].append(s)
+
+    groups = {}
+    for s in range(n):
+        groups.setdefault(labels[s], set()).add(s)
+    partition = list(groups.values())
+    work = [set(b) for b in partition]
+
+    while work:
+        splitter = work.pop()
+        for a in range(num_symbols):
+            x = set()
+            for t in splitter:
+                x.update(inverse[a][t])
+            if not x:
+                continue
+            refined = []
+            for block in partition:
+                inter = block & x
+                if not inter or len(inter) == len(block):
+                    refined.append(block)
+                    continue
+                rest = block - inter
+                refined.append(inter)
+                refined.append(rest)
+                if block in work:
+                    work.remove(block)
+                    work.append(inter)
+                    work.append(rest)
+                else:
+                    work.append(inter if len(inter) <= len(rest) else rest)
+            partition = refined
+    return partition
+
+def compile_afd(afd, token_map=None):
+    """
+    Converte o AFD em dicionário retornado por afn_to_afd na forma compacta.
+    O tipo de cada estado final vem de afd["tokens"] ou, na falta, de token_map.
+    """
+    if isinstance(afd, CompiledAFD):
+        return afd
+    token_map = token_map or afd.get("tokens", {})
+    finals = set(afd["finals"])
+    transitions = afd["transitions"]
+
+    names = [afd["start"]] + [s for s in afd["states"] if s != afd["start"]]
+    dead = len(names)
+    index = {name: i for i, name in enumerate(names)}
+    chars = sorted({c for (_, c) in transitions})
+    char_index = {c: i for i, c in enumerate(chars)}
+
+    n = dead + 1
+    delta = [[dead] * len(chars) for _ in range(n)]
+    for (state, c), target in transitions.items():
+        delta[index[state]][char_index[c]] = index[target]
+    labels = [(name in finals, token_map.get(name)) for name in names]
+    labels.append((False, None))
+
+    # estados equivalentes viram um só; o bloco do estado morto vira -1
+    blocks = _minimize(n, len(chars), delta, labels)
+    block_of = [0] * n
+    for b, block in enumerate(blocks):
+        for s in block:
+            block_of[s] = b
+    order = [block_of[0]] + [b for b in range(len(blocks))
+                             if b != block_of[0] and b != block_of[dead]]
+    number = {b: i for i, b in enumerate(order)}
+    number[block_of[dead]] = -1
+    reps = [min(blocks[b]) for b in order]
+
+    # caracteres com a mesma coluna de destinos formam uma classe (0 = nenhuma transição)
+    columns = {}
+    class_of = {}
+    for c in chars:
+        a = char_index[c]
+        column = tuple(number[block_of[delta[r][a]]] for r in reps)
+        if all(t == -1 for t in column):
+            continue
+        class_of[c] = columns.setdefault(column, len(columns) + 1)
+    num_classes = len(columns) + 1
+    if num_classes > 256:
+        raise ValueError("AFD com mais de 256 classes de caracteres")
+
+    num_states = len(reps)
+    table = array('i', [-1]) * (num_states * num_classes)
+    for column, k in columns.items():
+        for state, target in enumerate(column):
+            table[state * num_classes + k] = target
+
+    return CompiledAFD(
+        table=table,
+        num_states=num_states,
+        num_classes=num_classes,
+        class_of=class_of,
+        kinds=[labels[r][1] for r in reps],
+        finals=[labels[r][0] for r in reps],
+    )
@@ -1,31 +1,35 @@
 from afn_to_afd import AFN, afn_to_afd
+from compiled_afd import compile_afd
 
 class Lexer:
     def __init__(self, afd, token_map):
-        self.afd = afd
+        # aceita tanto o dicionário de afn_to_afd quanto um CompiledAFD
+        self.afd = compile_afd(afd, token_map)
         self.token_map = token_map
 
     def tokenize(self, text):
+        afd = self.afd
+        table, nc = afd.table, afd.num_classes
+        finals, kinds = afd.finals, afd.kinds
+        classes = afd.classify(text)
+        n = len(classes)
         tokens = []
         i = 0
-        while i < len(text):
-            state = self.afd['start']
+        while i < n:
+            state = afd.start
             j = i
             last_final = None
             last_final_pos = i
-            while j < len(text):
-                symbol = text[j]
-                key = (state, symbol)
-                if key in self.afd['transitions']:
-                    state = self.afd['transitions'][key]
-                    if state in self.afd['finals']:
-                        last_final = state
-                        last_final_pos = j + 1
-                    j += 1
-                else:
+            while j < n:
+                state = table[state * nc + classes[j]]
+                if state < 0:
                     break
-            if last_final:
-                token_type = self.token_map.get(last_final, "UNKNOWN")
+                j += 1
+                if finals[state]:
+                    last_final = state
+                    last_final_pos = j
+            if last_final is not None:
+                token_type = kinds[last_final] or "UNKNOWN"
                 token_value = text[i:last_final_pos]
                 tokens.append((token_type, token_value))
                 i = last_final_pos
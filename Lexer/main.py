@@ -1,8 +1,14 @@
+import codecs
+import os
 
-from afn_to_afd import afn_to_afd
+from afn_to_afd import afn_to_afd, combine_afns
+from compiled_afd import CompiledAFD
 from afns_definicao import AFNS
+import afd_cache
 
 def simulate_afd(afd, text, i):
+    if isinstance(afd, CompiledAFD):
+        return afd.match(text, i)[1]
     state = afd["start"]
     j = i
     last_final_pos = -1
@@ -20,29 +26,87 @@ def simulate_afd(afd, text, i):
             break
     return last_final_pos - i if last_final_pos != -1 else 0
 
-def tokenize(text):
-    # Precompute AFDs
-    afd_map = {name: afn_to_afd(afn) for name, afn in AFNS.items()}
-    tokens = []
+_lexer_afd = None
+
+def build_lexer_afd(afns=AFNS):
+    # um único AFD para todos os tokens; cada estado final carrega seu tipo
+    return afn_to_afd(combine_afns(afns), compiled=True)
+
+def lexer_afd():
+    global _lexer_afd
+    if _lexer_afd is None:
+        _lexer_afd = afd_cache.load_or_build(AFNS, build_lexer_afd)
+    return _lexer_afd
+
+# tamanho de leitura do iter_tokens
+CHUNK_SIZE = 1 << 16
+
+def _scan(text, afd, final):
+    """
+    Gera os tokens de text. Com final=False para no primeiro token que chega
+    ao fim do texto ainda vivo no AFD (string, comentário ou identificador
+    cortados) e retorna o offset a partir do qual o texto deve ser reprocessado.
+    """
+    table, nc, kinds = afd.table, afd.num_classes, afd.kinds
+    classes = afd.classify(text)
+    n = len(text)
     i = 0
-    while i < len(text):
+    while i < n:
         if text[i].isspace():
             i += 1
             continue
-        best = (None, 0)
-        for name, afd in afd_map.items():
-            l = simulate_afd(afd, text, i)
-            if l > best[1]:
-                best = (name, l)
-        if best[1] > 0:
-            lex = text[i:i+best[1]]
-            if best[0] != "COMENT":  # skip comments
-                tokens.append((best[0], lex))
-            i += best[1]
+        # maximal munch: avança enquanto houver transição, lembrando o último final
+        state = afd.start
+        j = i
+        kind, end = None, i
+        while j < n:
+            state = table[state * nc + classes[j]]
+            if state < 0:
+                break
+            j += 1
+            if kinds[state] is not None:
+                kind, end = kinds[state], j
+        if j == n and state >= 0 and not final:
+            return i
+        if kind is not None:
+            if kind != "COMENT":  # skip comments
+                yield (kind, text[i:end])
+            i = end
         else:
-            tokens.append(("UNKNOWN", text[i]))
+            yield ("UNKNOWN", text[i])
             i += 1
-    return tokens
+    return n
+
+def tokenize(text, afd=None):
+    return list(_scan(text, afd or lexer_afd(), True))
+
+def _read_chunks(f, chunk_size):
+    decoder = None
+    while True:
+        raw = f.read(chunk_size)
+        if isinstance(raw, bytes):
+            decoder = decoder or codecs.getincrementaldecoder("utf-8")()
+            yield decoder.decode(raw, final=not raw), not raw
+        else:
+            yield raw, not raw
+        if not raw:
+            return
+
+def iter_tokens(source, chunk_size=CHUNK_SIZE, afd=None):
+    """
+    Versão incremental de tokenize: lê source (caminho ou arquivo aberto) em
+    blocos e gera os tokens sob demanda, guardando só o trecho pendente.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            yield from iter_tokens(f, chunk_size, afd)
+        return
+    afd = afd or lexer_afd()
+    buf = ""
+    for chunk, final in _read_chunks(source, chunk_size):
+        buf += chunk
+        rest = yield from _scan(buf, afd, final)
+        buf = buf[rest:]
 
 if __name__ == "__main__":
     sample = 'var x = 42; // exemplo\\nfunc f() { return x; }'
@@ -1,15 +1,15 @@
 from dataclasses import dataclass
 from typing import List, Optional, Any
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode:
     linha: int
 
-@dataclass
+@dataclass(slots=True)
 class ProgramaNode(ASTNode):
     declaracoes: List[Any]
 
-@dataclass
+@dataclass(slots=True)
 class DeclaracaoFuncaoNode(ASTNode):
     nome: str
     parametros: List[str]
@@ -21,18 +21,18 @@ class DeclaracaoFuncaoNode(ASTNode):
         self.corpo = corpo
         self.linha = linha
 
-@dataclass
+@dataclass(slots=True)
 class IdentificadorNode(ASTNode):
     nome: str
     linha: int
 
-@dataclass
+@dataclass(slots=True)
 class LiteralNode(ASTNode):
     valor: Any
     tipo: str
     linha: int
 
-@dataclass
+@dataclass(slots=True)
 class AtribuicaoNode(ASTNode):
     nome: str
     valor: Any
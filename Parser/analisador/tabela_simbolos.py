@@ -1,6 +1,18 @@
-from typing import Optional, Dict, List, Any
+import os
+import sys
+from typing import Iterator, Optional
 from dataclasses import dataclass
 
+try:  # importado a partir da raiz do repositório
+    from Parser.stardust_ll1.scopes import ScopedTable
+except ImportError:
+    # imports planos, de dentro de Parser/analisador (como analisador_semantico
+    # faz) ou de Parser/: a pasta Parser/ precisa estar no sys.path
+    _parser_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _parser_dir not in sys.path:
+        sys.path.insert(0, _parser_dir)
+    from stardust_ll1.scopes import ScopedTable
+
 @dataclass
 class Simbolo:
     nome: str
@@ -11,33 +23,27 @@ class Simbolo:
 
 class TabelaSimbolos:
     def __init__(self):
-        self._pilha: List[Dict[str, Simbolo]] = [{}]
+        self._tabela = ScopedTable()
 
     def entrar_escopo(self):
-        self._pilha.append({})
+        self._tabela.push_scope()
 
     def sair_escopo(self):
-        if len(self._pilha) > 1:
-            self._pilha.pop()
+        if self._tabela.depth > 0:
+            self._tabela.pop_scope()
 
     def declarar(self, nome: str, tipo: str, linha: int, categoria="variavel", inicializado=False) -> bool:
-        atual = self._pilha[-1]
-        if nome in atual:
+        if self._tabela.lookup_current(nome) is not None:
             return False
-        atual[nome] = Simbolo(nome, tipo, linha, categoria, inicializado)
+        self._tabela.bind(nome, Simbolo(nome, tipo, linha, categoria, inicializado))
         return True
 
     def buscar(self, nome: str) -> Optional[Simbolo]:
-        for escopo in reversed(self._pilha):
-            if nome in escopo:
-                return escopo[nome]
-        return None
+        return self._tabela.lookup(nome)
 
     def buscar_no_escopo_atual(self, nome: str) -> Optional[Simbolo]:
-        return self._pilha[-1].get(nome)
+        return self._tabela.lookup_current(nome)
 
-    def obter_todos_simbolos(self) -> List[Simbolo]:
-        res = []
-        for esc in self._pilha:
-            res.extend(list(esc.values()))
-        return res
+    def obter_todos_simbolos(self) -> Iterator[Simbolo]:
+        # gerador: percorre os escopos abertos sob demanda, do global ao atual
+        return self._tabela.values()
@@ -1,12 +1,12 @@
 from dataclasses import dataclass
 from typing import List
 
-@dataclass
+@dataclass(slots=True)
 class Tipo:
     def mostrar(self) -> str:
         return "tipo"
 
-@dataclass
+@dataclass(slots=True)
 class TipoPrimitivo(Tipo):
     nome: str
     def mostrar(self) -> str:
@@ -14,13 +14,13 @@ class TipoPrimitivo(Tipo):
     def igual(self, other) -> bool:
         return isinstance(other, TipoPrimitivo) and self.nome == other.nome
 
-@dataclass
+@dataclass(slots=True)
 class TipoLista(Tipo):
     elemento: Tipo
     def mostrar(self) -> str:
         return f"lista<{self.elemento.mostrar()}>"
 
-@dataclass
+@dataclass(slots=True)
 class TipoFuncao(Tipo):
     parametros: List[Tipo]
     retorno: Tipo
@@ -1,4 +1,8 @@
-from .lexer import tokenize, Token
+from .lexer import tokenize, tokenize_buffer, iter_tokens, Token, TokenBuffer, TokenView
 from .parser_table import LL1Parser, ParseError
+from .incremental import CompilationSession
 
-__all__ = ["tokenize", "Token", "LL1Parser", "ParseError"]
+__all__ = [
+    "tokenize", "tokenize_buffer", "iter_tokens", "Token", "TokenBuffer", "TokenView",
+    "LL1Parser", "ParseError", "CompilationSession",
+]
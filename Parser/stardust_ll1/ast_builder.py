@@ -0,0 +1,135 @@
+"""
+Ações semânticas do driver LL(1): cada produção, ao ser reduzida, recebe a
+lista de valores dos seus filhos (tokens para terminais, o resultado da ação
+para não-terminais) e devolve o nó de ast_nodes correspondente.
+
+As listas de cauda recursiva (FunctionDeclList, StatementList, AddExprPrime,
+...) são montadas de dentro para fora, então cada cauda devolve seus itens em
+ordem inversa com append O(1) e quem a consome inverte uma única vez.
+"""
+from typing import Callable, Dict, List, Tuple
+
+from .ast_nodes import (
+    Program, Parameter, FunctionDecl, Block, ReturnStatement, ExpressionStatement,
+    Assignment, ElsifClause, IfStatement, WhileStatement, ForStatement,
+    BinaryExpr, UnaryExpr, Literal, Identifier,
+)
+
+Action = Callable[[list], object]
+
+
+def _reversed(items: list) -> list:
+    items.reverse()
+    return items
+
+
+def _prepend(item, rest: list) -> list:
+    # rest está invertida: acrescentar no fim é pôr na frente
+    if item is not None:
+        rest.append(item)
+    return rest
+
+
+def _fold_left(left, tail: list):
+    # tail: pares (operador, operando) em ordem inversa
+    for op, right in reversed(tail):
+        left = BinaryExpr(left.line, left.column, left, op, right)
+    return left
+
+
+def _statement_ident(v):
+    tok, expr = v[0], v[1]
+    if expr is None:
+        return ExpressionStatement(tok.line, tok.column, Identifier(tok.line, tok.column, tok.value, tok.symbol))
+    return Assignment(tok.line, tok.column, tok.value, expr, tok.symbol)
+
+
+def _expression(v):
+    left, rel = v[0], v[1]
+    if rel is None:
+        return left
+    op, right = rel
+    return BinaryExpr(left.line, left.column, left, op, right)
+
+
+ACTIONS: Dict[Tuple[str, str], Action] = {
+    # chave: (não-terminal, primeiro símbolo da produção ou "ε")
+    ("Program", "FunctionDeclList"): lambda v: Program(1, 1, _reversed(v[0])),
+
+    ("FunctionDeclList", "FunctionDecl"): lambda v: _prepend(v[0], v[1]),
+    ("FunctionDeclList", "ε"): lambda v: [],
+    ("FunctionDecl", "function"): lambda v: FunctionDecl(v[0].line, v[0].column, v[1].value, v[3], v[5], v[1].symbol),
+    ("ParameterListOpt", "ParameterList"): lambda v: v[0],
+    ("ParameterListOpt", "ε"): lambda v: [],
+    ("ParameterList", "IDENT"): lambda v: _reversed(_prepend(Parameter(v[0].line, v[0].column, v[0].value, v[0].symbol), v[1])),
+    ("ParameterListTail", ","): lambda v: _prepend(Parameter(v[1].line, v[1].column, v[1].value, v[1].symbol), v[2]),
+    ("ParameterListTail", "ε"): lambda v: [],
+
+    ("Block", "{"): lambda v: _reversed(v[1]),
+    ("StatementList", "Statement"): lambda v: _prepend(v[0], v[1]),
+    ("StatementList", "ε"): lambda v: [],
+
+    ("Statement", "IDENT"): _statement_ident,
+    ("Statement", "if"): lambda v: IfStatement(v[0].line, v[0].column, v[2], v[4], _reversed(v[5]), v[6]),
+    ("Statement", "while"): lambda v: WhileStatement(v[0].line, v[0].column, v[2], v[4]),
+    ("Statement", "for"): lambda v: ForStatement(v[0].line, v[0].column, v[2], v[4], v[6], v[8]),
+    ("Statement", "return"): lambda v: ReturnStatement(v[0].line, v[0].column, v[1]),
+    ("Statement", "{"): lambda v: Block(v[0].line, v[0].column, _reversed(v[1])),
+    ("Statement", ";"): lambda v: None,
+
+    ("StatementPrime", "="): lambda v: v[1],
+    ("StatementPrime", "ExpressionRest"): lambda v: None,
+
+    ("ElsifPart", "elsif"): lambda v: _prepend(ElsifClause(v[0].line, v[0].column, v[2], v[4]), v[5]),
+    ("ElsifPart", "ε"): lambda v: [],
+    ("ElsePart", "else"): lambda v: v[1],
+    ("ElsePart", "ε"): lambda v: None,
+    ("ExpressionOpt", "Expression"): lambda v: v[0],
+    ("ExpressionOpt", "ε"): lambda v: None,
+
+    ("Expression", "AddExpr"): _expression,
+    ("ExpressionRel", "RelationalOperator"): lambda v: (v[0], v[1]),
+    ("ExpressionRel", "ε"): lambda v: None,
+
+    ("AddExpr", "TermExpression"): lambda v: _fold_left(v[0], v[1]),
+    ("AddExprPrime", "AdditiveOperator"): lambda v: _prepend((v[0], v[1]), v[2]),
+    ("AddExprPrime", "ε"): lambda v: [],
+    ("TermExpression", "FactorExpression"): lambda v: _fold_left(v[0], v[1]),
+    ("TermTail", "MultiplicativeOperator"): lambda v: _prepend((v[0], v[1]), v[2]),
+    ("TermTail", "ε"): lambda v: [],
+
+    ("FactorExpression", "IDENT"): lambda v: Identifier(v[0].line, v[0].column, v[0].value, v[0].symbol),
+    ("FactorExpression", "NumberLiteral"): lambda v: v[0],
+    ("FactorExpression", "StringLiteral"): lambda v: v[0],
+    ("FactorExpression", "true"): lambda v: Literal(v[0].line, v[0].column, True),
+    ("FactorExpression", "false"): lambda v: Literal(v[0].line, v[0].column, False),
+    ("FactorExpression", "null"): lambda v: Literal(v[0].line, v[0].column, None),
+    ("FactorExpression", "("): lambda v: v[1],
+    ("FactorExpression", "-"): lambda v: UnaryExpr(v[0].line, v[0].column, "-", v[1]),
+
+    ("NumberLiteral", "INT"): lambda v: Literal(v[0].line, v[0].column, int(v[0].value)),
+    ("NumberLiteral", "FLOAT"): lambda v: Literal(v[0].line, v[0].column, float(v[0].value)),
+    ("StringLiteral", "STRING"): lambda v: Literal(v[0].line, v[0].column, v[0].value[1:-1]),
+}
+
+
+def _operator(v):
+    return v[0].value
+
+
+for _A, _ops in (
+    ("AdditiveOperator", ("+", "-", "and", "or")),
+    ("MultiplicativeOperator", ("*", "/", "//", "%")),
+    ("RelationalOperator", ("==", "!=", ">", ">=", "<", "<=")),
+):
+    for _op in _ops:
+        ACTIONS[(_A, _op)] = _operator
+
+
+def build_actions(compiled) -> List[Action]:
+    """Ação de cada produção de `compiled` (CompiledTable), por índice de produção."""
+    actions = []
+    for A, rhs in compiled.productions:
+        key = (compiled.nonterminals[A], compiled.symbol_name(rhs[0]) if rhs else "ε")
+        actions.append(ACTIONS[key])
+    return actions
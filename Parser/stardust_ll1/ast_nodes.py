@@ -1,90 +1,139 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Any
 
+from .lexer import INTERNER
+
 
 # ====== BASE ======
-@dataclass
+@dataclass(slots=True)
 class ASTNode:
     line: int
     column: int
 
 
+class Named:
+    """
+    Nós com nome: symbol é o ID do nome no INTERNER, usado como chave nas
+    tabelas de símbolos. O parser já o passa pronto; se omitido, é internado aqui.
+    O ID depende do histórico do INTERNER no processo, então fica fora do
+    __eq__ e do __repr__: a mesma AST montada em outro processo é igual.
+    """
+    __slots__ = ()
+
+    def __post_init__(self):
+        if self.symbol < 0:
+            self.symbol = INTERNER.intern(self.name)
+
+
 # ====== PROGRAMA ======
-@dataclass
+@dataclass(slots=True)
 class Program(ASTNode):
     functions: List["FunctionDecl"]
 
 
 # ====== FUNÇÕES ======
-@dataclass
-class Parameter(ASTNode):
+@dataclass(slots=True)
+class Parameter(ASTNode, Named):
     name: str
+    symbol: int = field(default=-1, compare=False, repr=False)
 
 
-@dataclass
-class FunctionDecl(ASTNode):
+@dataclass(slots=True)
+class FunctionDecl(ASTNode, Named):
     name: str
     params: List[Parameter]
     body: List["Statement"]
+    symbol: int = field(default=-1, compare=False, repr=False)
 
 
 # ====== STATEMENTS ======
 
 class Statement(ASTNode):
-    pass
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Statement):
     statements: List[Statement]
 
 
-@dataclass
+@dataclass(slots=True)
 class ReturnStatement(Statement):
     expression: Optional["Expression"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ExpressionStatement(Statement):
     expression: "Expression"
 
 
-@dataclass
-class Assignment(Statement):
+@dataclass(slots=True)
+class Assignment(Statement, Named):
     name: str
     expression: "Expression"
+    symbol: int = field(default=-1, compare=False, repr=False)
+
+
+@dataclass(slots=True)
+class ElsifClause(ASTNode):
+    condition: "Expression"
+    body: List[Statement]
+
+
+@dataclass(slots=True)
+class IfStatement(Statement):
+    condition: "Expression"
+    then_body: List[Statement]
+    elsifs: List[ElsifClause]
+    else_body: Optional[List[Statement]]
+
+
+@dataclass(slots=True)
+class WhileStatement(Statement):
+    condition: "Expression"
+    body: List[Statement]
+
+
+@dataclass(slots=True)
+class ForStatement(Statement):
+    init: Optional["Expression"]
+    condition: Optional["Expression"]
+    update: Optional["Expression"]
+    body: List[Statement]
 
 
 # ====== EXPRESSÕES ======
 
 class Expression(ASTNode):
-    pass
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryExpr(Expression):
     left: Expression
     op: str
     right: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryExpr(Expression):
     op: str
     right: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expression):
     value: Any
 
 
-@dataclass
-class Identifier(Expression):
+@dataclass(slots=True)
+class Identifier(Expression, Named):
     name: str
+    symbol: int = field(default=-1, compare=False, repr=False)
 
 
-@dataclass
-class FunctionCall(Expression):
+@dataclass(slots=True)
+class FunctionCall(Expression, Named):
     name: str
     args: List[Expression]
+    symbol: int = field(default=-1, compare=False, repr=False)
@@ -0,0 +1,356 @@
+"""
+Otimizações sobre a AST, entre o SemanticAnalyzer e o codegen, para que o IR
+já chegue pequeno ao Otimizador (e builds com pouca otimização do LLVM ainda
+saiam razoáveis):
+
+- dobra de constantes: 2 * 3 + 1 vira 7, "a" + "b" vira "ab", 1 < 2 vira true;
+  constantes seguidas numa cadeia inteira (x + 1 + 2) são reunidas (x + 3);
+- remoção de identidades: x + 0, x - 0, x * 1, x / 1 e x * 0 (inteiros);
+- redução de força: x * 2 vira x + x, x * 2^k vira x << k (inteiros) e
+  x / 2^k vira x * 2^-k (reais, exato);
+- eliminação de ramos mortos: if/elsif/while com condição constante true ou
+  false, e comandos depois de um return.
+
+As regras que dependem de tipo só se aplicam quando os tipos vindos do
+SemanticAnalyzer (local_types) são concretos; com uma TypeVar (ex.: um
+parâmetro não usado com tipo fixo) só as dobras entre literais valem. Nenhuma
+expressão da linguagem tem efeito colateral, então descartar operandos é seguro.
+
+Os inteiros são dobrados como i32 (com o estouro de complemento de dois e a
+divisão truncada do codegen); divisões por zero ficam para o programa.
+
+A AST é modificada no lugar.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .ast_nodes import (
+    Program, FunctionDecl, Block, ReturnStatement, ExpressionStatement, Assignment,
+    IfStatement, WhileStatement, ForStatement, Expression, BinaryExpr, UnaryExpr,
+    Literal, Identifier, Statement,
+)
+from .semantic import (
+    SemanticAnalyzer, Type, INT, FLOAT, STRING, BOOL, RELATIONAL_OPS, resolve,
+)
+from . import instrumentation
+
+_I32_MIN = -(1 << 31)
+
+# operador interno criado pela redução de força (não existe na gramática)
+SHIFT_LEFT = "<<"
+
+
+def _wrap32(n: int) -> int:
+    return (n - _I32_MIN) % (1 << 32) + _I32_MIN
+
+
+def _literal_type(value) -> Optional[Type]:
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, int):
+        return INT
+    if isinstance(value, float):
+        return FLOAT
+    if isinstance(value, str):
+        return STRING
+    return None
+
+
+def _is_number(t: Optional[Type]) -> bool:
+    return t is INT or t is FLOAT
+
+
+def _power_of_two(n) -> int:
+    """k se n == 2**k (k >= 1), senão 0."""
+    if isinstance(n, bool) or not isinstance(n, int) or n < 2 or n & (n - 1):
+        return 0
+    return n.bit_length() - 1
+
+
+def _power_of_two_float(x: float) -> bool:
+    return x > 0 and math.frexp(x)[0] == 0.5
+
+
+def _fold(op: str, a, b):
+    """Valor de a op b entre literais, ou None se não der para dobrar com segurança."""
+    ta, tb = _literal_type(a), _literal_type(b)
+    if op in RELATIONAL_OPS:
+        if ta is tb or (_is_number(ta) and _is_number(tb)):
+            if op == "==":
+                return a == b
+            if op == "!=":
+                return a != b
+            if ta is not STRING and ta is not BOOL:
+                return {"<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b}[op]
+        return None
+    if op in ("and", "or"):
+        if ta is BOOL and tb is BOOL:
+            return (a and b) if op == "and" else (a or b)
+        return None
+    if ta is STRING and tb is STRING:
+        return a + b if op == "+" else None
+    if not (_is_number(ta) and _is_number(tb)):
+        return None
+    if ta is INT and tb is INT:
+        if op == "+":
+            return _wrap32(a + b)
+        if op == "-":
+            return _wrap32(a - b)
+        if op == "*":
+            return _wrap32(a * b)
+        if op == "/" and b != 0:
+            q = abs(a) // abs(b)
+            return _wrap32(q if (a < 0) == (b < 0) else -q)
+        return None
+    a, b = float(a), float(b)
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op == "/" and b != 0.0:
+        return a / b
+    return None
+
+
+class ASTOptimizer:
+    def __init__(self, analyzer: Optional[SemanticAnalyzer] = None):
+        # sem analyzer (ou para funções que ele não viu) só as regras sem tipo se aplicam
+        self.analyzer = analyzer
+        self._types: Dict[int, Type] = {}
+        self.folded = 0
+        self.removed = 0
+        self._statement_handlers = {
+            cls: getattr(self, "_opt_" + cls.__name__)
+            for cls in (Assignment, ExpressionStatement, ReturnStatement, Block,
+                        IfStatement, WhileStatement, ForStatement)
+        }
+
+    def optimize(self, program: Program) -> Program:
+        with instrumentation.phase("ast_optimizer"):
+            folded, removed = self.folded, self.removed
+            for func in program.functions:
+                self.optimize_function(func)
+            instrumentation.count("ast_optimizer.folded", self.folded - folded)
+            instrumentation.count("ast_optimizer.removed", self.removed - removed)
+        return program
+
+    def optimize_function(self, func: FunctionDecl):
+        self._types = self.analyzer.local_types(func) if self.analyzer is not None else {}
+        func.body = self._body(func.body)
+
+    # ---------- comandos ----------
+
+    def _body(self, statements: List[Statement]) -> List[Statement]:
+        out: List[Statement] = []
+        handlers = self._statement_handlers
+        for k, st in enumerate(statements):
+            st = handlers[type(st)](st)
+            if st is None:
+                continue
+            out.append(st)
+            if isinstance(st, ReturnStatement):
+                # o resto do bloco é inalcançável
+                self.removed += len(statements) - k - 1
+                break
+        return out
+
+    def _opt_Assignment(self, node: Assignment):
+        node.expression = self._expression(node.expression)[0]
+        return node
+
+    def _opt_ExpressionStatement(self, node: ExpressionStatement):
+        node.expression = self._expression(node.expression)[0]
+        return node
+
+    def _opt_ReturnStatement(self, node: ReturnStatement):
+        if node.expression is not None:
+            node.expression = self._expression(node.expression)[0]
+        return node
+
+    def _opt_Block(self, node: Block):
+        node.statements = self._body(node.statements)
+        return node
+
+    def _opt_IfStatement(self, node: IfStatement):
+        # if e elsifs formam uma lista só de (condição, corpo); ramos com
+        # condição false somem, e o primeiro com true vira o else
+        branches: List[Tuple[Expression, List[Statement], object]] = []
+        else_body = node.else_body
+        sources = [node] + node.elsifs
+        for k, source in enumerate(sources):
+            cond = self._expression(source.condition)[0]
+            if isinstance(cond, Literal) and cond.value is False:
+                self.removed += 1
+                continue
+            body = source.then_body if source is node else source.body
+            if isinstance(cond, Literal) and cond.value is True:
+                # os ramos seguintes e o else antigo nunca rodam
+                self.removed += len(sources) - k - 1 + (node.else_body is not None)
+                else_body = body
+                break
+            branches.append((cond, body, source))
+        if else_body is not None:
+            else_body = self._body(else_body)
+
+        if not branches:
+            if not else_body:
+                return None
+            return Block(node.line, node.column, else_body)
+        first_cond, first_body, _ = branches[0]
+        node.condition = first_cond
+        node.then_body = self._body(first_body)
+        elsifs = []
+        for cond, body, clause in branches[1:]:
+            clause.condition = cond
+            clause.body = self._body(body)
+            elsifs.append(clause)
+        node.elsifs = elsifs
+        node.else_body = else_body
+        return node
+
+    def _opt_WhileStatement(self, node: WhileStatement):
+        node.condition = self._expression(node.condition)[0]
+        if isinstance(node.condition, Literal) and node.condition.value is False:
+            self.removed += 1
+            return None
+        node.body = self._body(node.body)
+        return node
+
+    def _opt_ForStatement(self, node: ForStatement):
+        for attr in ("init", "condition", "update"):
+            expr = getattr(node, attr)
+            if expr is not None:
+                setattr(node, attr, self._expression(expr)[0])
+        if isinstance(node.condition, Literal) and node.condition.value is False:
+            self.removed += 1
+            return ExpressionStatement(node.line, node.column, node.init) if node.init is not None else None
+        node.body = self._body(node.body)
+        return node
+
+    # ---------- expressões ----------
+
+    def _expression(self, node: Expression) -> Tuple[Expression, Optional[Type]]:
+        """(expressão otimizada, tipo concreto ou None)."""
+        if isinstance(node, BinaryExpr):
+            # cadeias a + b + c ... são aninhadas à esquerda: desce pela espinha
+            # iterativamente, como o SemanticAnalyzer
+            spine = []
+            while isinstance(node, BinaryExpr):
+                spine.append(node)
+                node = node.left
+            left, ltype = self._expression(node)
+            for node in reversed(spine):
+                right, rtype = self._expression(node.right)
+                node.left, node.right = left, right
+                left, ltype = self._binary(node, ltype, rtype)
+            return left, ltype
+        if isinstance(node, Literal):
+            return node, _literal_type(node.value)
+        if isinstance(node, Identifier):
+            t = self._types.get(node.symbol)
+            t = resolve(t) if t is not None else None
+            return node, t if t in (INT, FLOAT, STRING, BOOL) else None
+        if isinstance(node, UnaryExpr):
+            right, t = self._expression(node.right)
+            if isinstance(right, Literal) and _is_number(_literal_type(right.value)):
+                self.folded += 1
+                value = -right.value
+                return Literal(node.line, node.column, _wrap32(value) if isinstance(value, int) else value), t
+            if isinstance(right, UnaryExpr) and right.op == node.op == "-" and _is_number(t):
+                self.folded += 1
+                return right.right, t
+            node.right = right
+            return node, t
+        return node, None
+
+    def _binary(self, node: BinaryExpr, ltype: Optional[Type], rtype: Optional[Type]):
+        op, left, right = node.op, node.left, node.right
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            value = _fold(op, left.value, right.value)
+            if value is not None:
+                self.folded += 1
+                return Literal(node.line, node.column, value), _literal_type(value)
+
+        if op in RELATIONAL_OPS:
+            return node, BOOL
+        if op in ("and", "or"):
+            return self._logical(node, ltype, rtype)
+        if not (_is_number(ltype) and _is_number(rtype)):
+            if op == "+" and (ltype is STRING or rtype is STRING):
+                return node, STRING
+            return node, None
+        result = FLOAT if FLOAT in (ltype, rtype) else INT
+
+        # (x + c1) + c2 -> x + (c1 + c2), só em inteiros (wrap-around é associativo)
+        if (result is INT and op in ("+", "-") and isinstance(right, Literal)
+                and isinstance(left, BinaryExpr) and left.op in ("+", "-")
+                and isinstance(left.right, Literal) and _literal_type(left.right.value) is INT):
+            c1 = left.right.value if left.op == "+" else -left.right.value
+            c2 = right.value if op == "+" else -right.value
+            self.folded += 1
+            left.op, left.right = "+", Literal(left.right.line, left.right.column, _wrap32(c1 + c2))
+            return self._binary(left, INT, INT)
+
+        simplified = self._identity(node, ltype, rtype, result)
+        if simplified is not None:
+            self.folded += 1
+            return simplified, result
+        return self._strength(node, ltype, rtype, result), result
+
+    def _logical(self, node: BinaryExpr, ltype, rtype):
+        # true and x -> x, false or x -> x, false and x -> false, true or x -> true
+        if ltype is not BOOL or rtype is not BOOL:
+            return node, None
+        for const, other in ((node.left, node.right), (node.right, node.left)):
+            if isinstance(const, Literal):
+                self.folded += 1
+                neutral = node.op == "and"
+                return (other if const.value is neutral else const), BOOL
+        return node, BOOL
+
+    def _identity(self, node: BinaryExpr, ltype, rtype, result) -> Optional[Expression]:
+        op, left, right = node.op, node.left, node.right
+        lval = left.value if isinstance(left, Literal) else None
+        rval = right.value if isinstance(right, Literal) else None
+        # o operando que sobra precisa já ter o tipo do resultado (x + 0.0 com x int é real)
+        if rtype is result:
+            if op == "*" and lval == 1:
+                return right
+            if op == "+" and lval == 0 and result is INT:
+                return right
+        if ltype is result:
+            if op in ("*", "/") and rval == 1:
+                return left
+            # x - (-0.0) é x + 0.0, que troca -0.0 por 0.0
+            if op == "-" and rval == 0 and math.copysign(1, rval) > 0:
+                return left
+            # x + 0 em real trocaria -0.0 por 0.0
+            if op == "+" and rval == 0 and result is INT:
+                return left
+        if op == "*" and result is INT and (lval == 0 or rval == 0):
+            return Literal(node.line, node.column, 0)
+        return None
+
+    def _strength(self, node: BinaryExpr, ltype, rtype, result) -> Expression:
+        op, left, right = node.op, node.left, node.right
+        if op == "*" and isinstance(left, Literal) and not isinstance(right, Literal):
+            # coloca a constante à direita
+            left, right = node.left, node.right = right, left
+            ltype, rtype = rtype, ltype
+        if not isinstance(right, Literal) or ltype is not result:
+            return node
+        value = right.value
+        if op == "*" and (value == 2 or value == 2.0) and isinstance(left, Identifier):
+            # x + x: uma cópia do identificador, o codegen só lê a variável duas vezes
+            self.folded += 1
+            node.op, node.right = "+", Identifier(left.line, left.column, left.name, left.symbol)
+        elif op == "*" and result is INT and _power_of_two(value):
+            self.folded += 1
+            node.op, node.right = SHIFT_LEFT, Literal(right.line, right.column, _power_of_two(value))
+        elif op == "/" and result is FLOAT and _power_of_two_float(value):
+            self.folded += 1
+            node.op, node.right = "*", Literal(right.line, right.column, 1.0 / value)
+        return node
+
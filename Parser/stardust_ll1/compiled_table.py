@@ -0,0 +1,56 @@
+from array import array
+from typing import Dict, List, Tuple
+
+from .lexer import KIND_SYMBOLS
+
+class CompiledTable:
+    """
+    Tabela LL(1) com símbolos internados em inteiros. Terminais ocupam
+    0..T-1, na mesma ordem dos códigos do lexer (KIND_SYMBOLS), de modo que o
+    código de um token do TokenBuffer já é o seu terminal; não-terminais
+    ocupam T..T+N-1. table[n * T + t] é o índice da produção ou -1.
+    """
+    def __init__(self, terminals, nonterminals, productions, table):
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.num_terminals = len(terminals)
+        # productions[p] = (não-terminal, símbolos do lado direito)
+        self.productions = productions
+        self.table = table
+        self.terminal_id = {t: i for i, t in enumerate(terminals)}
+        self.nonterminal_id = {A: i for i, A in enumerate(nonterminals)}
+
+    def symbol_name(self, X: int) -> str:
+        T = self.num_terminals
+        return self.terminals[X] if X < T else self.nonterminals[X - T]
+
+    def predict(self, A: int, t: int) -> int:
+        return self.table[A * self.num_terminals + t]
+
+def compile_table(G: Dict[str, List[List[str]]],
+                  table: Dict[Tuple[str, str], List[str]]) -> CompiledTable:
+    nonterminals = list(G)
+    used = {X for prods in G.values() for prod in prods for X in prod if X not in G}
+    used.update(t for (_, t) in table)
+    terminals = list(KIND_SYMBOLS) + sorted(used - set(KIND_SYMBOLS))
+
+    T = len(terminals)
+    t_id = {t: i for i, t in enumerate(terminals)}
+    nt_id = {A: i for i, A in enumerate(nonterminals)}
+
+    def code(X):
+        return T + nt_id[X] if X in nt_id else t_id[X]
+
+    productions = []
+    index = {}
+    for A, prods in G.items():
+        for k, prod in enumerate(prods):
+            index[(A, k)] = len(productions)
+            productions.append((nt_id[A], tuple(code(X) for X in prod if X != "ε")))
+
+    dense = array('h', [-1]) * (len(nonterminals) * T)
+    for (A, t), prod in table.items():
+        k = next(k for k, p in enumerate(G[A]) if p is prod or p == prod)
+        dense[nt_id[A] * T + t_id[t]] = index[(A, k)]
+
+    return CompiledTable(terminals, nonterminals, productions, dense)
@@ -1,6 +1,14 @@
+import sys
 from .grammar import generate
 
 if __name__ == "__main__":
-    print("Gerando ll1_table.json...")
-    print(generate("stardust_ll1/ll1_table.json"))
+    # sem argumentos só grava o cache binário; "--json ARQUIVO" exporta também em JSON
+    filename = None
+    if "--json" in sys.argv:
+        i = sys.argv.index("--json")
+        filename = sys.argv[i + 1] if i + 1 < len(sys.argv) else "stardust_ll1/ll1_table.json"
+    print("Gerando tabela LL(1)...")
+    generate(filename)
+    if filename:
+        print(f"{filename} gravado")
     print("Pronto!")
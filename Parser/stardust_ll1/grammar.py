@@ -1,5 +1,6 @@
 import json
 from typing import Dict, List, Set, Tuple
+from . import table_cache
 
 def make_grammar():
 
@@ -164,21 +165,33 @@ def build_parsing_table(G, FIRST, FOLLOW):
     return table
 
 
-def generate(filename="stardust_ll1/ll1_table.json"):
+def build_table(G) -> Dict[Tuple[str, str], List[str]]:
+    FIRST = compute_first(G)
+    FOLLOW = compute_follow(G, FIRST)
+    return build_parsing_table(G, FIRST, FOLLOW)
+
+
+def generate(filename=None):
+    """
+    Gera a tabela LL(1), grava no cache binário (table_cache) e, se filename
+    for informado, também exporta gramática, FIRST, FOLLOW e tabela em JSON.
+    """
     G = make_grammar()
     FIRST = compute_first(G)
     FOLLOW = compute_follow(G, FIRST)
     TABLE = build_parsing_table(G, FIRST, FOLLOW)
+    table_cache.store(table_cache.spec_hash(G), TABLE)
     data = {
         "G": G,
         "FIRST": {k: sorted(list(v)) for k, v in FIRST.items()},
         "FOLLOW": {k: sorted(list(v)) for k, v in FOLLOW.items()},
         "TABLE": {f"{A}|{t}": TABLE[(A,t)] for (A,t) in TABLE}
     }
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if filename:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
     return data
 
 if __name__ == "__main__":
-    generate()
+    generate("stardust_ll1/ll1_table.json")
     print("ll1_table.json created")
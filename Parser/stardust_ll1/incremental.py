@@ -0,0 +1,312 @@
+"""
+Recompilação incremental: uma CompilationSession guarda, entre chamadas de
+update(texto), a AST e o tipo inferido de cada função, indexados pela
+impressão digital do seu trecho de tokens (o texto fonte do primeiro ao último
+token).
+
+A cada update o texto novo é comparado com o anterior: os trechos antes do
+primeiro caractere alterado e depois do último nem são re-lidos, só têm as
+posições deslocadas. O miolo é re-tokenizado e, dentro dele, só os trechos
+cuja impressão digital não estava no cache são re-parseados. Na análise, as
+funções novas ou alteradas têm o corpo re-inferido junto com todo o
+componente conexo delas no grafo de referências (quem as referencia e quem
+elas referenciam, na versão nova e na anterior): o FunctionType guardado de
+uma função inclui as restrições que as vizinhas puseram nele, então ele só
+pode ser reaproveitado se nenhuma delas mudou.
+"""
+import dataclasses
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .lexer import TokenBuffer, KIND_CODE, tokenize_buffer
+from .parser_table import LL1Parser, ParseError
+from .ast_nodes import ASTNode, Program, FunctionDecl, Identifier, Assignment
+from .semantic import (
+    SemanticAnalyzer, SymbolTable, TypeVar, unify, _encode_type, _decode_type,
+)
+
+_FUNCTION = KIND_CODE["function"]
+_EOF = KIND_CODE["EOF"]
+
+
+@dataclass(slots=True)
+class CachedFunction:
+    func: FunctionDecl
+    # todos os nós da função, para deslocar as posições sem percorrer a árvore
+    nodes: List[ASTNode]
+    # nomes usados no corpo (Identifier e destino de Assignment): arestas do grafo de chamadas
+    refs: Set[str]
+    key: bytes
+    # offsets do trecho no texto: do token function até o início do trecho seguinte
+    start: int
+    stop: int
+    # FunctionType codificado (ver semantic._encode_type) e erros do corpo; None = não inferida
+    ftype: Optional[tuple] = None
+    errors: List[str] = dataclasses.field(default_factory=list)
+
+
+def _iter_nodes(root: ASTNode):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ASTNode):
+            yield node
+            stack.extend(getattr(node, f.name) for f in dataclasses.fields(node))
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _function_spans(buf: TokenBuffer) -> List[Tuple[int, int]]:
+    # funções não se aninham: cada palavra-chave function abre um trecho novo
+    kinds = buf.kinds
+    end = len(kinds) - 1  # sem o EOF
+    starts = [i for i in range(end) if kinds[i] == _FUNCTION]
+    if end > 0 and (not starts or starts[0] != 0):
+        starts.insert(0, 0)
+    return list(zip(starts, starts[1:] + [end]))
+
+
+def _fingerprint(buf: TokenBuffer, start: int, stop: int) -> bytes:
+    text = buf.source[buf.starts[start]:buf.ends[stop - 1]]
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _sub_buffer(buf: TokenBuffer, start: int, stop: int) -> TokenBuffer:
+    sub = TokenBuffer(buf.source)
+    sub.kinds = buf.kinds[start:stop]
+    sub.starts = buf.starts[start:stop]
+    sub.ends = buf.ends[start:stop]
+    sub.lines = buf.lines[start:stop]
+    sub.columns = buf.columns[start:stop]
+    sub.symbols = buf.symbols[start:stop]
+    last = stop - 1
+    sub.append(_EOF, buf.ends[last], buf.ends[last], buf.lines[last], buf.columns[last])
+    return sub
+
+
+def _common_prefix(a: str, b: str) -> int:
+    # busca binária sobre comparações de fatias, que rodam em C
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class CompilationSession:
+    """
+    Sessão de compilação incremental de um arquivo. Cada update(texto)
+    devolve o Program da nova versão e atualiza errors e global_sym como
+    SemanticAnalyzer.analyze faria; reparsed e reanalyzed listam as funções
+    que não puderam ser reaproveitadas.
+
+    Os nós das funções inalteradas são reaproveitados (não copiados): o
+    Program de um update anterior passa a ter as posições do atual.
+    """
+    def __init__(self, parser: Optional[LL1Parser] = None):
+        self.parser = parser or LL1Parser()
+        self.program: Optional[Program] = None
+        self.errors: List[str] = []
+        self.global_sym = SymbolTable()
+        self.reparsed: List[str] = []
+        self.reanalyzed: List[str] = []
+        self._text: Optional[str] = None
+        self._entries: List[CachedFunction] = []
+
+    def update(self, text: str) -> Program:
+        if text == self._text:
+            return self.program
+        try:
+            entries, fresh, removed = self._parse(text)
+        except ParseError:
+            # o trecho isolado erra no EOF artificial; a análise completa dá a mensagem de sempre
+            self._text, self._entries = None, []
+            self.parser.parse_ast(tokenize_buffer(text))
+            raise
+        except RuntimeError:
+            self._text, self._entries = None, []
+            raise
+        self._text, self._entries = text, entries
+        self.program = Program(1, 1, [entry.func for entry in entries])
+        self._analyze(entries, fresh, removed)
+        return self.program
+
+    def _reusable(self, text: str) -> Tuple[int, int]:
+        """
+        Quantos trechos do início (i) e do fim (len - j) da versão anterior
+        continuam idênticos, com a mesma tokenização, em text.
+        """
+        old, spans = self._text, self._entries
+        if old is None or not spans:
+            return 0, len(spans)
+        p = _common_prefix(old, text)
+        s = _common_suffix(old, text, min(len(old), len(text)) - p)
+        # no início: o trecho inteiro e o primeiro caractere do seguinte inalterados
+        i = 0
+        while i < len(spans) - 1 and spans[i].stop < p:
+            i += 1
+        # no fim: o trecho e o espaço antes dele, que impede um token de atravessar a fronteira
+        j = len(spans)
+        while j > i:
+            start = spans[j - 1].start
+            if start == 0 or start - 1 < len(old) - s or not old[start - 1].isspace():
+                break
+            j -= 1
+        return i, j
+
+    def _parse(self, text: str):
+        old_text, spans = self._text, self._entries
+        i, j = self._reusable(text)
+        prefix, middle, suffix = spans[:i], spans[i:j], spans[j:]
+        delta = len(text) - (len(old_text) if old_text is not None else 0)
+
+        m0 = middle[0].start if prefix else 0
+        m1 = suffix[0].start + delta if suffix else len(text)
+        line, column = (middle[0].func.line, middle[0].func.column) if prefix else (1, 1)
+        try:
+            buf = tokenize_buffer(text, m0, m1, line, column)
+        except RuntimeError:
+            if not prefix and not suffix:
+                raise
+            # uma string aberta no miolo pode fechar num trecho reaproveitado: relê tudo
+            prefix, middle, suffix = [], spans, []
+            m0, m1 = 0, len(text)
+            buf = tokenize_buffer(text)
+
+        old: Dict[bytes, List[CachedFunction]] = {}
+        for entry in middle:
+            old.setdefault(entry.key, []).append(entry)
+        current: List[CachedFunction] = []
+        fresh: List[CachedFunction] = []
+        self.reparsed = []
+        for start, stop in _function_spans(buf):
+            key = _fingerprint(buf, start, stop)
+            bucket = old.get(key)
+            if bucket:
+                entry = bucket.pop()
+                self._move(entry, buf.lines[start], buf.columns[start])
+            else:
+                program = self.parser.parse_ast(_sub_buffer(buf, start, stop))
+                if len(program.functions) != 1:
+                    raise ParseError(f"Erro de sintaxe: trecho sem uma única função na linha {buf.lines[start]}")
+                func = program.functions[0]
+                nodes = list(_iter_nodes(func))
+                refs = {n.name for n in nodes if isinstance(n, (Identifier, Assignment))}
+                entry = CachedFunction(func, nodes, refs, key, 0, 0)
+                fresh.append(entry)
+                self.reparsed.append(func.name)
+            entry.start, entry.stop = buf.starts[start], buf.starts[stop]
+            current.append(entry)
+
+        if suffix:
+            # linhas deslocam-se pelo saldo de quebras do miolo; a coluna só na linha da fronteira
+            dl = text.count("\n", m0, m1) - old_text.count("\n", m0, suffix[0].start)
+            for entry in suffix:
+                entry.start += delta
+                entry.stop += delta
+                column = entry.start - text.rfind("\n", 0, entry.start)
+                self._move(entry, entry.func.line + dl, column)
+
+        # versões que sumiram (removidas ou editadas) invalidam quem elas
+        # referenciavam e quem as referenciava
+        removed = [entry for bucket in old.values() for entry in bucket]
+        return prefix + current + suffix, fresh, removed
+
+    @staticmethod
+    def _move(entry: CachedFunction, line: int, column: int):
+        func = entry.func
+        dl, dc = line - func.line, column - func.column
+        if not dl and not dc:
+            return
+        # o trecho é idêntico, então só a primeira linha muda de coluna
+        first = func.line
+        for node in entry.nodes:
+            if node.line == first:
+                node.column += dc
+            node.line += dl
+
+    @staticmethod
+    def _dirty(entries: List[CachedFunction], fresh: List[CachedFunction],
+               removed: List[CachedFunction]) -> Set[int]:
+        # grafo não dirigido pelos nomes: cada função liga-se às que referencia e às que a referenciam
+        by_name: Dict[str, List[CachedFunction]] = {}
+        for entry in entries:
+            by_name.setdefault(entry.func.name, []).append(entry)
+            for name in entry.refs:
+                by_name.setdefault(name, []).append(entry)
+
+        dirty = set()
+        pending = [name for entry in fresh + removed for name in (entry.func.name, *entry.refs)]
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for entry in by_name.get(name, ()):
+                if id(entry) not in dirty:
+                    dirty.add(id(entry))
+                    pending.append(entry.func.name)
+                    pending.extend(entry.refs)
+        return dirty
+
+    def _analyze(self, entries: List[CachedFunction], fresh: List[CachedFunction],
+                 removed: List[CachedFunction]):
+        analyzer = SemanticAnalyzer()
+        analyzer._collect_functions(self.program)
+
+        # variáveis de assinatura identificadas por (nome, ocorrência, posição),
+        # estáveis entre versões do arquivo
+        signatures: Dict[Tuple[str, int], List[TypeVar]] = {}
+        sig_key: Dict[int, Tuple[str, int, int]] = {}
+        occurrences: Dict[str, int] = {}
+        for func, ftype in analyzer.headers:
+            k = occurrences.get(func.name, 0)
+            occurrences[func.name] = k + 1
+            tvars = ftype.param_types + [ftype.return_type]
+            signatures[(func.name, k)] = tvars
+            for j, tv in enumerate(tvars):
+                sig_key[tv.id] = (func.name, k, j)
+
+        def sig_var(key):
+            tvars = signatures.get(key[:2])
+            return tvars[key[2]] if tvars is not None and key[2] < len(tvars) else TypeVar(analyzer.store)
+
+        dirty = self._dirty(entries, fresh, removed)
+        errors = analyzer.errors
+        conflicts: List[str] = []
+        local: Dict[int, TypeVar] = {}
+        for (func, ftype), entry in zip(analyzer.headers, entries):
+            if id(entry) not in dirty:
+                unify(ftype, _decode_type(entry.ftype, sig_var, local, analyzer.store), conflicts, "cache",
+                      analyzer.store)
+
+        self.reanalyzed = []
+        for (func, ftype), entry in zip(analyzer.headers, entries):
+            if id(entry) in dirty:
+                first = len(errors)
+                analyzer._infer_function(func, ftype)
+                entry.errors = errors[first:]
+                self.reanalyzed.append(func.name)
+        for (func, ftype), entry in zip(analyzer.headers, entries):
+            if id(entry) in dirty:
+                entry.ftype = _encode_type(ftype, sig_key, analyzer.store)
+
+        analyzer._resolve_results()
+        self.errors = [e for entry in entries for e in entry.errors] + conflicts
+        self.global_sym = analyzer.global_sym
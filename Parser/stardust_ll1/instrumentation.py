@@ -0,0 +1,211 @@
+"""
+Instrumentação por fase do pipeline (lexer, parser, análise semântica,
+geração e otimização de código).
+
+As etapas marcam o trecho que querem medir com `with phase("parser"):` e
+registram contadores com count("parser.match", n). Nada é medido até que
+alguém ative um Profiler:
+
+    with profiling() as prof:
+        ...compila...
+    print(json.dumps(prof.to_dict()))
+
+Sem Profiler ativo, phase() devolve um contexto vazio compartilhado e count()
+só testa uma global: as etapas chamam cada um uma vez por execução, nunca por
+token ou por nó, então o custo desligado é desprezível.
+
+Com o Profiler ativo cada fase registra tempo de parede, o pico de memória
+alocada durante ela (tracemalloc, acima do que já estava alocado na entrada)
+e os contadores. Fases aninhadas formam caminhos ("compile;parser"), que
+to_dict() exporta como JSON e folded() no formato de pilhas dobradas dos
+flame graphs (flamegraph.pl, speedscope, inferno).
+"""
+import contextlib
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+
+@dataclass(slots=True)
+class PhaseStats:
+    calls: int = 0
+    wall: float = 0.0
+    # tempo das fases filhas, para o tempo próprio da fase
+    child_wall: float = 0.0
+    peak_bytes: int = 0
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: "PhaseStats"):
+        self.calls += other.calls
+        self.wall += other.wall
+        self.child_wall += other.child_wall
+        self.peak_bytes = max(self.peak_bytes, other.peak_bytes)
+        for name, n in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + n
+
+
+@dataclass(slots=True)
+class _Frame:
+    path: Path
+    start: float
+    # memória alocada na entrada e maior pico visto até agora (inclui as filhas)
+    base: int
+    peak: int
+    child_wall: float = 0.0
+
+
+class Profiler:
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.stats: Dict[Path, PhaseStats] = {}
+        self._stack: List[_Frame] = []
+        self._owns_tracemalloc = False
+
+    # ---------- ciclo de vida ----------
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+    def stop(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    # ---------- coleta ----------
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        parent = self._stack[-1] if self._stack else None
+        path = (parent.path if parent else ()) + (name,)
+        current = 0
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak = max(parent.peak, peak)
+            # o pico é global: zera para medir só esta fase e repassa ao pai na saída
+            tracemalloc.reset_peak()
+        frame = _Frame(path, time.perf_counter(), current, current)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.start
+            self._stack.pop()
+            if self.memory:
+                frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            stats = self.stats.get(path)
+            if stats is None:
+                stats = self.stats[path] = PhaseStats()
+            stats.calls += 1
+            stats.wall += wall
+            stats.child_wall += frame.child_wall
+            stats.peak_bytes = max(stats.peak_bytes, frame.peak - frame.base)
+            if parent is not None:
+                parent.child_wall += wall
+                parent.peak = max(parent.peak, frame.peak)
+
+    def record(self, name: str, wall: float, calls: int = 1):
+        """
+        Registra como fase filha da fase aberta um trecho cronometrado por
+        outra ferramenta (ex.: os passes do LLVM), sem medida de memória.
+        """
+        parent = self._stack[-1] if self._stack else None
+        path = (parent.path if parent else ()) + (name,)
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = self.stats[path] = PhaseStats()
+        stats.calls += calls
+        stats.wall += wall
+        if parent is not None:
+            parent.child_wall += wall
+
+    def count(self, name: str, n: int = 1):
+        """Soma n ao contador name da fase aberta mais interna."""
+        path = self._stack[-1].path if self._stack else ()
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = self.stats[path] = PhaseStats()
+        stats.counters[name] = stats.counters.get(name, 0) + n
+
+    def merge(self, stats: Dict[Path, PhaseStats], prefix: Path = ()):
+        """Incorpora as medidas de outro Profiler (ex.: de um processo do pool) sob prefix."""
+        for path, other in stats.items():
+            mine = self.stats.get(prefix + path)
+            if mine is None:
+                mine = self.stats[prefix + path] = PhaseStats()
+            mine.merge(other)
+
+    # ---------- exportação ----------
+
+    def to_dict(self) -> dict:
+        phases = []
+        for path, s in sorted(self.stats.items()):
+            phases.append({
+                "phase": ";".join(path),
+                "calls": s.calls,
+                "wall_s": round(s.wall, 6),
+                "self_s": round(s.wall - s.child_wall, 6),
+                "peak_bytes": s.peak_bytes,
+                "counters": dict(sorted(s.counters.items())),
+            })
+        return {"phases": phases}
+
+    def folded(self) -> str:
+        """Uma linha "a;b;c <microssegundos de tempo próprio>" por caminho."""
+        lines = []
+        for path, s in sorted(self.stats.items()):
+            if path:
+                lines.append(f"{';'.join(path)} {max(0, round((s.wall - s.child_wall) * 1e6))}")
+        return "\n".join(lines) + "\n"
+
+
+# ---------- registro global ----------
+
+_active: Optional[Profiler] = None
+_NULL_PHASE = contextlib.nullcontext()
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+def active() -> Optional[Profiler]:
+    return _active
+
+
+def phase(name: str):
+    profiler = _active
+    if profiler is None:
+        return _NULL_PHASE
+    return profiler.phase(name)
+
+
+def record(name: str, wall: float, calls: int = 1):
+    profiler = _active
+    if profiler is not None:
+        profiler.record(name, wall, calls)
+
+
+def count(name: str, n: int = 1):
+    profiler = _active
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+@contextlib.contextmanager
+def profiling(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """Ativa profiler (ou um novo) enquanto o bloco roda."""
+    global _active
+    profiler = profiler or Profiler()
+    previous, _active = _active, profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = previous
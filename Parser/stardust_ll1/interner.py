@@ -0,0 +1,44 @@
+"""
+Internação de nomes: cada identificador ou palavra-chave distinto recebe um
+ID inteiro pequeno, atribuído na ordem em que aparece, e uma única cópia da
+string. O lexer interna cada nome uma vez; daí em diante parser e tabelas de
+símbolos usam o ID (hash trivial) e a string canônica (sem uma cópia por
+ocorrência no fonte).
+
+O internador global, semeado com as palavras-chave, é lexer.INTERNER.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+class Interner:
+    __slots__ = ("_ids", "names", "ids")
+
+    def __init__(self, initial: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        # names[id] é a string canônica
+        self.names: List[str] = []
+        # ids[id] é o próprio id: um único objeto int por nome, em vez de um por ocorrência
+        self.ids: List[int] = []
+        for name in initial:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = self._ids[name] = len(self.names)
+            self.names.append(name)
+            self.ids.append(sid)
+        return sid
+
+    def get(self, name: str) -> Optional[int]:
+        """ID de name, sem interná-lo; None se nunca foi visto."""
+        return self._ids.get(name)
+
+    def name(self, sid: int) -> str:
+        return self.names[sid]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self.names)
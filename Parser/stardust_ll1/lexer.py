@@ -1,6 +1,12 @@
+import codecs
+import os
 import re
-from dataclasses import dataclass
-from typing import List
+from array import array
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, TextIO, Union
+
+from . import instrumentation
+from .interner import Interner
 
 @dataclass
 class Token:
@@ -8,6 +14,9 @@ class Token:
     value: str
     line: int
     column: int
+    # ID internado do nome, posto pelo lexer em IDENT e palavras-chave; -1
+    # (o sentinela de Named.symbol) nos demais, que nunca entram no INTERNER
+    symbol: int = field(default=-1, compare=False, repr=False)
 
 KEYWORDS = {
     "function", "if", "elsif", "else",
@@ -16,6 +25,10 @@ KEYWORDS = {
     "and", "or"
 }
 
+# internador de nomes do compilador; as palavras-chave ocupam os IDs 0..NUM_KEYWORDS-1
+INTERNER = Interner(sorted(KEYWORDS))
+NUM_KEYWORDS = len(KEYWORDS)
+
 TOKEN_SPECIFICATION = [
     ("NUMBER",       r"\d+(\.\d+)?"),
     ("STRING",       r"\".*?\""),
@@ -50,15 +63,57 @@ TOKEN_REGEX = "|".join(
 
 master_pat = re.compile(TOKEN_REGEX)
 
-def tokenize(text: str) -> List[Token]:
-    tokens = []
-    line = 1
-    column = 1
+# lexema fixo de cada token pontual (LPAREN -> "("); é o nome do terminal na gramática
+LITERALS = {
+    name: pattern.replace("\\", "")
+    for name, pattern in TOKEN_SPECIFICATION
+    if name not in ("NUMBER", "STRING", "IDENT", "SKIP", "NEWLINE", "MISMATCH")
+}
+
+# todos os tipos de token que o lexer produz; o índice é o código usado no TokenBuffer
+KINDS = (
+    "EOF", "IDENT", "INT", "FLOAT", "STRING",
+    *sorted(KEYWORDS),
+    *(name for name, lexeme in LITERALS.items() if lexeme not in KEYWORDS),
+)
+KIND_CODE = {kind: code for code, kind in enumerate(KINDS)}
+
+# terminal da gramática correspondente a cada código ("$" para EOF)
+KIND_SYMBOLS = tuple("$" if kind == "EOF" else LITERALS.get(kind, kind) for kind in KINDS)
+
+# tipos cujo lexema varia; nos demais o lexema é o próprio KIND_SYMBOLS
+VARIABLE_KINDS = frozenset(KIND_CODE[k] for k in ("IDENT", "INT", "FLOAT", "STRING"))
 
+# código de tipo de cada palavra-chave, indexado pelo seu ID no INTERNER
+_KEYWORD_KINDS = [KIND_CODE[name] for name in INTERNER.names[:NUM_KEYWORDS]]
+# tipos cujo lexema é um nome internado
+SYMBOL_KINDS = frozenset([KIND_CODE["IDENT"], *_KEYWORD_KINDS])
+
+# tamanho de leitura do iter_tokens
+CHUNK_SIZE = 1 << 16
+
+# NUMBER precisa ver até 2 caracteres além do lexema ("1" + ".5") para decidir
+_LOOKAHEAD = 2
+
+def _scan(text: str, line: int, column: int, final: bool):
+    """
+    Gera os tokens de text a partir da posição (line, column). Com final=False
+    para no primeiro token que ainda pode mudar com a entrada seguinte e
+    retorna (offset não consumido, line, column) para continuar dali.
+    """
+    limit = len(text) - _LOOKAHEAD
     for mo in master_pat.finditer(text):
         kind = mo.lastgroup
         value = mo.group()
 
+        if not final:
+            if mo.end() > limit:
+                return mo.start(), line, column
+            # aspas sem fechamento na mesma linha: a string pode continuar no próximo bloco
+            if kind == "MISMATCH" and value == '"' and text.find("\n", mo.end()) == -1:
+                return mo.start(), line, column
+
+        sid = -1
         if kind == "NUMBER":
             if "." in value:
                 tok_type = "FLOAT"
@@ -66,7 +121,9 @@ def tokenize(text: str) -> List[Token]:
                 tok_type = "INT"
 
         elif kind == "IDENT":
-            tok_type = value if value in KEYWORDS else "IDENT"
+            sid = INTERNER.intern(value)
+            value = INTERNER.names[sid]
+            tok_type = value if sid < NUM_KEYWORDS else "IDENT"
 
         elif kind == "STRING":
             tok_type = "STRING"
@@ -86,8 +143,188 @@ def tokenize(text: str) -> List[Token]:
         else:
             tok_type = kind
 
-        tokens.append(Token(tok_type, value, line, column))
+        yield Token(tok_type, value, line, column, sid)
         column += len(value)
 
-    tokens.append(Token("EOF", "", line, column))
+    return len(text), line, column
+
+class TokenBuffer:
+    """
+    Tokens guardados em colunas paralelas em vez de um objeto por token:
+    código do tipo (índice em KINDS), offsets de início/fim no texto fonte,
+    linha, coluna e, para nomes, o ID no INTERNER. O lexema só é fatiado do
+    fonte quando pedido; o de um nome é a string canônica do INTERNER.
+    """
+    __slots__ = ("source", "kinds", "starts", "ends", "lines", "columns", "symbols")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self.columns = array('I')
+        # -1 nos tokens que não são nomes, como Token.symbol
+        self.symbols = array('i')
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i: int) -> "TokenView":
+        if i < 0:
+            i += len(self.kinds)
+        if not 0 <= i < len(self.kinds):
+            raise IndexError("TokenBuffer index out of range")
+        return TokenView(self, i)
+
+    def __iter__(self) -> Iterator["TokenView"]:
+        for i in range(len(self.kinds)):
+            yield TokenView(self, i)
+
+    def type(self, i: int) -> str:
+        return KINDS[self.kinds[i]]
+
+    def value(self, i: int) -> str:
+        if self.kinds[i] in SYMBOL_KINDS:
+            return INTERNER.names[self.symbols[i]]
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def append(self, kind: int, start: int, end: int, line: int, column: int, symbol: int = -1):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.symbols.append(symbol)
+
+class TokenView:
+    """Visão de um token do TokenBuffer com a mesma interface de leitura de Token."""
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer: TokenBuffer, index: int):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self) -> str:
+        return KINDS[self.buffer.kinds[self.index]]
+
+    @property
+    def value(self) -> str:
+        return self.buffer.value(self.index)
+
+    @property
+    def line(self) -> int:
+        return self.buffer.lines[self.index]
+
+    @property
+    def column(self) -> int:
+        return self.buffer.columns[self.index]
+
+    @property
+    def symbol(self) -> int:
+        sid = self.buffer.symbols[self.index]
+        return INTERNER.ids[sid] if sid >= 0 else sid
+
+    def __eq__(self, other):
+        if isinstance(other, (Token, TokenView)):
+            return (self.type, self.value, self.line, self.column) == \
+                   (other.type, other.value, other.line, other.column)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Token(type={self.type!r}, value={self.value!r}, line={self.line!r}, column={self.column!r})"
+
+def tokenize_buffer(text: str, start: int = 0, end: Optional[int] = None,
+                    line: int = 1, column: int = 1) -> TokenBuffer:
+    """
+    Mesmo resultado de tokenize, mas em um TokenBuffer. start/end restringem
+    a leitura a text[start:end] (que começa na posição line, column) sem
+    copiar o texto; os offsets do buffer continuam relativos a text.
+    """
+    with instrumentation.phase("lexer"):
+        buf = _fill_buffer(text, start, len(text) if end is None else end, line, column)
+        instrumentation.count("lexer.tokens", len(buf))
+    return buf
+
+def _fill_buffer(text: str, start: int, end: int, line: int, column: int) -> TokenBuffer:
+    buf = TokenBuffer(text)
+    append = buf.append
+    ident, int_kind, float_kind = KIND_CODE["IDENT"], KIND_CODE["INT"], KIND_CODE["FLOAT"]
+    intern = INTERNER.intern
+    keyword_kinds = _KEYWORD_KINDS
+
+    for mo in master_pat.finditer(text, start, end):
+        kind = mo.lastgroup
+        begin, stop = mo.span()
+
+        sid = -1
+        if kind == "NUMBER":
+            code = float_kind if "." in mo.group() else int_kind
+
+        elif kind == "IDENT":
+            sid = intern(mo.group())
+            code = keyword_kinds[sid] if sid < NUM_KEYWORDS else ident
+
+        elif kind == "SKIP":
+            column += stop - begin
+            continue
+
+        elif kind == "NEWLINE":
+            line += 1
+            column = 1
+            continue
+
+        elif kind == "MISMATCH":
+            raise RuntimeError(f"Caractere inesperado {mo.group()!r} na linha {line}")
+
+        else:
+            code = KIND_CODE[kind]
+
+        append(code, begin, stop, line, column, sid)
+        column += stop - begin
+
+    append(KIND_CODE["EOF"], end, end, line, column)
+    return buf
+
+def _scan_all(text: str) -> Iterator[Token]:
+    _, line, column = yield from _scan(text, 1, 1, True)
+    yield Token("EOF", "", line, column)
+
+def tokenize(text: str) -> List[Token]:
+    with instrumentation.phase("lexer"):
+        tokens = list(_scan_all(text))
+        instrumentation.count("lexer.tokens", len(tokens))
     return tokens
+
+def _read_chunks(f, chunk_size: int):
+    decoder = None
+    while True:
+        raw = f.read(chunk_size)
+        if isinstance(raw, bytes):
+            decoder = decoder or codecs.getincrementaldecoder("utf-8")()
+            yield decoder.decode(raw, final=not raw), not raw
+        else:
+            yield raw, not raw
+        if not raw:
+            return
+
+def iter_tokens(source: Union[str, os.PathLike, TextIO, BinaryIO],
+                chunk_size: int = CHUNK_SIZE) -> Iterator[Token]:
+    """
+    Versão incremental de tokenize: lê source (caminho ou arquivo aberto) em
+    blocos de chunk_size e gera os tokens sob demanda, terminando em EOF.
+    Só o trecho ainda não tokenizado fica em memória.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            yield from iter_tokens(f, chunk_size)
+        return
+
+    buf = ""
+    line, column = 1, 1
+    for chunk, final in _read_chunks(source, chunk_size):
+        buf += chunk
+        rest, line, column = yield from _scan(buf, line, column, final)
+        buf = buf[rest:]
+    yield Token("EOF", "", line, column)
@@ -1,73 +1,198 @@
-from typing import List, Tuple, Any
-from .grammar import make_grammar, compute_first, compute_follow, build_parsing_table
-from .lexer import Token
+import gc
+from typing import Iterable, List, Tuple, Any, Union
+from .grammar import make_grammar, build_table
+from .lexer import Token, TokenBuffer, TokenView, KIND_CODE
+from .compiled_table import compile_table
+from .ast_builder import build_actions
+from .ast_nodes import Program
+from . import table_cache
+from . import instrumentation
 
 class ParseError(Exception):
     pass
 
 class LL1Parser:
-    def __init__(self, generate_table: bool = True):
-        # constrói tabela a partir da gramática (se generate_table True)
+    def __init__(self, generate_table: bool = True, use_cache: bool = True, pause_gc: bool = False):
+        # constrói tabela a partir da gramática (se generate_table True);
+        # com use_cache a tabela vem do cache em disco, chaveado pelo hash da gramática.
+        # pause_gc desliga o coletor cíclico durante cada parse: o estado é do processo
+        # inteiro, então só vale para quem é dono dele (o driver, os benchmarks)
+        self.pause_gc = pause_gc
         if generate_table:
             G = make_grammar()
-            FIRST = compute_first(G)
-            FOLLOW = compute_follow(G, FIRST)
-            self.table = build_parsing_table(G, FIRST, FOLLOW)
+            if use_cache:
+                self.table = table_cache.load_or_build(G, build_table)
+            else:
+                self.table = build_table(G)
             self.G = G
+            self.compiled = compile_table(G, self.table)
+            self._leaves = [(t,) for t in self.compiled.terminals]
+            # lados direitos invertidos, prontos para empilhar
+            self._reversed_rhs = [rhs[::-1] for _, rhs in self.compiled.productions]
+            self._ast_actions = build_actions(self.compiled)
         else:
             raise RuntimeError("Only generation-from-grammar supported in this simple implementation.")
 
-        # parser state
-        self.tokens: List[Token] = []
+        # parser state: os tokens são consumidos de um iterador, um de cada vez,
+        # ou lidos direto das colunas de um TokenBuffer; _tid é o terminal do lookahead
+        self._tokens = iter(())
+        self._buffer = None
+        self._la = None
+        self._tid = 0
         self.pos = 0
 
-    def parse(self, tokens: List[Token]):
-        self.tokens = tokens
+    def __getstate__(self):
+        # as ações semânticas são lambdas e o estado de parse é transitório:
+        # só a gramática e as tabelas vão no pickle (ex.: para um processo do pool)
+        state = self.__dict__.copy()
+        for name in ("_ast_actions", "_tokens", "_buffer", "_la"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ast_actions = build_actions(self.compiled)
+        self._tokens = iter(())
+        self._buffer = None
+        self._la = None
+
+    def parse(self, tokens: Union[TokenBuffer, Iterable[Token]]):
+        # aceita a lista de tokenize, o gerador de iter_tokens ou um TokenBuffer
+        return self._parse(tokens, None)
+
+    def parse_ast(self, tokens: Union[TokenBuffer, Iterable[Token]]) -> Program:
+        """
+        Como parse, mas as ações semânticas de ast_builder montam direto os nós
+        de ast_nodes, sem a árvore genérica [A, filhos] intermediária.
+        """
+        return self._parse(tokens, self._ast_actions)
+
+    def _parse(self, tokens, actions):
+        if isinstance(tokens, TokenBuffer):
+            self._buffer = tokens
+            self._tokens = iter(())
+        else:
+            self._buffer = None
+            self._tokens = iter(tokens)
+            self._la = next(self._tokens, None)
         self.pos = 0
-        return self._parse_nonterminal("Program")
+        self._load()
+        start = self.compiled.nonterminal_id["Program"]
+        # a árvore é acíclica: o coletor cíclico só re-percorreria os milhões de
+        # listas recém-criadas a cada geração, sem nunca achar lixo
+        pause = self.pause_gc and gc.isenabled()
+        if pause:
+            gc.disable()
+        try:
+            with instrumentation.phase("parser"):
+                result = self._parse_nonterminal(start, actions)
+                instrumentation.count("parser.match", self.pos)
+            return result
+        finally:
+            if pause:
+                gc.enable()
 
     def lookahead(self) -> Token:
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
+        if self._buffer is not None:
+            if self.pos < len(self._buffer):
+                return self._buffer[self.pos]
+        elif self._la is not None:
+            return self._la
         return Token("EOF", "", 0, 0)
 
-    def _match_terminal(self, X: str):
-        # aceita X ser tanto um token.type (ex: LPAREN) quanto um exact token.value (ex: '(')
-        tok = self.lookahead()
-        if tok.type == X or tok.value == X:
+    def terminal_of(self, tok: Token) -> int:
+        """Terminal da gramática para o token: pelo tipo, senão pelo lexema; -1 se nenhum."""
+        code = KIND_CODE.get(tok.type)
+        if code is not None:
+            return code
+        return self.compiled.terminal_id.get(tok.value, -1)
+
+    def _load(self):
+        # o TokenBuffer já guarda o terminal de cada token; Token é mapeado uma vez aqui
+        buf = self._buffer
+        if buf is not None:
+            self._tid = buf.kinds[self.pos] if self.pos < len(buf.kinds) else 0
+        elif self._la is not None:
+            self._tid = self.terminal_of(self._la)
+        else:
+            self._tid = 0
+
+    def _advance(self):
+        self.pos += 1
+        buf = self._buffer
+        if buf is None:
+            self._la = next(self._tokens, None)
+            self._tid = self.terminal_of(self._la) if self._la is not None else 0
+        else:
+            self._tid = buf.kinds[self.pos] if self.pos < len(buf.kinds) else 0
+
+    def _match_terminal(self, X: int):
+        if self._tid == X:
+            tok = self._la if self._buffer is None else self._buffer[self.pos]
             # consume
-            self.pos += 1
+            self._advance()
             return tok
-        raise ParseError(f"Erro de sintaxe: token '{tok.value}' esperado {X} (lookahead: {tok.type}/{tok.value})")
-
-    def _parse_nonterminal(self, A: str):
-        # seleciona produção via tabela (usando lookahead token type OR token value)
         tok = self.lookahead()
-        # try keys using tok.type, then tok.value, then EOF
-        key_type = (A, tok.type)
-        key_val = (A, tok.value)
-        prod = None
-        if key_type in self.table:
-            prod = self.table[key_type]
-        elif key_val in self.table:
-            prod = self.table[key_val]
-        elif (A, "$") in self.table and tok.type == "EOF":
-            prod = self.table[(A, "$")]
-        else:
-            la = tok
-            raise ParseError(f"Erro de sintaxe: token '{la.value}' em {A} (lookahead seq: {la.type}/{la.value})")
-
-        # epsilon production
-        if prod == []:
-            return [A, []]
-
-        node_children = []
-        for X in prod:
-            if X == "ε":
-                continue
-            if X in self.G:  # nonterminal
-                node_children.append(self._parse_nonterminal(X))
-            else:  # terminal
-                matched = self._match_terminal(X)
-                node_children.append((X,))
-        return [A, node_children]
+        name = self.compiled.terminals[X]
+        raise ParseError(f"Erro de sintaxe: token '{tok.value}' esperado {name} (lookahead: {tok.type}/{tok.value})")
+
+    def _parse_nonterminal(self, A: int, actions=None):
+        """
+        Driver de pilha explícita: a profundidade da entrada não vira recursão
+        em Python. `stack` guarda os símbolos pendentes e, abaixo do lado direito
+        de cada produção p expandida, o marcador ~p (negativo) que fecha o nó.
+        Os filhos prontos se acumulam em `values`; `marks` guarda onde começam
+        os filhos de cada produção aberta.
+
+        Sem `actions` cada nó é [A, filhos] e cada terminal a tupla (X,);
+        com `actions` o nó é actions[p](filhos) e os terminais são os tokens.
+        """
+        c = self.compiled
+        T = c.num_terminals
+        table = c.table
+        productions = c.productions
+        names = c.nonterminals
+        reversed_rhs = self._reversed_rhs
+        leaves = self._leaves
+
+        stack = [T + A]
+        values = []
+        marks = []
+        predicts = 0
+        while stack:
+            X = stack.pop()
+            if X < 0:  # fim da produção ~X: agrupa os filhos no nó
+                start = marks.pop()
+                children = values[start:]
+                del values[start:]
+                if actions is None:
+                    values.append([names[productions[~X][0]], children])
+                else:
+                    values.append(actions[~X](children))
+            elif X >= T:  # nonterminal: seleciona produção via tabela, um índice por passo
+                predicts += 1
+                tid = self._tid
+                p = table[(X - T) * T + tid] if tid >= 0 else -1
+                if p < 0:
+                    la = self.lookahead()
+                    raise ParseError(f"Erro de sintaxe: token '{la.value}' em {names[X - T]} (lookahead seq: {la.type}/{la.value})")
+                rhs = reversed_rhs[p]
+                # epsilon production
+                if not rhs:
+                    values.append([names[X - T], []] if actions is None else actions[p]([]))
+                    continue
+                marks.append(len(values))
+                stack.append(~p)
+                stack.extend(rhs)
+            elif X == self._tid:  # terminal: casar é comparar inteiros
+                if actions is None:
+                    values.append(leaves[X])
+                elif self._buffer is None:
+                    values.append(self._la)
+                else:
+                    values.append(TokenView(self._buffer, self.pos))
+                self._advance()
+            else:
+                self._match_terminal(X)
+        instrumentation.count("parser.predict", predicts)
+        return values[0]
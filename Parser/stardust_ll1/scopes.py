@@ -0,0 +1,85 @@
+"""
+Tabela de símbolos com escopos aninhados, compartilhada por semantic.SymbolTable
+e analisador/tabela_simbolos.TabelaSimbolos.
+
+Em vez de um dicionário por escopo (e a busca subindo escopo a escopo), há um
+único mapa nome -> pilha de ligações (o nome é qualquer chave hashable:
+o ID internado em semantic, a própria string em TabelaSimbolos): a ligação visível é sempre o topo da
+pilha. Cada escopo guarda o log das ligações que criou, e fechar o escopo só
+desfaz essas. Busca e abertura de escopo são O(1); fechar é O(ligações do escopo).
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+@dataclass(slots=True)
+class Binding:
+    value: Any
+    # escopo em que a ligação foi criada (0 = global)
+    depth: int
+
+
+class ScopedTable:
+    def __init__(self):
+        self._bindings: Dict[Hashable, List[Binding]] = {}
+        # log de desfazer: (nome, ligação) criadas em cada escopo aberto, o global em [0]
+        self._scopes: List[List[Tuple[Hashable, Binding]]] = [[]]
+
+    @property
+    def depth(self) -> int:
+        return len(self._scopes) - 1
+
+    def push_scope(self):
+        self._scopes.append([])
+
+    def pop_scope(self):
+        if len(self._scopes) == 1:
+            raise IndexError("o escopo global não pode ser fechado")
+        bindings = self._bindings
+        for name, _ in reversed(self._scopes.pop()):
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+
+    def bind(self, name: Hashable, value: Any):
+        """Liga name no escopo atual, substituindo a ligação se ela já for deste escopo."""
+        depth = len(self._scopes) - 1
+        stack = self._bindings.get(name)
+        if stack is None:
+            stack = self._bindings[name] = []
+        elif stack[-1].depth == depth:
+            stack[-1].value = value
+            return
+        binding = Binding(value, depth)
+        stack.append(binding)
+        self._scopes[-1].append((name, binding))
+
+    def lookup(self, name: Hashable) -> Optional[Any]:
+        stack = self._bindings.get(name)
+        return stack[-1].value if stack else None
+
+    def lookup_current(self, name: Hashable) -> Optional[Any]:
+        stack = self._bindings.get(name)
+        if stack and stack[-1].depth == len(self._scopes) - 1:
+            return stack[-1].value
+        return None
+
+    def __contains__(self, name: Hashable) -> bool:
+        return name in self._bindings
+
+    def values(self) -> Iterator[Any]:
+        """Todas as ligações dos escopos abertos, do global ao atual, na ordem em que foram criadas."""
+        for scope in self._scopes:
+            for _, binding in scope:
+                yield binding.value
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        for scope in self._scopes:
+            for name, binding in scope:
+                yield name, binding.value
+
+    def current_items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Só as ligações criadas no escopo atual."""
+        for name, binding in self._scopes[-1]:
+            yield name, binding.value
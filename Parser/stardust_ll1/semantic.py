@@ -1,7 +1,17 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Callable, Dict, List, Optional, Tuple, Any, Union
 
-@dataclass(eq=False)
+from .ast_nodes import (
+    Program, FunctionDecl, Block, ReturnStatement, ExpressionStatement, Assignment,
+    IfStatement, WhileStatement, ForStatement, Expression, BinaryExpr, UnaryExpr,
+    Literal, Identifier,
+)
+from .scopes import ScopedTable
+from . import instrumentation
+
+@dataclass(eq=False, slots=True)
 class Type:
     name: str
 
@@ -15,372 +25,515 @@ BOOL = Type("bool")
 NULL = Type("null")
 ANY = Type("any")   
 
-@dataclass
+@dataclass(slots=True)
 class FunctionType(Type):
     param_types: List[Type]
     return_type: Type
     def __init__(self, param_types: List[Type], return_type: Type):
-        super().__init__("fn")
+        # slots=True recria a classe, então super() sem argumentos não funciona aqui
+        Type.__init__(self, "fn")
         self.param_types = param_types
         self.return_type = return_type
     def __repr__(self):
         pts = ", ".join(repr(t) for t in self.param_types)
         return f"fn({pts}) -> {repr(self.return_type)}"
 
-class TypeVar(Type):
-    _count = 0
+class TypeStore:
+    """
+    Substituição das variáveis de tipo como union-find: parent e rank são
+    indexados pelo id da TypeVar, e o representante de cada classe guarda em
+    `bound` o tipo concreto ao qual a classe foi ligada (None se ainda livre).
+
+    Cada análise tem o seu (SemanticAnalyzer.store): as variáveis de uma
+    análise morrem com ela, e os nomes t0, t1... não dependem das anteriores.
+    Só as operações de unificação consultam o store; a TypeVar guarda apenas
+    o id, e os tipos que saem da análise já vêm resolvidos (ver
+    SemanticAnalyzer.resolved), sem arrastar o store para um pickle ou cache.
+    """
+    __slots__ = ("parent", "rank", "bound", "vars")
+
     def __init__(self):
-        self.id = TypeVar._count
-        TypeVar._count += 1
-        super().__init__(f"t{self.id}")
-        self.instance: Optional[Type] = None
-    def __repr__(self):
-        if self.instance:
-            return repr(self.instance)
-        return self.name
+        self.parent: List[int] = []
+        self.rank = bytearray()
+        self.bound: List[Optional[Type]] = []
+        self.vars: List["TypeVar"] = []
+
+    def add(self, tv: "TypeVar") -> int:
+        i = len(self.parent)
+        self.parent.append(i)
+        self.rank.append(0)
+        self.bound.append(None)
+        self.vars.append(tv)
+        return i
+
+    def find(self, i: int) -> int:
+        # iterativo: sobe até a raiz e depois aponta todo o caminho para ela
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i: int, j: int) -> int:
+        # i e j devem ser raízes livres; a de menor rank passa a apontar para a outra
+        if i == j:
+            return i
+        rank = self.rank
+        if rank[i] < rank[j]:
+            i, j = j, i
+        self.parent[j] = i
+        if rank[i] == rank[j]:
+            rank[i] += 1
+        return i
 
-@dataclass
+# chamadas de unify (inclusive as recursivas) no processo, para a instrumentação
+_unifications = 0
+
+class TypeVar(Type):
+    __slots__ = ("id",)
+    def __init__(self, store: TypeStore):
+        self.id = store.add(self)
+        Type.__init__(self, f"t{self.id}")
+
+@dataclass(slots=True)
 class Symbol:
     name: str
     type: Type
 
-class SymbolTable:
-    def __init__(self, parent: Optional["SymbolTable"]=None):
-        self.parent = parent
-        self.table: Dict[str, Symbol] = {}
+class SymbolTable(ScopedTable):
+    """
+    Uma tabela só para a análise inteira: as funções no escopo global e os
+    locais de cada função num escopo que _infer_function abre e fecha. A
+    chave é o ID internado do nome (o symbol dos nós da AST).
+    """
+    def define(self, symbol: int, name: str, typ: Type):
+        self.bind(symbol, Symbol(name, typ))
+
+# ---------- tipos entre processos ----------
+# TypeVars não podem atravessar processos (o id indexa o TypeStore local), então
+# os tipos trafegam codificados: ("con", nome), ("fn", params, ret), ("sig", k)
+# para a k-ésima variável de assinatura e ("local", id) para as demais.
+
+_CONSTANTS = {t.name: t for t in (INT, FLOAT, STRING, BOOL, NULL, ANY)}
+
+def _encode_type(t: Type, sig_key: Dict[int, int], store: TypeStore):
+    t = resolve(t, store)
+    if isinstance(t, TypeVar):
+        key = sig_key.get(t.id)
+        return ("sig", key) if key is not None else ("local", t.id)
+    if isinstance(t, FunctionType):
+        return ("fn", [_encode_type(p, sig_key, store) for p in t.param_types],
+                _encode_type(t.return_type, sig_key, store))
+    return ("con", t.name)
+
+def _decode_type(data, sig_var: Callable[[int], "TypeVar"], local: Dict[int, "TypeVar"],
+                 store: TypeStore) -> Type:
+    tag = data[0]
+    if tag == "sig":
+        return sig_var(data[1])
+    if tag == "local":
+        if data[1] not in local:
+            local[data[1]] = TypeVar(store)
+        return local[data[1]]
+    if tag == "fn":
+        return FunctionType([_decode_type(p, sig_var, local, store) for p in data[1]],
+                            _decode_type(data[2], sig_var, local, store))
+    return _CONSTANTS.get(data[1]) or Type(data[1])
+
+# estado de cada processo do pool, posto uma vez por _init_worker: com fork as
+# funções nem são serializadas, e cada lote só leva um intervalo de índices
+_worker_state = None
 
-    def define(self, name: str, typ: Type):
-        self.table[name] = Symbol(name, typ)
+def _init_worker(functions, signatures, names):
+    global _worker_state
+    _worker_state = (functions, signatures, names)
 
-    def lookup(self, name: str) -> Optional[Symbol]:
-        cur = self
-        while cur:
-            if name in cur.table:
-                return cur.table[name]
-            cur = cur.parent
-        return None
+def _infer_batch(start: int, stop: int):
+    """
+    Executa num processo do pool: recria as assinaturas globais a partir da
+    forma codificada, infere os corpos das funções start..stop-1 e devolve os
+    erros de cada uma e as ligações feitas nas variáveis de assinatura, para o
+    processo principal aplicar.
+    """
+    functions, signatures, names = _worker_state
+    analyzer = SemanticAnalyzer()
+    sig_vars: Dict[int, TypeVar] = {}
+    def sig_var(key):
+        if key not in sig_vars:
+            sig_vars[key] = TypeVar(analyzer.store)
+        return sig_vars[key]
 
-def is_number_type(t: Type):
-    t = resolve(t)
+    ftypes = [_decode_type(enc, sig_var, {}, analyzer.store) for enc in signatures]
+    for symbol, i in names.items():
+        analyzer.global_sym.define(symbol, functions[i].name, ftypes[i])
+
+    errors = []
+    for i in range(start, stop):
+        func = functions[i]
+        first = len(analyzer.errors)
+        analyzer._infer_function(func, ftypes[i])
+        errors.append((func.line, func.column, analyzer.errors[first:]))
+
+    sig_key = {tv.id: key for key, tv in sig_vars.items()}
+    store = analyzer.store
+    bindings = [(key, _encode_type(tv, sig_key, store)) for key, tv in sig_vars.items()
+                if resolve(tv, store) is not tv]
+    local_types = [(i, [(symbol, _encode_type(t, sig_key, store))
+                        for symbol, t in analyzer.local_types(functions[i]).items()])
+                   for i in range(start, stop)]
+    return errors, bindings, local_types
+
+RELATIONAL_OPS = frozenset(("==", "!=", ">", ">=", "<", "<="))
+ADDITIVE_OPS = frozenset(("+", "-", "and", "or"))
+
+# abaixo disto o pool de processos perde para a análise sequencial: o ponto
+# de equilíbrio medido com benchmarks/semantic_scaling.py --parallel
+MIN_PARALLEL_FUNCTIONS = 2000
+
+def is_number_type(t: Type, store: Optional[TypeStore] = None):
+    t = resolve(t, store)
     return t in (INT, FLOAT)
 
-def resolve(t: Type) -> Type:
-    if isinstance(t, TypeVar) and t.instance is not None:
-        t.instance = resolve(t.instance)
-        return t.instance
+def resolve(t: Type, store: Optional[TypeStore] = None) -> Type:
+    """
+    O tipo ligado à classe de t no store, ou a variável que representa a
+    classe. Os tipos que saem de uma análise já estão resolvidos: sem store,
+    t volta como está.
+    """
+    if store is not None and isinstance(t, TypeVar):
+        root = store.find(t.id)
+        bound = store.bound[root]
+        return bound if bound is not None else store.vars[root]
+    return t
+
+def resolve_deep(t: Type, store: TypeStore) -> Type:
+    """t com as variáveis trocadas pelo que resolve dá, também dentro de um FunctionType."""
+    t = resolve(t, store)
+    if isinstance(t, FunctionType):
+        return FunctionType([resolve_deep(p, store) for p in t.param_types],
+                            resolve_deep(t.return_type, store))
+    return t
+
+def occurs(v: TypeVar, t: Type, store: TypeStore) -> bool:
+    """True se a variável v aparece dentro de t (impede tipos recursivos)."""
+    root = store.find(v.id)
+    stack = [t]
+    while stack:
+        t = resolve(stack.pop(), store)
+        if isinstance(t, TypeVar):
+            if store.find(t.id) == root:
+                return True
+        elif isinstance(t, FunctionType):
+            stack.extend(t.param_types)
+            stack.append(t.return_type)
+    return False
+
+def _context(ctx) -> str:
+    # numa atribuição o contexto é o próprio nó: o texto só é montado se houver erro
+    return f"assign {ctx.name}" if isinstance(ctx, Assignment) else ctx
+
+def _bind(v: TypeVar, t: Type, errors: List[str], ctx, store: TypeStore) -> Type:
+    if occurs(v, t, store):
+        errors.append(f"Recursive type: {v.name} occurs in {resolve_deep(t, store)} {_context(ctx)}")
+        return ANY
+    store.bound[store.find(v.id)] = t
     return t
 
-def unify(a: Type, b: Type, errors: List[str], ctx=""):
-    a = resolve(a)
-    b = resolve(b)
+def widen(t: Type, store: TypeStore) -> None:
+    """Se t é uma variável ligada a int, religa a classe dela a float."""
+    if isinstance(t, TypeVar):
+        root = store.find(t.id)
+        if store.bound[root] is INT:
+            store.bound[root] = FLOAT
+
+def unify(a: Type, b: Type, errors: List[str], ctx, store: TypeStore):
+    global _unifications
+    _unifications += 1
+    a = resolve(a, store)
+    b = resolve(b, store)
     if a is b:
         return a
     if isinstance(a, TypeVar):
-        a.instance = b
-        return b
+        if isinstance(b, TypeVar):
+            return store.vars[store.union(store.find(a.id), store.find(b.id))]
+        return _bind(a, b, errors, ctx, store)
     if isinstance(b, TypeVar):
-        b.instance = a
-        return a
+        return _bind(b, a, errors, ctx, store)
     if isinstance(a, FunctionType) and isinstance(b, FunctionType):
         if len(a.param_types) != len(b.param_types):
-            errors.append(f"Mismatch function arity: {a} vs {b} {ctx}")
+            errors.append(f"Mismatch function arity: {resolve_deep(a, store)} vs {resolve_deep(b, store)} {_context(ctx)}")
             return ANY
         for p,q in zip(a.param_types, b.param_types):
-            unify(p, q, errors, ctx)
-        unify(a.return_type, b.return_type, errors, ctx)
+            unify(p, q, errors, ctx, store)
+        unify(a.return_type, b.return_type, errors, ctx, store)
         return a
     if a.name == b.name:
         return a
     if (a in (INT, FLOAT) and b in (INT, FLOAT)):
         unify_res = FLOAT
         return unify_res
-    errors.append(f"Type mismatch: {a} vs {b} {ctx}")
+    errors.append(f"Type mismatch: {resolve_deep(a, store)} vs {resolve_deep(b, store)} {_context(ctx)}")
     return ANY
 
 class SemanticAnalyzer:
-    def __init__(self):
+    """
+    Inferência de tipos sobre a AST de LL1Parser.parse_ast. Uma passada pelos
+    cabeçalhos define a assinatura de cada função (e guarda o cabeçalho); a
+    segunda infere os corpos. Cada nó é tratado pelo handler da sua classe,
+    buscado numa tabela montada uma vez no construtor.
+
+    Com parallel=True os corpos são inferidos em lotes num ProcessPoolExecutor
+    (max_workers processos); o resultado é mesclado de forma determinística.
+    Programas com menos de min_parallel funções, ou com um processo só,
+    continuam sequenciais: aí o pool custa mais do que economiza.
+    """
+    def __init__(self, parallel: bool = False, max_workers: Optional[int] = None,
+                 min_parallel: int = MIN_PARALLEL_FUNCTIONS):
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.min_parallel = min_parallel
         self.errors: List[str] = []
         self.global_sym = SymbolTable()
+        self.headers: List[Tuple[FunctionDecl, FunctionType]] = []
+        # variáveis de tipo desta análise; analyze começa um novo
+        self.store = TypeStore()
+        # id(FunctionDecl) -> {symbol: tipo} dos parâmetros e locais, para as etapas seguintes
+        self._locals: Dict[int, Dict[int, Type]] = {}
         self._setup_builtins()
+        self._statement_handlers = {
+            cls: getattr(self, "_infer_" + cls.__name__)
+            for cls in (Assignment, ExpressionStatement, ReturnStatement, Block,
+                        IfStatement, WhileStatement, ForStatement)
+        }
+        self._expression_handlers = {
+            cls: getattr(self, "_infer_" + cls.__name__)
+            for cls in (BinaryExpr, UnaryExpr, Literal, Identifier)
+        }
 
     def _setup_builtins(self):
         pass
 
-    def analyze(self, tree: Any) -> Tuple[Optional[Type], SymbolTable]:
+    def analyze(self, tree: Program) -> Tuple[Optional[Type], SymbolTable]:
         """
-        tree: parse tree as returned by parser.parse(tokens)
+        tree: Program as returned by parser.parse_ast(tokens)
         returns (type_of_tree, global_symbol_table)
         """
+        if not isinstance(tree, Program):
+            raise TypeError("analyze espera o Program de LL1Parser.parse_ast")
         self.errors.clear()
         self.global_sym = SymbolTable()
-        self._collect_functions(tree)
-        self._infer_program(tree, self.global_sym)
+        self._locals = {}
+        self.store = TypeStore()
+        with instrumentation.phase("semantic"):
+            unifications = _unifications
+            self._collect_functions(tree)
+            if self._use_pool():
+                self._infer_parallel()
+            else:
+                for func, ftype in self.headers:
+                    self._infer_function(func, ftype)
+            self._resolve_results()
+            # no modo paralelo só contam as do processo principal
+            instrumentation.count("semantic.typevars", len(self.store.parent))
+            instrumentation.count("semantic.unify", _unifications - unifications)
         return None, self.global_sym
 
-    def _collect_functions(self, node):
-        if not isinstance(node, list):
-            return
-        A, children = node[0], node[1]
-        if A == "Program":
-            for ch in children:
-                self._collect_functions(ch)
-        elif A == "FunctionDeclList":
-            for ch in children:
-                self._collect_functions(ch)
-        elif A == "FunctionDecl":
-            name = None
-            param_nodes = None
-            for c in children:
-                if isinstance(c, tuple) and len(c) >= 2 and c[0] == "IDENT":
-                    name = c[1]
-                    break
-            for c in children:
-                if isinstance(c, list) and c[0] == "ParameterListOpt":
-                    param_nodes = c
-                    break
-            params = []
-            if param_nodes:
-                if len(param_nodes[1])>0:
-                    plist = param_nodes[1][0]
-                    ids = self._gather_idents_in_paramlist(plist)
-                    params = ids
-            param_tvars = [TypeVar() for _ in params]
-            ret_tvar = TypeVar()
+    def resolved(self, t: Type) -> Type:
+        """t como esta análise o deixou: sem variáveis ligadas, nem dentro de um FunctionType."""
+        return resolve_deep(t, self.store)
+
+    def _resolve_results(self):
+        # as etapas seguintes (e os caches) recebem tipos que não dependem do store
+        resolved = self.resolved
+        headers = []
+        for func, ftype in self.headers:
+            ftype = resolved(ftype)
+            self.global_sym.define(func.symbol, func.name, ftype)
+            headers.append((func, ftype))
+        self.headers = headers
+        self._locals = {key: {symbol: resolved(t) for symbol, t in types.items()}
+                        for key, types in self._locals.items()}
+
+    def _use_pool(self) -> bool:
+        if not self.parallel or len(self.headers) < max(2, self.min_parallel):
+            return False
+        return (self.max_workers or os.cpu_count() or 1) > 1
+
+    def _collect_functions(self, program: Program):
+        self.headers = []
+        for func in program.functions:
+            param_tvars = [TypeVar(self.store) for _ in func.params]
+            ret_tvar = TypeVar(self.store)
             ftype = FunctionType(param_tvars, ret_tvar)
-            if name:
-                self.global_sym.define(name, ftype)
-        else:
-            for ch in children:
-                if isinstance(ch, list):
-                    self._collect_functions(ch)
-
-    def _gather_idents_in_paramlist(self, plist_node):
-        ids = []
-        if plist_node[0] == "ParameterList":
-            for ch in plist_node[1]:
-                if isinstance(ch, tuple) and ch[0]=="IDENT":
-                    ids.append(ch[1])
-        if not ids:
-            def search(node):
-                if isinstance(node, tuple) and node[0]=="IDENT":
-                    return [node[1]]
-                if isinstance(node, list):
-                    res=[]
-                    for c in node[1]:
-                        res += search(c)
-                    return res
-                return []
-            ids = search(plist_node)
-        return ids
-
-    def _infer_program(self, node, sym: SymbolTable):
-        if not isinstance(node, list):
-            return
-        A = node[0]
-        if A == "Program":
-            for ch in node[1]:
-                self._infer_program(ch, sym)
-        elif A == "FunctionDeclList":
-            for ch in node[1]:
-                self._infer_program(ch, sym)
-        elif A == "FunctionDecl":
-            name = None
-            param_names = []
-            block_node = None
-            for c in node[1]:
-                if isinstance(c, tuple) and c[0]=="IDENT":
-                    if name is None:
-                        name = c[1]
-                        continue
-                if isinstance(c, list) and c[0]=="ParameterListOpt":
-                    if len(c[1])>0:
-                        param_names = self._gather_idents_in_paramlist(c[1][0])
-                if isinstance(c, list) and c[0]=="Block":
-                    block_node = c
-            sym_func = self.global_sym.lookup(name)
-            if not sym_func:
-                self.errors.append(f"Function {name} not declared in header collection")
-                return
-            ftype: FunctionType = sym_func.type
-            local = SymbolTable(parent=self.global_sym)
-            for pname, ptype_var in zip(param_names, ftype.param_types):
-                local.define(pname, ptype_var)
-            self._infer_block(block_node, local, ftype.return_type)
-        else:
-            for ch in node[1]:
-                if isinstance(ch, list):
-                    self._infer_program(ch, sym)
-
-    def _infer_block(self, block_node, sym: SymbolTable, func_return: Type):
-        if not block_node:
-            return
-        for c in block_node[1]:
-            if isinstance(c, list) and c[0]=="StatementList":
-                for st in c[1]:
-                    self._infer_statement(st, sym, func_return)
-
-    def _infer_statement(self, node, sym: SymbolTable, func_return: Type):
-        if not isinstance(node, list):
-            return
-        A = node[0]
-        if A == "Statement":
-            first = node[1][0] if node[1] else None
-            if isinstance(first, tuple) and first[0]=="IDENT":
-                name = first[1]
-                sp = node[1][1] if len(node[1])>1 else None
-                if isinstance(sp, list) and sp[0]=="StatementPrime":
-                    expr = self._find_node(sp, "Expression") or self._find_node(sp, "ExpressionRest")
-                    if expr:
-                        t = self._infer_expression(expr, sym)
-                        existing = sym.lookup(name)
-                        if existing:
-                            unify(existing.type, t, self.errors, f"assign {name}")
-                        else:
-                            sym.define(name, t)
-            elif isinstance(first, tuple) and first[0] in ("if","while","for","return","{",";"):
-                token_type = first[0]
-                if token_type == "return":
-                    exprnode = self._find_node(node, "ExpressionOpt")
-                    t = NULL
-                    if exprnode:
-                        t = self._infer_expression(exprnode, sym)
-                        unify(func_return, t, self.errors, "return")
-                elif token_type == "{":
-                    inner = self._find_node(node, "StatementList")
-                    if inner:
-                        self._infer_statement(["StatementList", inner[1]], sym, func_return)
-                else:
-                    for ch in node[1]:
-                        if isinstance(ch, list):
-                            self._infer_statement(ch, sym, func_return)
-        elif A == "StatementList":
-            for ch in node[1]:
-                self._infer_statement(ch, sym, func_return)
+            self.global_sym.define(func.symbol, func.name, ftype)
+            self.headers.append((func, ftype))
+
+    def _infer_parallel(self):
+        # cada corpo só depende das assinaturas globais e dos próprios locais
+        sig_vars: List[TypeVar] = []
+        sig_key: Dict[int, int] = {}
+        for _, ftype in self.headers:
+            for tv in ftype.param_types + [ftype.return_type]:
+                sig_key[tv.id] = len(sig_vars)
+                sig_vars.append(tv)
+        signatures = [_encode_type(ftype, sig_key, self.store) for _, ftype in self.headers]
+        # por symbol: com spawn os IDs dos nós vêm do INTERNER deste processo, não do worker
+        names = {}
+        for i, (func, _) in enumerate(self.headers):
+            names[func.symbol] = i
+
+        functions = [func for func, _ in self.headers]
+        workers = self.max_workers or os.cpu_count() or 1
+        size = max(1, -(-len(functions) // (workers * 4)))
+        starts = range(0, len(functions), size)
+        stops = [min(k + size, len(functions)) for k in starts]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(functions, signatures, names)) as pool:
+            results = list(pool.map(_infer_batch, starts, stops))
+
+        # erros por posição da função; a ordem dentro de cada função é preservada
+        located = [entry for errors, _, _ in results for entry in errors]
+        located.sort(key=lambda e: (e[0], e[1]))
+        for _, _, errors in located:
+            self.errors.extend(errors)
+
+        # só depois aplica, na ordem dos lotes, o que cada lote ligou nas assinaturas
+        for _, bindings, local_types in results:
+            local: Dict[int, TypeVar] = {}
+            for key, enc in bindings:
+                unify(sig_vars[key], _decode_type(enc, sig_vars.__getitem__, local, self.store),
+                      self.errors, "merge", self.store)
+            # os locais do lote compartilham `local` com as ligações: a mesma TypeVar do worker vira uma só aqui
+            for i, encoded in local_types:
+                self._locals[id(self.headers[i][0])] = {
+                    symbol: _decode_type(enc, sig_vars.__getitem__, local, self.store)
+                    for symbol, enc in encoded}
+
+    def _infer_function(self, func: FunctionDecl, ftype: FunctionType):
+        sym = self.global_sym
+        sym.push_scope()
+        try:
+            for param, ptype_var in zip(func.params, ftype.param_types):
+                sym.define(param.symbol, param.name, ptype_var)
+            self._infer_body(func.body, sym, ftype.return_type)
+            self._locals[id(func)] = {symbol: s.type for symbol, s in sym.current_items()}
+        finally:
+            sym.pop_scope()
+
+    def local_types(self, func: FunctionDecl) -> Dict[int, Type]:
+        """
+        Tipos dos parâmetros e variáveis de func, pelo symbol, como inferidos
+        (uma TypeVar é uma classe que ficou livre). Vazio se func não foi analisada aqui.
+        """
+        return self._locals.get(id(func), {})
+
+    # ---------- comandos ----------
+
+    def _infer_body(self, statements, sym: SymbolTable, func_return: Type):
+        handlers = self._statement_handlers
+        for st in statements:
+            handlers[type(st)](st, sym, func_return)
+
+    def _infer_Assignment(self, node: Assignment, sym: SymbolTable, func_return: Type):
+        t = self._infer_expression(node.expression, sym)
+        existing = sym.lookup(node.symbol)
+        if existing:
+            if unify(existing.type, t, self.errors, node, self.store) is FLOAT and resolve(existing.type, self.store) is INT:
+                # int recebendo float: a variável passa a float e o codegen promove os valores int
+                sym.define(node.symbol, node.name, FLOAT)
         else:
-            # fallback: traverse children
-            for ch in node[1]:
-                if isinstance(ch, list):
-                    self._infer_statement(ch, sym, func_return)
+            sym.define(node.symbol, node.name, t)
 
-    def _infer_expression(self, node, sym: SymbolTable) -> Type:
-        if node is None:
-            return ANY
-        if isinstance(node, tuple):
-            if node[0] == "IDENT":
-                s = sym.lookup(node[1])
-                if s:
-                    return s.type
-                g = self.global_sym.lookup(node[1])
-                if g:
-                    return g.type
-                tv = TypeVar()
-                sym.define(node[1], tv)
-                return tv
-            elif node[0] in ("INT","FLOAT","STRING","true","false","null"):
-                if node[0] == "INT":
-                    return INT
-                if node[0] == "FLOAT":
-                    return FLOAT
-                if node[0] == "STRING":
-                    return STRING
-                if node[0] == "true" or node[0]=="false":
-                    return BOOL
-                if node[0] == "null":
-                    return NULL
-            else:
-                return ANY
-
-        if isinstance(node, list):
-            A = node[0]
-            if A == "Expression":
-                left = self._infer_expression(node[1][0], sym)
-                if len(node[1])>1 and isinstance(node[1][1], list) and node[1][1][0]=="ExpressionRel":
-                    rel = node[1][1]
-                    if rel and len(rel[1])>0:
-                        right = self._infer_expression(rel[1][1], sym)
-                        unify(left, right, self.errors, "rel op")
-                        return BOOL
-                return left
-            if A == "AddExpr":
-                left = self._infer_expression(node[1][0], sym)
-                if len(node[1])>1 and isinstance(node[1][1], list) and node[1][1][0]=="AddExprPrime":
-                    return self._infer_addexprprime(left, node[1][1], sym)
-                return left
-            if A == "TermExpression":
-                left = self._infer_expression(node[1][0], sym)
-                if len(node[1])>1 and isinstance(node[1][1], list) and node[1][1][0]=="TermTail":
-                    return self._infer_termtail(left, node[1][1], sym)
-                return left
-            if A == "FactorExpression":
-                child = node[1][0]
-                if isinstance(child, tuple):
-                    if child[0] == "IDENT":
-                        return self._infer_expression(child, sym)
-                    if child[0] == "INT":
-                        return INT
-                    if child[0] == "FLOAT":
-                        return FLOAT
-                    if child[0] == "STRING":
-                        return STRING
-                    if child[0] == "true" or child[0]=="false":
-                        return BOOL
-                    if child[0] == "null":
-                        return NULL
-                if isinstance(child, list) and child[0]=="Expression":
-                    return self._infer_expression(child, sym)
-                if isinstance(child, tuple) and child[0]=="-":
-                    inner = node[1][1] if len(node[1])>1 else None
-                    t = self._infer_expression(inner, sym)
-                    if not is_number_type(t):
-                        self.errors.append(f"Unary - applied to non-number {t}")
-                    return t
-                return ANY
-            if A == "ExpressionOpt":
-                if len(node[1])==0:
-                    return NULL
-                return self._infer_expression(node[1][0], sym)
-            for ch in node[1]:
-                if isinstance(ch, list):
-                    return self._infer_expression(ch, sym)
-                if isinstance(ch, tuple) and ch[0] in ("INT","FLOAT","STRING","IDENT","true","false","null"):
-                    return self._infer_expression(ch, sym)
-        return ANY
+    def _infer_ExpressionStatement(self, node: ExpressionStatement, sym: SymbolTable, func_return: Type):
+        self._infer_expression(node.expression, sym)
 
-    def _infer_addexprprime(self, left, node, sym):
-        if not node[1]:
-            return left
-        op = node[1][0]
-        right_node = node[1][1]
-        rtype = self._infer_expression(right_node, sym)
-        if op and isinstance(op, list):
-            pass
-        if is_number_type(left) and is_number_type(rtype):
-            if resolve(left)==FLOAT or resolve(rtype)==FLOAT:
-                return FLOAT
+    def _infer_ReturnStatement(self, node: ReturnStatement, sym: SymbolTable, func_return: Type):
+        t = NULL
+        if node.expression is not None:
+            t = self._infer_expression(node.expression, sym)
+        if unify(func_return, t, self.errors, "return", self.store) is FLOAT:
+            # um return int seguido de um float: a função passa a devolver float
+            widen(func_return, self.store)
+
+    def _infer_Block(self, node: Block, sym: SymbolTable, func_return: Type):
+        self._infer_body(node.statements, sym, func_return)
+
+    def _infer_IfStatement(self, node: IfStatement, sym: SymbolTable, func_return: Type):
+        self._infer_expression(node.condition, sym)
+        self._infer_body(node.then_body, sym, func_return)
+        for clause in node.elsifs:
+            self._infer_expression(clause.condition, sym)
+            self._infer_body(clause.body, sym, func_return)
+        if node.else_body is not None:
+            self._infer_body(node.else_body, sym, func_return)
+
+    def _infer_WhileStatement(self, node: WhileStatement, sym: SymbolTable, func_return: Type):
+        self._infer_expression(node.condition, sym)
+        self._infer_body(node.body, sym, func_return)
+
+    def _infer_ForStatement(self, node: ForStatement, sym: SymbolTable, func_return: Type):
+        for expr in (node.init, node.condition, node.update):
+            if expr is not None:
+                self._infer_expression(expr, sym)
+        self._infer_body(node.body, sym, func_return)
+
+    # ---------- expressões ----------
+
+    def _infer_expression(self, node: Expression, sym: SymbolTable) -> Type:
+        return self._expression_handlers[type(node)](node, sym)
+
+    def _infer_Identifier(self, node: Identifier, sym: SymbolTable) -> Type:
+        s = sym.lookup(node.symbol)
+        if s:
+            return s.type
+        tv = TypeVar(self.store)
+        sym.define(node.symbol, node.name, tv)
+        return tv
+
+    def _infer_Literal(self, node: Literal, sym: SymbolTable) -> Type:
+        v = node.value
+        if v is None:
+            return NULL
+        if isinstance(v, bool):
+            return BOOL
+        if isinstance(v, int):
             return INT
-        if resolve(left)==STRING or resolve(rtype)==STRING:
+        if isinstance(v, float):
+            return FLOAT
+        if isinstance(v, str):
             return STRING
         return ANY
 
-    def _infer_termtail(self, left, node, sym):
-        if not node[1]:
-            return left
-        right_node = node[1][1]
-        rtype = self._infer_expression(right_node, sym)
-        if is_number_type(left) and is_number_type(rtype):
-            if resolve(left)==FLOAT or resolve(rtype)==FLOAT:
+    def _infer_UnaryExpr(self, node: UnaryExpr, sym: SymbolTable) -> Type:
+        t = self._infer_expression(node.right, sym)
+        if not is_number_type(t, self.store):
+            self.errors.append(f"Unary - applied to non-number {resolve_deep(t, self.store)}")
+        return t
+
+    def _infer_BinaryExpr(self, node: BinaryExpr, sym: SymbolTable) -> Type:
+        # cadeias a + b + c ... são aninhadas à esquerda: desce pela espinha
+        # iterativamente para não gastar um frame por operador
+        spine = []
+        while isinstance(node, BinaryExpr):
+            spine.append(node)
+            node = node.left
+        left = self._infer_expression(node, sym)
+        for node in reversed(spine):
+            right = self._infer_expression(node.right, sym)
+            left = self._binary_type(node.op, left, right)
+        return left
+
+    def _binary_type(self, op: str, left: Type, rtype: Type) -> Type:
+        if op in RELATIONAL_OPS:
+            unify(left, rtype, self.errors, "rel op", self.store)
+            return BOOL
+        store = self.store
+        if is_number_type(left, store) and is_number_type(rtype, store):
+            if resolve(left, store)==FLOAT or resolve(rtype, store)==FLOAT:
                 return FLOAT
             return INT
+        if op in ADDITIVE_OPS and (resolve(left, store)==STRING or resolve(rtype, store)==STRING):
+            return STRING
         return ANY
-
-    def _find_node(self, node, name):
-        if not isinstance(node, list):
-            return None
-        if node[0] == name:
-            return node
-        for ch in node[1]:
-            if isinstance(ch, list):
-                r = self._find_node(ch, name)
-                if r:
-                    return r
-        return None
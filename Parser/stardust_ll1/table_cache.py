@@ -0,0 +1,49 @@
+import hashlib
+import json
+import marshal
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+# mude ao alterar o formato gravado ou a construção da tabela
+CACHE_VERSION = 1
+
+Table = Dict[Tuple[str, str], List[str]]
+
+def cache_dir() -> str:
+    return os.environ.get("STARDUST_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "stardust")
+
+def spec_hash(G) -> str:
+    data = json.dumps([CACHE_VERSION, G], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def _path(key: str) -> str:
+    return os.path.join(cache_dir(), f"ll1-{key}.bin")
+
+def load(key: str) -> Optional[Table]:
+    try:
+        with open(_path(key), "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+def store(key: str, table: Table):
+    # grava num temporário e renomeia: leitores concorrentes nunca veem arquivo parcial
+    path = _path(key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(table, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def load_or_build(G, build: Callable[[dict], Table]) -> Table:
+    """Tabela LL(1) de G, lida do cache ou construída por build(G) e gravada."""
+    key = spec_hash(G)
+    table = load(key)
+    if table is None:
+        table = build(G)
+        store(key, table)
+    return table
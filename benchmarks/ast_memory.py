@@ -0,0 +1,76 @@
+"""
+Memória da AST: gera um programa sintético com ~N nós, monta a AST com
+LL1Parser.parse_ast e mede com tracemalloc quantos bytes ficam retidos por nó.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.ast_memory [--nodes 1000000]
+"""
+import argparse
+import dataclasses
+import sys
+import tracemalloc
+
+from Parser.stardust_ll1 import LL1Parser, tokenize_buffer
+from Parser.stardust_ll1.ast_nodes import ASTNode
+
+# cada comando "vI = vI + pJ * K;" rende 6 nós:
+# Assignment, BinaryExpr(+), Identifier, BinaryExpr(*), Identifier, Literal
+NODES_PER_STATEMENT = 6
+STATEMENTS_PER_FUNCTION = 50
+
+
+def synthetic_program(nodes: int) -> str:
+    statements = max(1, nodes // NODES_PER_STATEMENT)
+    lines = []
+    for f in range(0, statements, STATEMENTS_PER_FUNCTION):
+        lines.append(f"function f{f}(p0, p1, p2) {{")
+        for i in range(f, min(f + STATEMENTS_PER_FUNCTION, statements)):
+            lines.append(f"  v{i % 17} = v{i % 17} + p{i % 3} * {i};")
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def iter_nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ASTNode):
+            yield node
+            stack.extend(getattr(node, f.name) for f in dataclasses.fields(node))
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--nodes", type=int, default=1_000_000)
+    args = ap.parse_args(argv)
+
+    source = synthetic_program(args.nodes)
+    tokens = tokenize_buffer(source)
+    parser = LL1Parser()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    program = parser.parse_ast(tokens)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    counts = {}
+    for node in iter_nodes(program):
+        counts[type(node).__name__] = counts.get(type(node).__name__, 0) + 1
+    total = sum(counts.values())
+
+    print(f"fonte: {len(source) / 1e6:.1f} MB, {len(tokens)} tokens")
+    print(f"nós:   {total}")
+    print(f"AST:   {retained / 1e6:.1f} MB retidos, {retained / total:.1f} bytes/nó "
+          f"(inclui listas e strings dos nomes)")
+    print()
+    print(f"{'classe':<20}{'qtd':>10}{'bytes/instância':>18}")
+    for name, n in sorted(counts.items(), key=lambda kv: -kv[1]):
+        sample = next(x for x in iter_nodes(program) if type(x).__name__ == name)
+        print(f"{name:<20}{n:>10}{sys.getsizeof(sample):>18}")
+
+
+if __name__ == "__main__":
+    main()
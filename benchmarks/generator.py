@@ -0,0 +1,204 @@
+"""
+Gerador de programas StarDust para os benchmarks. Tudo sai de um
+random.Random(seed), então a mesma (forma, tamanho, semente) gera sempre o
+mesmo texto.
+
+Só usa construções de make_grammar() que o lexer de stardust_ll1 aceita: ele
+não tem "%", e "<=", ">=" e "//" viram dois tokens, então ficam de fora. As
+variáveis mantêm um tipo só (iN inteiras, fN reais, sN strings), para que o
+SemanticAnalyzer percorra o programa inteiro sem acumular erros.
+
+Formas (SHAPES):
+    functions    N funções com comandos variados (atribuições, if, while, for, blocos)
+    if_chain     funções com cadeias if/elsif/else de N ramos, alguns aninhados
+    expressions  expressões longas, com N termos no total
+    strings      N atribuições de strings longas e concatenações
+    comments     como functions, com comentários "//" entre as linhas; só o lexer
+                 de AFD (Lexer/) conhece comentários
+"""
+import random
+from typing import List
+
+SHAPES = ("functions", "if_chain", "expressions", "strings", "comments")
+
+INT_VARS = 6
+FLOAT_VARS = 2
+STRING_VARS = 3
+
+_WORDS = ("estrela", "poeira", "cometa", "orbita", "nebulosa", "galaxia", "pulsar", "quasar")
+
+
+class ProgramGenerator:
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self._lines: List[str] = []
+        self._indent = 0
+        self._functions = 0
+
+    def generate(self, shape: str, size: int) -> str:
+        if shape not in SHAPES:
+            raise ValueError(f"forma desconhecida: {shape!r} (opções: {', '.join(SHAPES)})")
+        self._lines = []
+        self._functions = 0
+        getattr(self, "_shape_" + shape)(size)
+        return "\n".join(self._lines) + "\n"
+
+    # ---------- formas ----------
+
+    def _shape_functions(self, size: int):
+        for _ in range(size):
+            self._function(lambda: self._statements(8, depth=0))
+
+    def _shape_if_chain(self, size: int):
+        per_function = 100
+        for start in range(0, size, per_function):
+            self._function(lambda: self._if_chain(min(per_function, size - start), nested=3))
+
+    def _shape_expressions(self, size: int):
+        per_statement = 500
+        def body():
+            for start in range(0, size, per_statement):
+                var = f"i{self.rng.randrange(INT_VARS)}"
+                self._emit(f"{var} = {self._int_expr(min(per_statement, size - start))};")
+        self._function(body)
+
+    def _shape_strings(self, size: int):
+        per_function = 200
+        for start in range(0, size, per_function):
+            def body(count=min(per_function, size - start)):
+                for _ in range(count):
+                    var = f"s{self.rng.randrange(STRING_VARS)}"
+                    if self.rng.random() < 0.3:
+                        self._emit(f"{var} = {var} + {self._string(self.rng.randint(5, 40))};")
+                    else:
+                        self._emit(f"{var} = {self._string(self.rng.randint(20, 160))};")
+            self._function(body)
+
+    def _shape_comments(self, size: int):
+        self._shape_functions(size)
+        commented = []
+        for line in self._lines:
+            for _ in range(self.rng.randint(1, 3)):
+                indent = line[:len(line) - len(line.lstrip())]
+                commented.append(f"{indent}// {self._words(self.rng.randint(4, 14))}")
+            commented.append(line)
+        self._lines = commented
+
+    # ---------- comandos ----------
+
+    def _function(self, body):
+        name = f"fun{self._functions}"
+        self._functions += 1
+        params = ", ".join(f"p{k}" for k in range(self.rng.randint(0, 3)))
+        self._emit(f"function {name}({params}) {{")
+        self._indent += 1
+        # declara as variáveis com o tipo que vão manter
+        for k in range(INT_VARS):
+            self._emit(f"i{k} = {self.rng.randint(1, 99)};")
+        for k in range(FLOAT_VARS):
+            self._emit(f"f{k} = {self.rng.randint(0, 99)}.{self.rng.randint(0, 99)};")
+        for k in range(STRING_VARS):
+            self._emit(f"s{k} = {self._string(12)};")
+        body()
+        self._emit(f"return i{self.rng.randrange(INT_VARS)};")
+        self._indent -= 1
+        self._emit("}")
+
+    def _statements(self, count: int, depth: int):
+        for _ in range(count):
+            kind = self.rng.random()
+            if depth < 3 and kind < 0.12:
+                self._if_chain(self.rng.randint(0, 4), nested=0, depth=depth)
+            elif depth < 3 and kind < 0.2:
+                var = f"i{self.rng.randrange(INT_VARS)}"
+                self._block(f"while ({var} < {self.rng.randint(10, 99)})", depth,
+                            extra=f"{var} = {var} + 1;")
+            elif depth < 3 and kind < 0.26:
+                var = f"i{self.rng.randrange(INT_VARS)}"
+                self._block(f"for ({var}; {var} < {self.rng.randint(10, 99)}; {var} + 1)", depth)
+            elif depth < 3 and kind < 0.3:
+                self._block("", depth)
+            elif kind < 0.32:
+                self._emit(";")
+            elif kind < 0.45:
+                self._emit(f"f{self.rng.randrange(FLOAT_VARS)} = {self._float_expr(self.rng.randint(1, 6))};")
+            elif kind < 0.55:
+                var = f"s{self.rng.randrange(STRING_VARS)}"
+                self._emit(f"{var} = s{self.rng.randrange(STRING_VARS)} + {self._string(self.rng.randint(3, 20))};")
+            else:
+                self._emit(f"i{self.rng.randrange(INT_VARS)} = {self._int_expr(self.rng.randint(1, 8))};")
+
+    def _block(self, head: str, depth: int, extra: str = ""):
+        self._emit(f"{head} {{".lstrip())
+        self._indent += 1
+        self._statements(self.rng.randint(1, 3), depth + 1)
+        if extra:
+            self._emit(extra)
+        self._indent -= 1
+        self._emit("}")
+
+    def _if_chain(self, elsifs: int, nested: int, depth: int = 0):
+        # ramos com um comando simples; `nested` deles ganham um if próprio
+        inner = set(self.rng.sample(range(elsifs + 1), min(nested, elsifs + 1)))
+        for k in range(elsifs + 1):
+            head = "if" if k == 0 else "} elsif"
+            self._emit(f"{head} ({self._condition()}) {{")
+            self._indent += 1
+            if k in inner:
+                self._if_chain(self.rng.randint(1, 5), nested=0, depth=depth + 1)
+            else:
+                self._statements(1, depth + 3)
+            self._indent -= 1
+        self._emit("} else {")
+        self._indent += 1
+        self._statements(1, depth + 3)
+        self._indent -= 1
+        self._emit("}")
+
+    # ---------- expressões ----------
+
+    def _condition(self) -> str:
+        op = self.rng.choice(("<", ">", "==", "!="))
+        return f"{self._int_expr(self.rng.randint(1, 3))} {op} {self._int_expr(self.rng.randint(1, 3))}"
+
+    def _int_operand(self) -> str:
+        r = self.rng.random()
+        if r < 0.55:
+            return f"i{self.rng.randrange(INT_VARS)}"
+        if r < 0.9:
+            return str(self.rng.randint(1, 999))
+        return f"-{self.rng.randint(1, 9)}"
+
+    def _int_expr(self, terms: int) -> str:
+        parts = [self._int_operand()]
+        for _ in range(terms - 1):
+            op = self.rng.choice(("+", "-", "*", "/"))
+            # divisor literal e não nulo: o programa também pode ser executado
+            operand = str(self.rng.randint(1, 9)) if op == "/" else self._int_operand()
+            if self.rng.random() < 0.1:
+                operand = f"({operand} + {self._int_operand()})"
+            parts.append(f"{op} {operand}")
+        return " ".join(parts)
+
+    def _float_expr(self, terms: int) -> str:
+        parts = [f"f{self.rng.randrange(FLOAT_VARS)}"]
+        for _ in range(terms - 1):
+            op = self.rng.choice(("+", "-", "*"))
+            operand = f"{self.rng.randint(0, 9)}.{self.rng.randint(1, 9)}" if self.rng.random() < 0.5 \
+                else f"f{self.rng.randrange(FLOAT_VARS)}"
+            parts.append(f"{op} {operand}")
+        return " ".join(parts)
+
+    def _words(self, count: int) -> str:
+        return " ".join(self.rng.choice(_WORDS) for _ in range(count))
+
+    def _string(self, length: int) -> str:
+        text = self._words(max(1, length // 7))[:length]
+        return f'"{text}"'
+
+    def _emit(self, line: str):
+        self._lines.append("    " * self._indent + line)
+
+
+def generate(shape: str, size: int, seed: int = 0) -> str:
+    return ProgramGenerator(seed).generate(shape, size)
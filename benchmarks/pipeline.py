@@ -0,0 +1,231 @@
+"""
+Benchmark do pipeline por fase: gera programas com benchmarks.generator e
+mede, para cada forma, tempo, vazão (tokens/s, linhas/s) e pico de memória de
+cada fase (lexer de AFD, lexer, parser, semântico, otimização da AST,
+codegen, otimizador).
+
+Os tempos são o melhor de --repeat execuções sem tracemalloc; o pico de
+memória vem de uma execução extra com tracemalloc ligado. As fases são as
+marcadas pelas próprias etapas (stardust_ll1.instrumentation). Uma fase que
+falha (ex.: o parser nos comentários // da forma comments) encerra a carga:
+ela e as seguintes ficam fora da tabela, e o erro aparece como "parou em".
+
+Com --baseline ARQ compara com um resultado gravado antes e termina com código
+1 se alguma fase ficou mais lenta que a tolerância (ou deixou de rodar). Os
+números dependem da máquina: regrave o baseline com --save-baseline na máquina
+onde a comparação vai rodar.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.pipeline [--scale 1.0] [--repeat 3] [--only forma ...]
+                                  [--baseline benchmarks/baseline.json [--tolerance 0.25]]
+                                  [--save-baseline benchmarks/baseline.json]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+from typing import Dict, Optional, Tuple
+
+from Parser.stardust_ll1 import LL1Parser, tokenize_buffer, instrumentation
+from Parser.stardust_ll1.semantic import SemanticAnalyzer
+from Parser.stardust_ll1.ast_optimizer import ASTOptimizer
+
+from .generator import SHAPES, generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# versão do formato do JSON gravado
+FORMAT_VERSION = 1
+
+# tamanho de cada forma com --scale 1 (ver generator.SHAPES)
+SIZES = {
+    "functions": 200,
+    "if_chain": 1000,
+    "expressions": 20_000,
+    "strings": 4000,
+    "comments": 200,
+}
+
+PHASES = ("dfa_lexer", "lexer", "parser", "semantic", "ast_optimizer", "codegen", "optimizer")
+
+# diferenças abaixo disto são ruído de medição, não regressão
+TIME_SLACK = 0.002
+MEMORY_SLACK = 64 * 1024
+
+
+def _load_dfa_lexer():
+    # Lexer/ usa imports planos (roda de dentro da própria pasta); carrega o
+    # main.py de lá com outro nome para não colidir com o main.py da raiz
+    lexer_dir = os.path.join(ROOT, "Lexer")
+    if lexer_dir not in sys.path:
+        sys.path.insert(0, lexer_dir)
+    spec = importlib.util.spec_from_file_location("stardust_dfa_lexer", os.path.join(lexer_dir, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Pipeline:
+    def __init__(self):
+        self.parser = LL1Parser(pause_gc=True)
+        self.dfa = _load_dfa_lexer()
+        self.afd = self.dfa.lexer_afd()
+        self._otimizador = None
+
+    def otimizador(self):
+        # llvmlite só é importado se alguma carga chegar ao otimizador
+        if self._otimizador is None:
+            from codegen.otimizador import Otimizador
+            self._otimizador = Otimizador()
+        return self._otimizador
+
+    def run(self, source: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Roda todas as fases sobre source. Devolve (fase, erro) da fase que
+        encerrou a carga, ou (None, None) se todas rodaram.
+        """
+        with instrumentation.phase("dfa_lexer"):
+            tokens = self.dfa.tokenize(source, self.afd)
+            instrumentation.count("dfa_lexer.tokens", len(tokens))
+        stage = "lexer"
+        try:
+            buffer = tokenize_buffer(source)
+            stage = "parser"
+            program = self.parser.parse_ast(buffer)
+            stage = "semantic"
+            analyzer = SemanticAnalyzer()
+            analyzer.analyze(program)
+            if analyzer.errors:
+                # a análise em si rodou inteira: a fase conta, as seguintes não
+                return None, f"semantic: {analyzer.errors[0]}"
+            stage = "ast_optimizer"
+            ASTOptimizer(analyzer).optimize(program)
+            stage = "codegen"
+            from codegen.gerador_codigo import GeradorCodigo
+            modulo = GeradorCodigo(analisador=analyzer).gerar_modulo(program)
+            stage = "optimizer"
+            self.otimizador().otimizar_modulo(modulo)
+        except Exception as e:
+            return stage, f"{stage}: {str(e).splitlines()[0]}"
+        return None, None
+
+
+def measure(pipeline: Pipeline, source: str, repeat: int) -> dict:
+    lines = source.count("\n") + 1
+    best: Dict[str, float] = {}
+    counters: Dict[str, dict] = {}
+    failed = error = None
+    for _ in range(repeat):
+        with instrumentation.profiling(instrumentation.Profiler(memory=False)) as prof:
+            failed, error = pipeline.run(source)
+        for path, stats in prof.stats.items():
+            if len(path) == 1:
+                best[path[0]] = min(best.get(path[0], float("inf")), stats.wall)
+                counters[path[0]] = stats.counters
+    with instrumentation.profiling(instrumentation.Profiler(memory=True)) as prof:
+        pipeline.run(source)
+    peaks = {path[0]: stats.peak_bytes for path, stats in prof.stats.items() if len(path) == 1}
+
+    # tokens do lexer de stardust_ll1; sem ele (não deveria acontecer), os do AFD
+    tokens = counters.get("lexer", {}).get("lexer.tokens") or counters["dfa_lexer"]["dfa_lexer.tokens"]
+    phases = {}
+    for name in PHASES:
+        if name not in best or name == failed:
+            continue
+        seconds = best[name]
+        n = counters[name].get("dfa_lexer.tokens", tokens) if name == "dfa_lexer" else tokens
+        phases[name] = {
+            "seconds": round(seconds, 6),
+            "tokens_per_s": round(n / seconds) if seconds else None,
+            "lines_per_s": round(lines / seconds) if seconds else None,
+            "peak_bytes": peaks.get(name, 0),
+        }
+    return {"lines": lines, "bytes": len(source.encode("utf-8")), "tokens": tokens,
+            "phases": phases, "stopped": error}
+
+
+def run_suite(shapes, scale: float, seed: int, repeat: int) -> dict:
+    pipeline = Pipeline()
+    results = {}
+    for shape in shapes:
+        source = generate(shape, max(1, round(SIZES[shape] * scale)), seed)
+        results[shape] = measure(pipeline, source, repeat)
+    return {
+        "format": FORMAT_VERSION,
+        "seed": seed,
+        "scale": scale,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float, memory_tolerance: float):
+    """Lista de (forma, fase, descrição) das regressões em relação a baseline."""
+    if (baseline.get("seed"), baseline.get("scale")) != (current["seed"], current["scale"]):
+        raise ValueError(f"baseline gerado com seed={baseline.get('seed')} scale={baseline.get('scale')}; "
+                         f"rode com os mesmos valores")
+    regressions = []
+    for shape, base in baseline["results"].items():
+        now = current["results"].get(shape)
+        if now is None:
+            continue
+        for name, b in base["phases"].items():
+            c = now["phases"].get(name)
+            if c is None:
+                regressions.append((shape, name, f"deixou de rodar ({now['stopped']})"))
+                continue
+            if c["seconds"] - b["seconds"] > max(b["seconds"] * tolerance, TIME_SLACK):
+                regressions.append((shape, name, f"tempo {c['seconds'] / b['seconds']:.2f}x o baseline"))
+            if c["peak_bytes"] - b["peak_bytes"] > max(b["peak_bytes"] * memory_tolerance, MEMORY_SLACK):
+                regressions.append((shape, name, f"memória {c['peak_bytes'] / max(b['peak_bytes'], 1):.2f}x o baseline"))
+    return regressions
+
+
+def report(current: dict, baseline: Optional[dict]):
+    print(f"{'forma':<13}{'fase':<15}{'tempo (ms)':>11}{'tokens/s':>12}{'linhas/s':>11}{'pico (KiB)':>12}{'vs base':>9}")
+    for shape, result in current["results"].items():
+        base = (baseline or {}).get("results", {}).get(shape, {}).get("phases", {})
+        for name, p in result["phases"].items():
+            ratio = f"{p['seconds'] / base[name]['seconds']:.2f}x" if base.get(name, {}).get("seconds") else "-"
+            print(f"{shape:<13}{name:<15}{p['seconds'] * 1000:>11.2f}{p['tokens_per_s'] or 0:>12,}"
+                  f"{p['lines_per_s'] or 0:>11,}{p['peak_bytes'] / 1024:>12.0f}{ratio:>9}")
+        if result["stopped"]:
+            print(f"{shape:<13}{'':<15}parou em: {result['stopped']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--scale", type=float, default=1.0, help="multiplica o tamanho de cada forma")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", nargs="+", choices=SHAPES, default=list(SHAPES))
+    ap.add_argument("--baseline", metavar="ARQ", help="compara com um resultado gravado")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="lentidão aceita por fase (0.25 = 25%%)")
+    ap.add_argument("--memory-tolerance", type=float, default=0.10, help="aumento de pico de memória aceito")
+    ap.add_argument("--save-baseline", metavar="ARQ", help="grava o resultado como novo baseline")
+    args = ap.parse_args(argv)
+
+    current = run_suite(args.only, args.scale, args.seed, args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(current, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+    if baseline is None:
+        return 0
+    regressions = compare(current, baseline, args.tolerance, args.memory_tolerance)
+    for shape, name, what in regressions:
+        print(f"REGRESSÃO {shape}/{name}: {what}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
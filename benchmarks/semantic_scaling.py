@@ -0,0 +1,79 @@
+"""
+Escalabilidade do SemanticAnalyzer: analisa programas sintéticos de tamanho
+crescente (dobrando a cada passo) e mostra o tempo por nó, que deve ficar
+aproximadamente constante se a análise for linear.
+
+Com --parallel mede também a análise num pool de processos (sem o limite
+mínimo de funções) e mostra o ponto de equilíbrio: o menor programa em que o
+pool ganhou da análise sequencial. Dele vem semantic.MIN_PARALLEL_FUNCTIONS,
+abaixo do qual SemanticAnalyzer(parallel=True) continua sequencial. Com fork
+e 4 processos um programa de ~300 funções ainda levou 3x o tempo sequencial
+(0,047 s contra 0,014 s), e até 534 funções o pool não ganhou em nenhuma
+medição; 2000 deixa margem para o custo fixo do pool. Com spawn (Windows,
+macOS) esse custo passa de 1 s e o equilíbrio fica muito mais alto. Com uma
+CPU só o pool nunca ganha, e o analisador nem o usa.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.semantic_scaling [--nodes 50000] [--steps 5]
+                                          [--parallel [--workers 4] [--start-method fork]]
+"""
+import argparse
+import multiprocessing
+import time
+
+from Parser.stardust_ll1 import LL1Parser, tokenize_buffer
+from Parser.stardust_ll1.semantic import SemanticAnalyzer, MIN_PARALLEL_FUNCTIONS
+
+from .ast_memory import synthetic_program, iter_nodes
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--nodes", type=int, default=50_000)
+    ap.add_argument("--steps", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--parallel", action="store_true", help="compara com a análise no pool de processos")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--start-method", choices=multiprocessing.get_all_start_methods())
+    args = ap.parse_args(argv)
+    if args.start_method:
+        multiprocessing.set_start_method(args.start_method, force=True)
+
+    parser = LL1Parser()
+    header = f"{'nós':>10}{'funções':>9}{'tempo (s)':>12}{'µs/nó':>10}{'razão':>8}"
+    print(header + (f"{'pool (s)':>11}{'pool/seq':>10}" if args.parallel else ""))
+    previous = None
+    break_even = None
+    for step in range(args.steps):
+        program = parser.parse_ast(tokenize_buffer(synthetic_program(args.nodes << step)))
+        nodes = sum(1 for _ in iter_nodes(program))
+        functions = len(program.functions)
+        best = _best(program, args.repeat)
+        ratio = f"{best / previous:.2f}" if previous else "-"
+        line = f"{nodes:>10}{functions:>9}{best:>12.4f}{best / nodes * 1e6:>10.2f}{ratio:>8}"
+        if args.parallel:
+            pooled = _best(program, args.repeat, parallel=True, max_workers=args.workers, min_parallel=0)
+            line += f"{pooled:>11.4f}{pooled / best:>10.2f}"
+            if pooled < best and break_even is None:
+                break_even = functions
+        print(line)
+        previous = best
+    if args.parallel:
+        if break_even is None:
+            print(f"o pool não ganhou até {functions} funções (MIN_PARALLEL_FUNCTIONS = {MIN_PARALLEL_FUNCTIONS})")
+        else:
+            print(f"ponto de equilíbrio: ~{break_even} funções (MIN_PARALLEL_FUNCTIONS = {MIN_PARALLEL_FUNCTIONS})")
+
+
+def _best(program, repeat: int, **options) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        analyzer = SemanticAnalyzer(**options)
+        t0 = time.perf_counter()
+        analyzer.analyze(program)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    main()
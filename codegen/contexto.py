@@ -0,0 +1,138 @@
+"""
+Contexto LLVM de longa duração: inicializa o LLVM uma vez por processo e
+guarda a target machine e o motor MCJIT, em vez de refazer tudo a cada
+GeradorCodigo/Otimizador.
+
+    ctx = contexto_padrao()
+    gerador = GeradorCodigo(ctx)
+    modulo = Otimizador(contexto=ctx).otimizar_modulo(gerador.gerar_modulo(ast))
+    with ctx.jit(modulo) as programa:
+        print(programa.funcao("main")())
+
+O llvmlite só converte ir.Module em módulo do LLVM passando pelo texto do IR;
+essa conversão acontece uma única vez (para_llvm). Daí em diante otimizador e
+JIT trabalham sobre o mesmo ModuleRef, sem imprimir e reler o IR.
+"""
+import ctypes
+from typing import Callable, Optional, Union
+
+from llvmlite import ir, binding
+
+_inicializado = False
+
+
+def inicializar_llvm():
+    """Inicializa o LLVM e o alvo nativo; chamadas seguintes não fazem nada."""
+    global _inicializado
+    if not _inicializado:
+        binding.initialize()
+        binding.initialize_native_target()
+        binding.initialize_native_asmprinter()
+        _inicializado = True
+
+
+# tipos do IR (como impressos pelo LLVM) -> ctypes, para chamar funções do JIT
+_CTYPES = {
+    "void": None,
+    "i1": ctypes.c_bool,
+    "i8": ctypes.c_int8,
+    "i32": ctypes.c_int32,
+    "i64": ctypes.c_int64,
+    "float": ctypes.c_float,
+    "double": ctypes.c_double,
+    "i8*": ctypes.c_char_p,
+}
+
+
+def _ctype(tipo: str):
+    if tipo in _CTYPES:
+        return _CTYPES[tipo]
+    if tipo.endswith("*"):
+        return ctypes.c_void_p
+    raise TypeError(f"tipo sem equivalente em ctypes: {tipo}")
+
+
+class ProgramaJIT:
+    """Módulo carregado no motor MCJIT; fechar() o descarrega."""
+
+    def __init__(self, motor: binding.ExecutionEngine, modulo: binding.ModuleRef):
+        self._motor = motor
+        self.modulo = modulo
+        self._funcoes = {}
+
+    def funcao(self, nome: str) -> Callable:
+        """A função nome compilada, chamável do Python com a assinatura do IR."""
+        chamavel = self._funcoes.get(nome)
+        if chamavel is None:
+            if self._motor is None:
+                raise RuntimeError("programa JIT já foi fechado")
+            valor = self.modulo.get_function(nome)
+            retorno, *params = (str(t) for t in valor.type.element_type.elements)
+            prototipo = ctypes.CFUNCTYPE(_ctype(retorno), *(_ctype(t) for t in params))
+            chamavel = self._funcoes[nome] = prototipo(self._motor.get_function_address(nome))
+        return chamavel
+
+    def fechar(self):
+        if self._motor is not None:
+            # sem isso o próximo programa com uma função de mesmo nome resolveria para esta
+            self._motor.remove_module(self.modulo)
+            self._motor = None
+            self._funcoes.clear()
+
+    def __enter__(self) -> "ProgramaJIT":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class ContextoLLVM:
+    def __init__(self, opt_level: int = 2):
+        inicializar_llvm()
+        self.target = binding.Target.from_default_triple()
+        self.target_machine = self.target.create_target_machine(opt=opt_level)
+        self.triple = self.target.triple
+        self.data_layout = str(self.target_machine.target_data)
+        self._motor: Optional[binding.ExecutionEngine] = None
+
+    def novo_modulo(self, nome: str = "module") -> ir.Module:
+        modulo = ir.Module(name=nome)
+        modulo.triple = self.triple
+        modulo.data_layout = self.data_layout
+        return modulo
+
+    def para_llvm(self, modulo: Union[str, ir.Module, binding.ModuleRef]) -> binding.ModuleRef:
+        """Converte (uma vez) IR em texto ou ir.Module num ModuleRef verificado."""
+        if isinstance(modulo, binding.ModuleRef):
+            return modulo
+        ref = binding.parse_assembly(str(modulo))
+        ref.verify()
+        ref.triple = self.triple
+        ref.data_layout = self.data_layout
+        return ref
+
+    @property
+    def motor(self) -> binding.ExecutionEngine:
+        # um único motor MCJIT por contexto; os programas entram e saem como módulos
+        if self._motor is None:
+            self._motor = binding.create_mcjit_compiler(binding.parse_assembly(""), self.target_machine)
+        return self._motor
+
+    def jit(self, modulo: Union[str, ir.Module, binding.ModuleRef]) -> ProgramaJIT:
+        ref = self.para_llvm(modulo)
+        motor = self.motor
+        motor.add_module(ref)
+        motor.finalize_object()
+        motor.run_static_constructors()
+        return ProgramaJIT(motor, ref)
+
+
+_padrao: Optional[ContextoLLVM] = None
+
+
+def contexto_padrao() -> ContextoLLVM:
+    """O ContextoLLVM do processo, criado na primeira chamada."""
+    global _padrao
+    if _padrao is None:
+        _padrao = ContextoLLVM()
+    return _padrao
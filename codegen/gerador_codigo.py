@@ -1,29 +1,219 @@
-from llvmlite import ir, binding
+"""
+Geração de LLVM IR a partir da AST.
+
+Para a AST do LL1Parser os tipos vêm do SemanticAnalyzer: int vira i32, float
+double, bool i1 e string i8* (literais como arrays constantes globais). Um
+valor int guardado numa variável (ou devolvido por uma função) que a
+inferência alargou para float é promovido com sitofp.
+
+Uma função cujos parâmetros ficaram polimórficos (TypeVars livres, como em
+function id(x) { return x; }) é gerada com int nesses parâmetros sob o próprio
+nome; especializar(nome, tipos) gera outra instância, id.float, id.string
+etc., com o corpo inferido de novo para esses tipos. As instâncias ficam num
+CacheInstancias, com um limite de especializações por função.
+"""
+from typing import Callable, Dict, List, Tuple
+
+from llvmlite import ir
+
+from Parser.stardust_ll1 import instrumentation
+from Parser.stardust_ll1.ast_nodes import BinaryExpr
+from Parser.stardust_ll1.semantic import (
+    SemanticAnalyzer, Type, FunctionType, TypeVar, INT, FLOAT, BOOL, STRING, ANY, resolve,
+)
+from codegen.contexto import contexto_padrao
+
+_COMPARACOES = frozenset(("==", "!=", "<", ">", "<=", ">="))
+
+class CodegenError(Exception):
+    """Construção que o gerador não sabe traduzir (ou especialização inválida)."""
+
+_I1 = ir.IntType(1)
+_I8_PTR = ir.IntType(8).as_pointer()
+_I32 = ir.IntType(32)
+# size_t das funções da libc (alvos de 64 bits)
+_SIZE_T = ir.IntType(64)
+_DOUBLE = ir.DoubleType()
+
+# tipo do SemanticAnalyzer -> tipo do IR; os demais (any, null, TypeVar livre) não têm um fixo
+_TIPOS = {INT: _I32, FLOAT: _DOUBLE, BOOL: _I1, STRING: _I8_PTR}
+
+# promoções sem perda aceitas num argumento, como no unify (int encontra float), em ordem de distância
+_PROMOCOES = {BOOL: (INT, FLOAT), INT: (FLOAT,)}
+_NUMEROS = frozenset((BOOL, INT, FLOAT))
+
+def _polimorfico(tipo):
+    # sem tipo concreto: variável livre, ou any quando a inferência desistiu (ex.: x * 2 com x livre)
+    return isinstance(tipo, TypeVar) or tipo is ANY
+
+def _promocoes(tipos, destino):
+    """Custo de promover argumentos de tipos para destino (bool -> float vale 2), ou None se algum não pode."""
+    custo = 0
+    for tipo, alvo in zip(tipos, destino):
+        if tipo is not alvo:
+            promocoes = _PROMOCOES.get(tipo, ())
+            if alvo not in promocoes:
+                return None
+            custo += promocoes.index(alvo) + 1
+    return custo
+
+class CacheInstancias:
+    """
+    Instâncias das funções por (nome da função, tipos dos parâmetros).
+
+    Cada função tem a instância padrão (parâmetros polimórficos como int) e no
+    máximo `limite` especializações além dela. Passado o limite, uma
+    combinação nova de tipos vai pelo caminho genérico: a instância existente
+    que aceita os argumentos com menos promoções (bool -> int -> float) ou,
+    se nenhuma aceita, a genérica, com os parâmetros numéricos em float.
+    """
+
+    def __init__(self, limite: int = 8):
+        if limite < 0:
+            raise ValueError("limite de especializações não pode ser negativo")
+        self.limite = limite
+        self._valores: Dict[Tuple[str, Tuple[Type, ...]], object] = {}
+        self._especializacoes: Dict[str, List[Tuple[Type, ...]]] = {}
+        self.acertos = 0
+        self.geradas = 0
+        self.genericas = 0
+
+    def __len__(self):
+        return len(self._valores)
+
+    def obter(self, nome: str, tipos: Tuple[Type, ...], padrao: Tuple[Type, ...],
+              generica: Tuple[Type, ...], criar: Callable[[Tuple[Type, ...]], object]):
+        """
+        A instância de nome para tipos, criada com criar(tipos) na primeira
+        vez. padrao são os tipos da instância padrão da função e generica os
+        da instância do caminho genérico (tipos tem de ser promovível a ela).
+        """
+        valor = self._valores.get((nome, tipos))
+        if valor is not None:
+            self.acertos += 1
+            return valor
+        especializacoes = self._especializacoes.setdefault(nome, [])
+        if tipos == padrao or len(especializacoes) < self.limite:
+            valor = self._criar(nome, tipos, criar)
+            if tipos != padrao:
+                especializacoes.append(tipos)
+            return valor
+
+        self.genericas += 1
+        instrumentation.count("codegen.instances_generic", 1)
+        melhor = None
+        for candidato in especializacoes + [padrao]:
+            custo = _promocoes(tipos, candidato)
+            if custo is not None and (melhor is None or custo < melhor[0]):
+                melhor = (custo, candidato)
+        destino = generica if melhor is None else melhor[1]
+        valor = self._valores.get((nome, destino))
+        if valor is None:
+            # a padrão ainda não gerada, ou a genérica da primeira vez: fora do limite
+            valor = self._criar(nome, destino, criar)
+        return valor
+
+    def _criar(self, nome, tipos, criar):
+        valor = self._valores[(nome, tipos)] = criar(tipos)
+        self.geradas += 1
+        instrumentation.count("codegen.instances", 1)
+        return valor
 
 class GeradorCodigo:
-    def __init__(self):
-        self.modulo = ir.Module(name="module")
+    def __init__(self, contexto=None, analisador=None, limite_instancias=8):
+        # o LLVM é inicializado uma vez por processo, no contexto compartilhado
+        self.contexto = contexto or contexto_padrao()
+        self.modulo = self.contexto.novo_modulo()
+        # SemanticAnalyzer que já analisou o Program; sem ele _gerar_Program roda um
+        self.analisador = analisador
         self.builder = None
         self.funcao_atual = None
+        # variáveis da função atual -> alloca no bloco de entrada; refeito a cada função
         self.simbolos = {}
-        self._inicializar_llvm()
-
-    def _inicializar_llvm(self):
-        binding.initialize_native_target()
-        binding.initialize_native_asmprinter()
+        self._ultima_alloca = None
+        # tipos inferidos das variáveis da função atual (symbol -> Type) e o tipo de retorno no IR
+        self._tipos = {}
+        self._retorno = _I32
+        # texto -> global com o literal, um por texto no módulo
+        self._strings = {}
+        # nome da função -> (FunctionDecl, FunctionType) do analisador
+        self._funcoes = {}
+        # (nome da função, tipos dos parâmetros) -> ir.Function já gerada
+        self.instancias = CacheInstancias(limite_instancias)
 
     def gerar(self, ast):
-        return self._gerar_programa(ast)
+        return str(self.gerar_modulo(ast))
+
+    def gerar_modulo(self, ast):
+        """Como gerar, mas devolve o ir.Module em vez do texto do IR."""
+        # Program (Parser.stardust_ll1.ast_nodes) tem handler próprio; o resto usa declaracoes
+        metodo = getattr(self, "_gerar_" + ast.__class__.__name__, self._gerar_programa)
+        with instrumentation.phase("codegen"):
+            metodo(ast)
+            if instrumentation.enabled():
+                instrumentation.count("codegen.instructions", self._contar_instrucoes())
+        return self.modulo
+
+    def _contar_instrucoes(self):
+        return sum(len(bloco.instructions) for funcao in self.modulo.functions for bloco in funcao.blocks)
 
     def _gerar_programa(self, programa):
         for decl in programa.declaracoes:
             self._gerar_declaracao(decl)
-        return str(self.modulo)
+        return self.modulo
 
     def _gerar_declaracao(self, decl):
         metodo = "_gerar_" + decl.__class__.__name__
         return getattr(self, metodo)(decl)
 
+    # ---------- escopo da função ----------
+
+    def _iniciar_funcao(self, funcao, nomes_params, tipos=None):
+        """
+        Abre o escopo de funcao: cria o bloco de entrada e guarda cada
+        parâmetro num alloca próprio, para que ele possa ser reatribuído como
+        qualquer variável (o mem2reg/SROA desfaz isso depois). tipos são os
+        inferidos para as variáveis da função, pelo symbol.
+        """
+        bloco = funcao.append_basic_block(name="entry")
+        self.builder = ir.IRBuilder(bloco)
+        self.funcao_atual = funcao
+        self.simbolos = {}
+        self._ultima_alloca = None
+        self._tipos = tipos or {}
+        for arg, (chave, nome) in zip(funcao.args, nomes_params):
+            arg.name = nome
+            var = self._variavel(chave, f"{nome}.addr", self._tipo_variavel(chave, arg.type))
+            self.builder.store(self._converter(arg, var.type.pointee), var)
+
+    def _tipo_variavel(self, chave, padrao):
+        """O tipo no IR inferido para a variável chave, ou padrao se não há um concreto."""
+        tipo = self._tipos.get(chave)
+        return padrao if tipo is None else _TIPOS.get(resolve(tipo), padrao)
+
+    def _variavel(self, chave, nome, tipo, zerar=False):
+        """
+        O alloca da variável chave, criado na primeira vez. Todos ficam juntos
+        no início do bloco de entrada, um por variável, mesmo que a primeira
+        atribuição esteja dentro de um laço: é a forma que o mem2reg promove.
+        Com zerar, o bloco de entrada também guarda zero (ou null) nele.
+        """
+        var = self.simbolos.get(chave)
+        if var is None:
+            entrada = self.builder.function.entry_basic_block
+            builder = ir.IRBuilder(entrada)
+            if self._ultima_alloca is None:
+                builder.position_at_start(entrada)
+            else:
+                builder.position_after(self._ultima_alloca)
+            var = self._ultima_alloca = self.simbolos[chave] = builder.alloca(tipo, name=nome)
+            if zerar:
+                builder.store(ir.Constant(tipo, None), var)
+            if self.builder.block is entrada:
+                # o IRBuilder guarda a posição como índice: volta ao fim depois da inserção
+                self.builder.position_at_end(entrada)
+        return var
+
     def _gerar_DeclaracaoFuncaoNode(self, func):
         tipo_retorno = ir.IntType(32) if func.tipoRetorno == "int" else ir.VoidType()
 
@@ -31,12 +221,7 @@ class GeradorCodigo:
         tipo_func = ir.FunctionType(tipo_retorno, tipos_params)
         funcao = ir.Function(self.modulo, tipo_func, name=func.nome)
 
-        bloco = funcao.append_basic_block(name="entry")
-        self.builder = ir.IRBuilder(bloco)
-        self.funcao_atual = funcao
-
-        for i, param in enumerate(func.parametros):
-            self.simbolos[param.nome] = funcao.args[i]
+        self._iniciar_funcao(funcao, [(param.nome, param.nome) for param in func.parametros])
 
         for comando in func.corpo:
             self._gerar_comando(comando)
@@ -53,9 +238,7 @@ class GeradorCodigo:
 
     def _gerar_AtribuicaoNode(self, atrib):
         valor = self._gerar_expressao(atrib.valor)
-        var = self.builder.alloca(ir.IntType(32), name=atrib.variavel)
-        self.builder.store(valor, var)
-        self.simbolos[atrib.variavel] = var
+        self.builder.store(valor, self._variavel(atrib.variavel, atrib.variavel, valor.type))
 
     def _gerar_RetornaNode(self, ret):
         if ret.valor:
@@ -73,6 +256,8 @@ class GeradorCodigo:
 
     def _gerar_IdentificadorNode(self, ident):
         ptr = self.simbolos.get(ident.nome)
+        if ptr is None:
+            raise CodegenError(f"Variável não definida: {ident.nome}")
         return self.builder.load(ptr)
 
     def _gerar_ExpressaoBinariaNode(self, bin):
@@ -88,4 +273,410 @@ class GeradorCodigo:
         if bin.operador == "/":
             return self.builder.sdiv(esq, dir)
 
-        raise Exception("Operador não suportado")
+        raise CodegenError("Operador não suportado")
+
+    # ---------- AST do LL1Parser (Parser.stardust_ll1.ast_nodes) ----------
+
+    def _gerar_Program(self, programa):
+        self.registrar(programa)
+        for func in programa.functions:
+            self._gerar_declaracao(func)
+        return self.modulo
+
+    def registrar(self, programa):
+        """
+        Prepara as funções de programa para especializar, sem gerar nenhuma.
+        Sem analisador, analisa programa aqui.
+        """
+        if self.analisador is None:
+            # os erros ficam em self.analisador.errors: sem tipo concreto vale o do valor gerado
+            self.analisador = SemanticAnalyzer()
+            self.analisador.analyze(programa)
+        self._funcoes = {func.name: (func, ftype) for func, ftype in self.analisador.headers}
+
+    def novo_modulo(self):
+        """
+        Passa a gerar num módulo novo e o devolve. As instâncias já geradas
+        continuam no cache, nos módulos anteriores: é o que o JIT precisa para
+        carregar só as instâncias novas.
+        """
+        self.modulo = self.contexto.novo_modulo()
+        self._strings = {}
+        return self.modulo
+
+    def _gerar_FunctionDecl(self, func):
+        # a instância com os tipos inferidos; os parâmetros polimórficos ficam int
+        padrao = self._tipos_padrao(func)
+        self.instancias.obter(func.name, padrao, padrao, padrao,
+                              lambda tipos: self._instancia(func, tipos, ensaiar=False))
+
+    def _tipos_padrao(self, func):
+        _, ftype = self._funcoes[func.name]
+        tipos = []
+        for param in ftype.param_types:
+            param = resolve(param)
+            tipos.append(INT if _polimorfico(param) else param)
+        return tuple(tipos)
+
+    def especializar(self, nome, tipos):
+        """
+        A instância da função nome para uma chamada com argumentos dos tipos
+        dados (Types do SemanticAnalyzer), gerada no módulo na primeira vez.
+        Um argumento de parâmetro com tipo concreto é promovido para ele (int
+        para float); os polimórficos fixam o tipo da instância. Com o limite
+        do cache atingido pode vir uma instância genérica: os tipos dos
+        parâmetros de funcao.args dizem como passar os argumentos.
+        """
+        if nome not in self._funcoes:
+            raise CodegenError(f"Função não definida: {nome}")
+        func, ftype = self._funcoes[nome]
+        if len(tipos) != len(ftype.param_types):
+            raise CodegenError(f"{nome} espera {len(ftype.param_types)} argumentos, recebeu {len(tipos)}")
+        resolvidos, generica = [], []
+        for i, (param, tipo) in enumerate(zip(ftype.param_types, tipos)):
+            if tipo not in _TIPOS:
+                raise CodegenError(f"Tipo não suportado no parâmetro {i} de {nome}: {tipo}")
+            param = resolve(param)
+            if _polimorfico(param):
+                resolvidos.append(tipo)
+                generica.append(FLOAT if tipo in _NUMEROS else tipo)
+            elif param is tipo or param in _PROMOCOES.get(tipo, ()):
+                resolvidos.append(param)
+                generica.append(param)
+            else:
+                raise CodegenError(f"{nome} espera {param} no parâmetro {i}, recebeu {tipo}")
+        return self.instancias.obter(nome, tuple(resolvidos), self._tipos_padrao(func), tuple(generica),
+                                     lambda tipos: self._instancia(func, tipos))
+
+    def _instancia(self, func, tipos, ensaiar=True):
+        """
+        Gera a instância de func para os tipos em self.modulo. Com ensaiar, ela
+        é gerada antes num módulo descartável: uma especialização que não
+        compila não deixa função pela metade, string nem declaração externa
+        no módulo. gerar_modulo não ensaia, porque lá um erro descarta o
+        módulo inteiro.
+        """
+        locais, retorno = self._inferir_instancia(func, tipos)
+        nome = func.name if tipos == self._tipos_padrao(func) else ".".join([func.name, *(t.name for t in tipos)])
+        if ensaiar:
+            modulo, strings = self.modulo, self._strings
+            self.modulo, self._strings = self.contexto.novo_modulo(), {}
+            try:
+                self._gerar_instancia(func, nome, tipos, locais, retorno)
+            finally:
+                self.modulo, self._strings = modulo, strings
+        return self._gerar_instancia(func, nome, tipos, locais, retorno)
+
+    def _gerar_instancia(self, func, nome, tipos, locais, retorno):
+        self._retorno = _TIPOS.get(retorno, _I32)
+        tipo_func = ir.FunctionType(self._retorno, [_TIPOS[t] for t in tipos])
+        funcao = ir.Function(self.modulo, tipo_func, name=nome)
+        # as variáveis são indexadas pelo symbol (ID internado do nome)
+        self._iniciar_funcao(funcao, [(param.symbol, param.name) for param in func.params], locais)
+
+        self._gerar_corpo(func.body)
+
+        if not self.builder.block.is_terminated:
+            self.builder.ret(ir.Constant(self._retorno, None))
+        return funcao
+
+    def _inferir_instancia(self, func, tipos):
+        """
+        (tipos das variáveis, tipo de retorno) de func com os parâmetros em
+        tipos. Se eles são os que a análise inferiu, ou se os polimórficos não
+        chegaram a nenhuma variável nem ao retorno, vêm do analisador; senão o
+        corpo é inferido de novo com os parâmetros fixos, num analisador à
+        parte para não ligar as variáveis de tipo da análise original.
+        """
+        _, ftype = self._funcoes[func.name]
+        locais = self.analisador.local_types(func)
+        params = [resolve(param) for param in ftype.param_types]
+        retorno = resolve(ftype.return_type)
+        if all(param is tipo for param, tipo in zip(params, tipos)):
+            return locais, retorno
+        simbolos_params = {param.symbol for param in func.params}
+        if (retorno is not ANY and not any(retorno is param for param in params)
+                and not any(_polimorfico(resolve(t)) for symbol, t in locais.items()
+                            if symbol not in simbolos_params)):
+            return locais, retorno
+        analisador = SemanticAnalyzer()
+        instancia = FunctionType(list(tipos), TypeVar(analisador.store))
+        analisador._infer_function(func, instancia)
+        if analisador.errors:
+            tipos_texto = ", ".join(t.name for t in tipos)
+            raise CodegenError(f"Erro semântico em {func.name}({tipos_texto}): {analisador.errors[0]}")
+        analisador._resolve_results()
+        return analisador.local_types(func), analisador.resolved(instancia.return_type)
+
+    def _gerar_corpo(self, comandos):
+        for comando in comandos:
+            if self.builder.block.is_terminated:
+                # depois de um return o resto da lista é inalcançável
+                break
+            self._gerar_comando(comando)
+
+    def _gerar_Block(self, bloco):
+        self._gerar_corpo(bloco.statements)
+
+    def _gerar_Assignment(self, atrib):
+        valor = self._gerar_expressao(atrib.expression)
+        var = self._variavel(atrib.symbol, atrib.name, self._tipo_variavel(atrib.symbol, valor.type))
+        self.builder.store(self._converter(valor, var.type.pointee), var)
+
+    def _gerar_ExpressionStatement(self, comando):
+        self._gerar_expressao(comando.expression)
+
+    def _gerar_ReturnStatement(self, ret):
+        if ret.expression is not None:
+            self.builder.ret(self._converter(self._gerar_expressao(ret.expression), self._retorno))
+        else:
+            self.builder.ret(ir.Constant(self._retorno, None))
+
+    # ---------- controle de fluxo ----------
+
+    def _condicao(self, expr):
+        return self._como_i1(self._gerar_expressao(expr))
+
+    def _gerar_IfStatement(self, comando):
+        # blocos na ordem do fonte: cada teste logo depois do corpo do ramo anterior
+        #   teste0 -> então0 | elsif1 (teste1) -> então1 | ... | senão | fim
+        funcao = self.builder.function
+        fim = funcao.append_basic_block("if.fim")
+        ramos = [(comando.condition, comando.then_body)]
+        ramos += [(clausula.condition, clausula.body) for clausula in comando.elsifs]
+        for k, (condicao, corpo) in enumerate(ramos):
+            entao = funcao.append_basic_block("if.entao")
+            ultimo = k == len(ramos) - 1
+            if not ultimo:
+                seguinte = funcao.append_basic_block("if.elsif")
+            elif comando.else_body is not None:
+                seguinte = funcao.append_basic_block("if.senao")
+            else:
+                seguinte = fim
+            self.builder.cbranch(self._condicao(condicao), entao, seguinte)
+            self.builder.position_at_end(entao)
+            self._gerar_corpo(corpo)
+            self._saltar(fim)
+            if seguinte is not fim:
+                # depois dos blocos que o corpo criou
+                self._mover_para_fim(seguinte)
+                self.builder.position_at_end(seguinte)
+        if comando.else_body is not None:
+            self._gerar_corpo(comando.else_body)
+            self._saltar(fim)
+        self._mover_para_fim(fim)
+        self.builder.position_at_end(fim)
+
+    def _gerar_WhileStatement(self, comando):
+        self._gerar_laco(comando.condition, comando.body, None, "while")
+
+    def _gerar_ForStatement(self, comando):
+        if comando.init is not None:
+            self._gerar_expressao(comando.init)
+        self._gerar_laco(comando.condition, comando.body, comando.update, "for")
+
+    def _gerar_laco(self, condicao, corpo, atualizacao, nome):
+        """
+        Laço rotacionado: um teste de guarda antes de entrar e o teste de
+        novo no fim do corpo (do-while), em vez de um cabeçalho com o teste no
+        topo. O corpo fica com um único bloco de saída para o latch, que é a
+        forma que o LLVM desenrola e vetoriza sem precisar rodar loop-rotate.
+        Sem condição (for (;;)) o laço é incondicional.
+        """
+        funcao = self.builder.function
+        corpo_bloco = funcao.append_basic_block(f"{nome}.corpo")
+        fim = funcao.append_basic_block(f"{nome}.fim")
+        if condicao is None:
+            self.builder.branch(corpo_bloco)
+        else:
+            self.builder.cbranch(self._condicao(condicao), corpo_bloco, fim)
+
+        self.builder.position_at_end(corpo_bloco)
+        self._gerar_corpo(corpo)
+        if not self.builder.block.is_terminated:
+            if atualizacao is not None:
+                self._gerar_expressao(atualizacao)
+            if condicao is None:
+                self.builder.branch(corpo_bloco)
+            else:
+                self.builder.cbranch(self._condicao(condicao), corpo_bloco, fim)
+        # blocos criados dentro do corpo (ifs, laços aninhados) ficam antes do fim
+        self._mover_para_fim(fim)
+        self.builder.position_at_end(fim)
+
+    def _saltar(self, destino):
+        if not self.builder.block.is_terminated:
+            self.builder.branch(destino)
+
+    def _mover_para_fim(self, bloco):
+        """Põe bloco depois de todos os outros da função, para o IR sair na ordem do fonte."""
+        blocos = self.builder.function.blocks
+        if blocos[-1] is not bloco:
+            blocos.remove(bloco)
+            blocos.append(bloco)
+
+    # ---------- expressões ----------
+
+    def _como_i32(self, valor):
+        if valor.type == _I1:
+            return self.builder.zext(valor, _I32)
+        return valor
+
+    def _converter(self, valor, tipo):
+        """valor no tipo do IR tipo: bool e int sobem para int e double, qualquer número vira bool."""
+        if valor.type == tipo:
+            return valor
+        if tipo == _I1:
+            return self._como_i1(valor)
+        if tipo == _I32 and valor.type == _I1:
+            return self.builder.zext(valor, _I32)
+        if tipo == _DOUBLE and valor.type == _I1:
+            return self.builder.uitofp(valor, _DOUBLE)
+        if tipo == _DOUBLE and valor.type == _I32:
+            if isinstance(valor, ir.Constant):
+                # x = 0; ... x = 2.5: o literal já sai como double
+                return _DOUBLE(float(valor.constant))
+            return self.builder.sitofp(valor, _DOUBLE)
+        raise CodegenError(f"Conversão de {valor.type} para {tipo} não suportada")
+
+    def _gerar_Literal(self, lit):
+        if isinstance(lit.value, bool):
+            return _I1(int(lit.value))
+        if isinstance(lit.value, int):
+            return _I32(lit.value)
+        if isinstance(lit.value, float):
+            return _DOUBLE(lit.value)
+        if isinstance(lit.value, str):
+            return self._string_constante(lit.value)
+        raise CodegenError(f"Literal não suportado: {lit.value!r}")
+
+    def _string_constante(self, texto):
+        """Ponteiro para o literal texto, num array global constante terminado em zero."""
+        global_ = self._strings.get(texto)
+        if global_ is None:
+            dados = bytearray(texto.encode("utf-8") + b"\0")
+            tipo = ir.ArrayType(ir.IntType(8), len(dados))
+            global_ = ir.GlobalVariable(self.modulo, tipo, name=f".str.{len(self._strings)}")
+            global_.linkage = "private"
+            global_.global_constant = True
+            global_.unnamed_addr = True
+            global_.initializer = ir.Constant(tipo, dados)
+            self._strings[texto] = global_
+        return global_.gep([_I32(0), _I32(0)])
+
+    def _gerar_Identifier(self, ident):
+        ptr = self.simbolos.get(ident.symbol)
+        if ptr is None:
+            if ident.symbol not in self._tipos:
+                raise CodegenError(f"Variável não definida: {ident.name}")
+            # a análise conhece a variável, mas as atribuições dela sumiram com
+            # um ramo morto (ASTOptimizer): o alloca é criado aqui, valendo zero
+            ptr = self._variavel(ident.symbol, ident.name, self._tipo_variavel(ident.symbol, _I32), zerar=True)
+        return self.builder.load(ptr)
+
+    def _gerar_UnaryExpr(self, un):
+        valor = self._gerar_expressao(un.right)
+        if valor.type == _DOUBLE:
+            return self.builder.fneg(valor)
+        return self.builder.neg(self._como_i32(valor))
+
+    def _gerar_BinaryExpr(self, bin):
+        # cadeias a + b + c ... são aninhadas à esquerda: desce pela espinha
+        # iterativamente para não gastar frames por operador
+        espinha = []
+        while isinstance(bin, BinaryExpr):
+            espinha.append(bin)
+            bin = bin.left
+        esq = self._gerar_expressao(bin)
+        for bin in reversed(espinha):
+            esq = self._operacao(bin.op, esq, self._gerar_expressao(bin.right))
+        return esq
+
+    def _operacao(self, op, esq, dir):
+        if op in ("and", "or"):
+            esq, dir = self._como_i1(esq), self._como_i1(dir)
+            return self.builder.and_(esq, dir) if op == "and" else self.builder.or_(esq, dir)
+        if esq.type == _I8_PTR or dir.type == _I8_PTR:
+            return self._operacao_string(op, esq, dir)
+        if esq.type == _DOUBLE or dir.type == _DOUBLE:
+            return self._operacao_float(op, self._converter(esq, _DOUBLE), self._converter(dir, _DOUBLE))
+        if esq.type != dir.type:
+            esq, dir = self._como_i32(esq), self._como_i32(dir)
+        if op in _COMPARACOES:
+            if esq.type == _I1:
+                # bools são i1: com sinal, true valeria -1 e ficaria abaixo de false
+                return self.builder.icmp_unsigned(op, esq, dir)
+            return self.builder.icmp_signed(op, esq, dir)
+        esq, dir = self._como_i32(esq), self._como_i32(dir)
+
+        if op == "+":
+            return self.builder.add(esq, dir)
+        if op == "-":
+            return self.builder.sub(esq, dir)
+        if op == "*":
+            return self.builder.mul(esq, dir)
+        if op == "/":
+            return self.builder.sdiv(esq, dir)
+        if op == "<<":
+            # só aparece pela redução de força do ASTOptimizer (x * 2^k)
+            return self.builder.shl(esq, dir)
+
+        raise CodegenError(f"Operador não suportado: {op}")
+
+    def _operacao_float(self, op, esq, dir):
+        if op in _COMPARACOES:
+            # como em C: != é verdadeiro com NaN, as demais comparações são falsas
+            if op == "!=":
+                return self.builder.fcmp_unordered(op, esq, dir)
+            return self.builder.fcmp_ordered(op, esq, dir)
+        if op == "+":
+            return self.builder.fadd(esq, dir)
+        if op == "-":
+            return self.builder.fsub(esq, dir)
+        if op == "*":
+            return self.builder.fmul(esq, dir)
+        if op == "/":
+            return self.builder.fdiv(esq, dir)
+        raise CodegenError(f"Operador não suportado para float: {op}")
+
+    def _operacao_string(self, op, esq, dir):
+        if esq.type != dir.type:
+            raise CodegenError(f"Operador não suportado: {esq.type} {op} {dir.type}")
+        if op in _COMPARACOES:
+            # ordem lexicográfica dos bytes, pelo strcmp da libc
+            strcmp = self._externa("strcmp", _I32, [_I8_PTR, _I8_PTR])
+            return self.builder.icmp_signed(op, self.builder.call(strcmp, [esq, dir]), _I32(0))
+        if op == "+":
+            return self._concatenar(esq, dir)
+        raise CodegenError(f"Operador não suportado para string: {op}")
+
+    def _concatenar(self, esq, dir):
+        """
+        esq + dir num buffer novo do malloc. As strings não têm dono nem
+        coletor: o buffer nunca é liberado. Concatenações de literais o
+        ASTOptimizer já resolve em tempo de compilação.
+        """
+        strlen = self._externa("strlen", _SIZE_T, [_I8_PTR])
+        malloc = self._externa("malloc", _I8_PTR, [_SIZE_T])
+        memcpy = self._externa("memcpy", _I8_PTR, [_I8_PTR, _I8_PTR, _SIZE_T])
+        tam_esq = self.builder.call(strlen, [esq])
+        # o terminador de dir vem junto na segunda cópia
+        tam_dir = self.builder.add(self.builder.call(strlen, [dir]), _SIZE_T(1))
+        buffer = self.builder.call(malloc, [self.builder.add(tam_esq, tam_dir)])
+        self.builder.call(memcpy, [buffer, esq, tam_esq])
+        self.builder.call(memcpy, [self.builder.gep(buffer, [tam_esq]), dir, tam_dir])
+        return buffer
+
+    def _externa(self, nome, retorno, params):
+        """Declaração da função nome da libc no módulo, feita na primeira vez."""
+        funcao = self.modulo.globals.get(nome)
+        if funcao is None:
+            funcao = ir.Function(self.modulo, ir.FunctionType(retorno, params), name=nome)
+        return funcao
+
+    def _como_i1(self, valor):
+        if valor.type == _I1:
+            return valor
+        if valor.type == _DOUBLE:
+            return self.builder.fcmp_unordered("!=", valor, _DOUBLE(0.0))
+        return self.builder.icmp_unsigned("!=", valor, ir.Constant(valor.type, None))
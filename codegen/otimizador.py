@@ -1,14 +1,274 @@
+"""
+Pipeline de otimização configurável.
+
+    Otimizador("O1")                              # níveis O0-O3, Os e Oz, como no clang
+    Otimizador("O2", por_funcao=True)             # passes de função rodam função a função antes dos de módulo
+    Otimizador(passes=["sroa", "instcombine", "simplifycfg"], medir=True)
+
+Um nível usa o PassManagerBuilder do LLVM (com inliner e vetorizadores nos
+níveis em que o clang os liga). Uma lista explícita roda os passes na ordem
+dada; os nomes são os do `opt` (ver PASSES).
+
+Com medir=True (ou com um Profiler ativo) cada etapa é cronometrada e tem as
+instruções do IR contadas antes e depois: numa lista explícita cada passe é
+uma etapa, num nível as etapas são o pipeline de função e o de módulo. Num
+nível o tempo de cada passe interno vem do relatório de tempos do próprio
+LLVM (set_time_passes); ele não conta instruções, então a variação de
+instruções passe a passe só existe com uma lista explícita. Os totais ficam
+em Otimizador.estatisticas e, com Profiler, aparecem como fases
+"optimizer;pass:<etapa>" (e "optimizer;pass:<etapa>;<passe do LLVM>" num nível).
+"""
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
 from llvmlite import binding
 
+from Parser.stardust_ll1 import instrumentation
+from codegen.contexto import contexto_padrao
+
+def _contar_instrucoes(modulo):
+    return sum(1 for funcao in modulo.functions for bloco in funcao.blocks for _ in bloco.instructions)
+
+# linha do relatório de set_time_passes: colunas "tempo ( pct%)", a última é
+# o tempo de parede, seguidas do nome do passe ("Nome #2" na segunda instância)
+_LINHA_TEMPO = re.compile(r"^\s*(?:[\d.]+\s+\(\s*[\d.]+%\)\s+)*([\d.]+)\s+\(\s*[\d.]+%\)\s+(.+?)(?:\s+#\d+)?\s*$")
+
+
+def _tempos_passes(relatorio: str) -> Dict[str, List[float]]:
+    """Passe -> tempos de parede de cada instância, na ordem do relatório."""
+    tempos: Dict[str, List[float]] = {}
+    for linha in relatorio.splitlines():
+        casou = _LINHA_TEMPO.match(linha)
+        if casou is None or casou.group(2) == "Total":
+            continue
+        tempos.setdefault(casou.group(2), []).append(float(casou.group(1)))
+    return tempos
+
+# nível -> (opt_level, size_level)
+NIVEIS = {
+    "O0": (0, 0),
+    "O1": (1, 0),
+    "O2": (2, 0),
+    "O3": (3, 0),
+    "Os": (2, 1),
+    "Oz": (2, 2),
+}
+
+# limiares do inliner que o clang usa em cada nível; O0 e O1 não fazem inlining
+_INLINING = {"O2": 225, "O3": 275, "Os": 75, "Oz": 25}
+
+# nome no `opt` -> (método do PassManager do llvmlite, é passe de função)
+PASSES = {
+    "sroa": ("add_sroa_pass", True),
+    "instcombine": ("add_instruction_combining_pass", True),
+    "aggressive-instcombine": ("add_aggressive_instruction_combining_pass", True),
+    "simplifycfg": ("add_cfg_simplification_pass", True),
+    "reassociate": ("add_reassociate_expressions_pass", True),
+    "gvn": ("add_gvn_pass", True),
+    "sccp": ("add_sccp_pass", True),
+    "dce": ("add_dead_code_elimination_pass", True),
+    "adce": ("add_aggressive_dead_code_elimination_pass", True),
+    "dse": ("add_dead_store_elimination_pass", True),
+    "jump-threading": ("add_jump_threading_pass", True),
+    "memcpyopt": ("add_memcpy_optimization_pass", True),
+    "tailcallelim": ("add_tail_call_elimination_pass", True),
+    "sink": ("add_sink_pass", True),
+    "mergereturn": ("add_merge_returns_pass", True),
+    "lcssa": ("add_lcssa_pass", True),
+    "loop-simplify": ("add_loop_simplification_pass", True),
+    "loop-rotate": ("add_loop_rotate_pass", True),
+    "licm": ("add_licm_pass", True),
+    "loop-unswitch": ("add_loop_unswitch_pass", True),
+    "loop-deletion": ("add_loop_deletion_pass", True),
+    "loop-unroll": ("add_loop_unroll_pass", True),
+    "loop-reduce": ("add_loop_strength_reduce_pass", True),
+    "basic-aa": ("add_basic_alias_analysis_pass", True),
+    "tbaa": ("add_type_based_alias_analysis_pass", True),
+    "inline": ("add_function_inlining_pass", False),
+    "always-inline": ("add_always_inliner_pass", False),
+    "ipsccp": ("add_ipsccp_pass", False),
+    "globalopt": ("add_global_optimizer_pass", False),
+    "globaldce": ("add_global_dce_pass", False),
+    "constmerge": ("add_constant_merge_pass", False),
+    "deadargelim": ("add_dead_arg_elimination_pass", False),
+    "function-attrs": ("add_function_attrs_pass", False),
+    "mergefunc": ("add_merge_functions_pass", False),
+    "strip-dead-prototypes": ("add_strip_dead_prototypes_pass", False),
+}
+
+
+@dataclass(slots=True)
+class EstatisticaPasse:
+    nome: str
+    execucoes: int = 0
+    segundos: float = 0.0
+    # instruções do IR antes e depois, somadas em todas as execuções
+    antes: int = 0
+    depois: int = 0
+    # passe interno de um nível: só o tempo, medido pelo LLVM dentro da etapa
+    etapa: Optional[str] = None
+
+    @property
+    def delta(self) -> int:
+        return self.depois - self.antes
+
+
+@dataclass(slots=True)
+class _Etapa:
+    nome: str
+    por_funcao: bool
+    preencher: Callable[[binding.PassManager], None]
+    # o gerenciador de módulo é montado uma vez; o de função depende do módulo
+    module_pm: Optional[binding.ModulePassManager] = None
+
+
+def _adicionar(nome: str) -> Callable[[binding.PassManager], None]:
+    if nome not in PASSES:
+        raise ValueError(f"passe desconhecido: {nome!r} (opções: {', '.join(sorted(PASSES))})")
+    metodo = PASSES[nome][0]
+    if nome == "inline":
+        return lambda pm: pm.add_function_inlining_pass(_INLINING["O2"])
+    return lambda pm: getattr(pm, metodo)()
+
+
 class Otimizador:
-    def __init__(self):
-        self.passes = binding.PassManagerBuilder()
-        self.passes.opt_level = 3
-        self.module_pm = binding.ModulePassManager()
-        self.passes.populate(self.module_pm)
+    def __init__(self, nivel: str = "O3", passes: Optional[Iterable[str]] = None,
+                 por_funcao: bool = False, medir: bool = False, contexto=None):
+        self.contexto = contexto or contexto_padrao()
+        self.nivel = nivel
+        self.passes = list(passes) if passes is not None else None
+        self.por_funcao = por_funcao
+        self.medir = medir
+        self.estatisticas: Dict[str, EstatisticaPasse] = {}
+        self._etapas = self._montar_etapas()
+
+    # ---------- montagem ----------
+
+    def _builder(self) -> binding.PassManagerBuilder:
+        if self.nivel not in NIVEIS:
+            raise ValueError(f"nível desconhecido: {self.nivel!r} (opções: {', '.join(NIVEIS)})")
+        opt_level, size_level = NIVEIS[self.nivel]
+        builder = binding.PassManagerBuilder()
+        builder.opt_level = opt_level
+        builder.size_level = size_level
+        if self.nivel in _INLINING:
+            builder.inlining_threshold = _INLINING[self.nivel]
+        builder.loop_vectorize = builder.slp_vectorize = opt_level >= 2 and size_level == 0
+        return builder
+
+    def _montar_etapas(self) -> List[_Etapa]:
+        if self.passes is None:
+            builder = self._builder()
+            etapas = []
+            if self.por_funcao:
+                etapas.append(_Etapa(f"funcao:{self.nivel}", True, builder.populate))
+            etapas.append(_Etapa(f"modulo:{self.nivel}", False, builder.populate))
+        else:
+            etapas = [_Etapa(nome, self.por_funcao and PASSES.get(nome, ("", False))[1], _adicionar(nome))
+                      for nome in self.passes]
+        for etapa in etapas:
+            if not etapa.por_funcao:
+                etapa.module_pm = binding.ModulePassManager()
+                # análises do alvo (custo de instruções, data layout) para os passes
+                self.contexto.target_machine.add_analysis_passes(etapa.module_pm)
+                etapa.preencher(etapa.module_pm)
+        return etapas
+
+    # ---------- execução ----------
 
     def otimizar(self, llvm_ir):
-        modulo = binding.parse_assembly(llvm_ir)
-        modulo.verify()
-        self.module_pm.run(modulo)
-        return str(modulo)
+        """Otimiza o IR em texto e devolve o texto otimizado."""
+        return str(self.otimizar_modulo(llvm_ir))
+
+    def otimizar_modulo(self, modulo):
+        """
+        Otimiza um ir.Module, ModuleRef ou texto e devolve o ModuleRef, pronto
+        para o JIT do contexto. Um ModuleRef é otimizado no lugar, sem passar
+        pelo texto.
+        """
+        with instrumentation.phase("optimizer"):
+            modulo = self.contexto.para_llvm(modulo)
+            medir = self.medir or instrumentation.enabled()
+            if not medir:
+                for etapa in self._etapas:
+                    self._executar(etapa, modulo)
+                return modulo
+
+            antes = _contar_instrucoes(modulo)
+            instrumentation.count("optimizer.instructions_in", antes)
+            for etapa in self._etapas:
+                with instrumentation.phase("pass:" + etapa.nome):
+                    inicio = time.perf_counter()
+                    tempos = self._executar_cronometrado(etapa, modulo)
+                    segundos = time.perf_counter() - inicio
+                    for passe, instancias in tempos.items():
+                        instrumentation.record(passe, sum(instancias), len(instancias))
+                    depois = _contar_instrucoes(modulo)
+                    instrumentation.count("optimizer.instructions_delta", depois - antes)
+                self._registrar(etapa.nome, segundos, antes, depois)
+                for passe, instancias in tempos.items():
+                    self._registrar_interno(etapa.nome, passe, instancias)
+                antes = depois
+            instrumentation.count("optimizer.instructions_out", antes)
+            return modulo
+
+    def _executar(self, etapa: _Etapa, modulo: binding.ModuleRef):
+        if not etapa.por_funcao:
+            etapa.module_pm.run(modulo)
+            return
+        fpm = binding.create_function_pass_manager(modulo)
+        self.contexto.target_machine.add_analysis_passes(fpm)
+        etapa.preencher(fpm)
+        fpm.initialize()
+        for funcao in modulo.functions:
+            if not funcao.is_declaration:
+                fpm.run(funcao)
+        fpm.finalize()
+
+    def _executar_cronometrado(self, etapa: _Etapa, modulo: binding.ModuleRef) -> Dict[str, List[float]]:
+        """Executa a etapa; num nível devolve também o tempo de cada passe do pipeline."""
+        if self.passes is not None:
+            self._executar(etapa, modulo)
+            return {}
+        binding.set_time_passes(True)
+        try:
+            self._executar(etapa, modulo)
+        finally:
+            binding.set_time_passes(False)
+            relatorio = binding.report_and_reset_timings()
+        return _tempos_passes(relatorio)
+
+    def _registrar(self, nome: str, segundos: float, antes: int, depois: int):
+        estatistica = self.estatisticas.get(nome)
+        if estatistica is None:
+            estatistica = self.estatisticas[nome] = EstatisticaPasse(nome)
+        estatistica.execucoes += 1
+        estatistica.segundos += segundos
+        estatistica.antes += antes
+        estatistica.depois += depois
+
+    def _registrar_interno(self, etapa: str, passe: str, tempos: List[float]):
+        chave = f"{etapa};{passe}"
+        estatistica = self.estatisticas.get(chave)
+        if estatistica is None:
+            estatistica = self.estatisticas[chave] = EstatisticaPasse(passe, etapa=etapa)
+        estatistica.execucoes += len(tempos)
+        estatistica.segundos += sum(tempos)
+
+    def relatorio(self) -> str:
+        """
+        Tabela das estatisticas, em ordem de execução. Num nível, cada etapa é
+        seguida dos seus passes (recuados) com o tempo medido pelo LLVM; eles
+        não têm contagem de instruções, que passe a passe só existe com uma
+        lista explícita de passes.
+        """
+        linhas = [f"{'passe':<48}{'execuções':>10}{'tempo (ms)':>12}{'instruções':>12}{'delta':>8}"]
+        etapas = [e for e in self.estatisticas.values() if e.etapa is None]
+        for e in etapas:
+            linhas.append(f"{e.nome:<48}{e.execucoes:>10}{e.segundos * 1000:>12.2f}{e.depois:>12}{e.delta:>+8}")
+            internos = [i for i in self.estatisticas.values() if i.etapa == e.nome]
+            for i in sorted(internos, key=lambda i: -i.segundos):
+                linhas.append(f"{'  ' + i.nome[:46]:<48}{i.execucoes:>10}{i.segundos * 1000:>12.2f}{'-':>12}{'-':>8}")
+        return "\n".join(linhas)
@@ -0,0 +1,90 @@
+"""
+Chamadas do Python a funções StarDust polimórficas, com uma instância
+compilada por combinação de tipos dos argumentos.
+
+    with ProgramaPolimorfico(programa, limite=4) as p:
+        p.chamar("id", 7)        # gera e carrega id (parâmetro int)
+        p.chamar("id", 2.5)      # gera e carrega id.float
+        p.chamar("id", "ola")    # id.string; devolve "ola"
+
+A linguagem ainda não tem chamadas de função, então as chamadas que vêm do
+Python são os pontos de chamada. O tipo de cada argumento (bool, int, float,
+str) escolhe a instância no CacheInstancias do gerador: cada instância nova
+é gerada num módulo próprio, otimizada se houver Otimizador e carregada no
+motor MCJIT do contexto. Passado o limite de especializações de uma função,
+os argumentos são promovidos para uma instância que já existe.
+"""
+from typing import Callable, Dict, List, Tuple
+
+from Parser.stardust_ll1.semantic import INT, FLOAT, BOOL, STRING
+from codegen.contexto import ProgramaJIT, contexto_padrao
+from codegen.gerador_codigo import GeradorCodigo
+
+
+def tipo_do_valor(valor):
+    """O Type do SemanticAnalyzer para um argumento vindo do Python."""
+    # bool antes de int: True é um int em Python
+    if isinstance(valor, bool):
+        return BOOL
+    if isinstance(valor, int):
+        return INT
+    if isinstance(valor, float):
+        return FLOAT
+    if isinstance(valor, (str, bytes)):
+        return STRING
+    raise TypeError(f"argumento sem tipo StarDust: {valor!r}")
+
+
+class ProgramaPolimorfico:
+    def __init__(self, programa, analisador=None, limite: int = 8, otimizador=None, contexto=None):
+        self.contexto = contexto or contexto_padrao()
+        self.otimizador = otimizador
+        self.gerador = GeradorCodigo(self.contexto, analisador, limite_instancias=limite)
+        self.gerador.registrar(programa)
+        # um ProgramaJIT por módulo carregado, para fechar() descarregar todos
+        self._programas: List[ProgramaJIT] = []
+        # nome da instância no IR -> ProgramaJIT que a carregou
+        self._carregadas: Dict[str, ProgramaJIT] = {}
+        # (função, tipos dos argumentos) -> função compilada: o caminho rápido de chamar
+        self._chamaveis: Dict[Tuple[str, tuple], Callable] = {}
+
+    @property
+    def instancias(self):
+        return self.gerador.instancias
+
+    def funcao(self, nome: str, tipos: tuple) -> Callable:
+        """A função compilada que atende uma chamada de nome com argumentos de tipos."""
+        chamavel = self._chamaveis.get((nome, tipos))
+        if chamavel is None:
+            modulo = self.gerador.novo_modulo()
+            instancia = self.gerador.especializar(nome, tipos)
+            if instancia.module is modulo:
+                # instância gerada agora; senão o cache devolveu uma já carregada
+                if self.otimizador is not None:
+                    modulo = self.otimizador.otimizar_modulo(modulo)
+                programa = self.contexto.jit(modulo)
+                self._programas.append(programa)
+                self._carregadas[instancia.name] = programa
+            chamavel = self._carregadas[instancia.name].funcao(instancia.name)
+            self._chamaveis[(nome, tipos)] = chamavel
+        return chamavel
+
+    def chamar(self, nome: str, *args):
+        tipos = tuple(tipo_do_valor(arg) for arg in args)
+        # o ctypes passa i8* como bytes
+        args = [arg.encode("utf-8") if isinstance(arg, str) else arg for arg in args]
+        resultado = self.funcao(nome, tipos)(*args)
+        return resultado.decode("utf-8") if isinstance(resultado, bytes) else resultado
+
+    def fechar(self):
+        for programa in self._programas:
+            programa.fechar()
+        self._programas.clear()
+        self._carregadas.clear()
+        self._chamaveis.clear()
+
+    def __enter__(self) -> "ProgramaPolimorfico":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,229 @@
+"""
+Driver de compilação em lote: cada arquivo .sd passa por lexer ->
+LL1Parser -> SemanticAnalyzer -> GeradorCodigo, num pool de processos.
+
+O parser (gramática e tabela LL(1)) é montado uma única vez no processo
+principal e entregue a cada worker pelo initializer do pool; com fork nem é
+serializado. Os diagnósticos saem à medida que os arquivos terminam.
+
+Com --profile cada arquivo é medido por fase (ver stardust_ll1.instrumentation)
+e as medidas de todos os workers são somadas num único relatório.
+
+Uso (a partir da raiz do projeto):
+    python stardust.py [-j N] [-o DIR] [-O 0|1|2|3|s|z | --passes p1,p2] [--profile ARQ [--profile-format json|folded]] arquivo.sd|pasta ...
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Parser.stardust_ll1 import LL1Parser, ParseError, tokenize_buffer, instrumentation
+from Parser.stardust_ll1.semantic import SemanticAnalyzer
+from Parser.stardust_ll1.ast_optimizer import ASTOptimizer
+from codegen.gerador_codigo import GeradorCodigo, CodegenError
+
+SOURCE_SUFFIX = ".sd"
+
+# (nível, lista de passes) do Otimizador; None não otimiza
+Otimizacao = Optional[Tuple[str, Optional[Tuple[str, ...]]]]
+
+
+@dataclass(slots=True)
+class CompileResult:
+    path: str
+    errors: List[str] = field(default_factory=list)
+    # LLVM IR gerado; None se alguma etapa falhou
+    ir: Optional[str] = None
+    elapsed: float = 0.0
+    # medidas por fase (Profiler.stats), só com profile=True
+    profile: Optional[dict] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def find_sources(paths: Iterable[str]) -> List[str]:
+    """Expande pastas (recursivamente, em ordem) nos seus arquivos .sd."""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                sources.extend(os.path.join(root, name) for name in sorted(files)
+                               if name.endswith(SOURCE_SUFFIX))
+        else:
+            sources.append(path)
+    return sources
+
+
+# um Otimizador por configuração e por processo: os pass managers do LLVM não são serializáveis
+_otimizadores: Dict[Tuple, object] = {}
+
+def _otimizador(otimizacao: Otimizacao):
+    otimizador = _otimizadores.get(otimizacao)
+    if otimizador is None:
+        from codegen.otimizador import Otimizador
+        nivel, passes = otimizacao
+        otimizador = _otimizadores[otimizacao] = Otimizador(nivel, passes)
+    return otimizador
+
+
+def compile_file(path: str, parser: LL1Parser, out_dir: Optional[str] = None,
+                 profile: bool = False, otimizacao: Otimizacao = None) -> CompileResult:
+    if not profile:
+        return _compile(path, parser, out_dir, otimizacao)
+    with instrumentation.profiling() as profiler:
+        with instrumentation.phase("compile"):
+            result = _compile(path, parser, out_dir, otimizacao)
+    result.profile = profiler.stats
+    return result
+
+
+def _compile(path: str, parser: LL1Parser, out_dir: Optional[str],
+             otimizacao: Otimizacao = None) -> CompileResult:
+    result = CompileResult(path)
+    start = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        # RuntimeError é o erro léxico do tokenize_buffer
+        program = parser.parse_ast(tokenize_buffer(text))
+    except (OSError, RuntimeError, ParseError) as e:
+        result.errors = [str(e)]
+        result.elapsed = time.perf_counter() - start
+        return result
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(program)
+    if analyzer.errors:
+        result.errors = list(analyzer.errors)
+    else:
+        try:
+            if otimizacao is None:
+                result.ir = GeradorCodigo(analisador=analyzer).gerar(program)
+            else:
+                nivel, passes = otimizacao
+                if nivel != "O0" or passes is not None:
+                    ASTOptimizer(analyzer).optimize(program)
+                modulo = GeradorCodigo(analisador=analyzer).gerar_modulo(program)
+                result.ir = str(_otimizador(otimizacao).otimizar_modulo(modulo))
+        except CodegenError as e:
+            # só construções que o gerador não traduz; qualquer outra exceção é bug e sobe com o traceback
+            result.errors = [f"codegen: {e}"]
+        if result.ir is not None and out_dir is not None:
+            name = os.path.splitext(os.path.basename(path))[0] + ".ll"
+            try:
+                with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+                    f.write(result.ir)
+            except OSError as e:
+                result.errors = [str(e)]
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+# parser de cada processo do pool, posto uma vez por _init_worker
+_worker_parser: Optional[LL1Parser] = None
+
+def _init_worker(parser: LL1Parser):
+    global _worker_parser
+    _worker_parser = parser
+
+def _compile_in_worker(path: str, out_dir: Optional[str], profile: bool,
+                       otimizacao: Otimizacao) -> CompileResult:
+    return compile_file(path, _worker_parser, out_dir, profile, otimizacao)
+
+
+def compile_paths(paths: Iterable[str], jobs: Optional[int] = None,
+                  out_dir: Optional[str] = None,
+                  parser: Optional[LL1Parser] = None,
+                  profile: bool = False,
+                  otimizacao: Otimizacao = None) -> Iterator[CompileResult]:
+    """
+    Compila os arquivos .sd de paths e gera um CompileResult por arquivo, na
+    ordem em que terminam. jobs=1 compila no próprio processo, em ordem.
+    otimizacao=(nível, passes) passa o IR pelo Otimizador.
+    """
+    sources = find_sources(paths)
+    parser = parser or LL1Parser()
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(sources) <= 1:
+        for path in sources:
+            yield compile_file(path, parser, out_dir, profile, otimizacao)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(sources)),
+                             initializer=_init_worker, initargs=(parser,)) as pool:
+        futures = [pool.submit(_compile_in_worker, path, out_dir, profile, otimizacao) for path in sources]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="stardust", description="Compila arquivos StarDust (.sd) para LLVM IR.")
+    ap.add_argument("paths", nargs="+", help="arquivos .sd ou pastas com arquivos .sd")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="processos no pool (padrão: número de CPUs)")
+    ap.add_argument("-o", "--out-dir", default=None, help="pasta onde gravar um .ll por arquivo")
+    ap.add_argument("-O", dest="opt", choices=("0", "1", "2", "3", "s", "z"), default=None,
+                    help="otimiza o IR no nível dado (sem -O o IR sai sem otimização)")
+    ap.add_argument("--passes", default=None,
+                    help="lista de passes separados por vírgula, no lugar do nível (ex.: sroa,instcombine,simplifycfg)")
+    ap.add_argument("--profile", metavar="ARQ", default=None,
+                    help="grava tempo, pico de memória e contadores por fase em ARQ")
+    ap.add_argument("--profile-format", choices=("json", "folded"), default="json",
+                    help="json, ou pilhas dobradas para flame graph (flamegraph.pl, speedscope)")
+    args = ap.parse_args(argv)
+
+    otimizacao = None
+    if args.passes:
+        otimizacao = ("O" + (args.opt or "0"), tuple(args.passes.split(",")))
+    elif args.opt is not None:
+        otimizacao = ("O" + args.opt, None)
+    if otimizacao is not None:
+        try:
+            # valida o nível e os nomes dos passes antes de abrir o pool
+            _otimizador(otimizacao)
+        except ValueError as e:
+            ap.error(str(e))
+
+    profiler = instrumentation.Profiler() if args.profile else None
+    # o driver é dono do processo: pode pausar o coletor cíclico durante os parses
+    if profiler is not None:
+        with instrumentation.profiling(profiler), instrumentation.phase("warmup"):
+            parser = LL1Parser(pause_gc=True)
+    else:
+        parser = LL1Parser(pause_gc=True)
+
+    failed = 0
+    total = 0
+    start = time.perf_counter()
+    for result in compile_paths(args.paths, args.jobs, args.out_dir, parser,
+                                profile=profiler is not None, otimizacao=otimizacao):
+        total += 1
+        if result.profile:
+            profiler.merge(result.profile)
+        if result.ok:
+            print(f"{result.path}: ok ({result.elapsed * 1000:.1f} ms)", flush=True)
+        else:
+            failed += 1
+            for error in result.errors:
+                print(f"{result.path}: erro: {error}", file=sys.stderr, flush=True)
+    print(f"{total} arquivo(s), {failed} com erro, {time.perf_counter() - start:.2f} s")
+
+    if profiler is not None:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            if args.profile_format == "json":
+                json.dump(profiler.to_dict(), f, indent=2)
+            else:
+                f.write(profiler.folded())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
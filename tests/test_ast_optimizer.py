@@ -0,0 +1,40 @@
+import pytest
+
+from Parser.stardust_ll1 import LL1Parser, tokenize_buffer
+from Parser.stardust_ll1.ast_optimizer import ASTOptimizer
+from Parser.stardust_ll1.semantic import SemanticAnalyzer
+from codegen.contexto import contexto_padrao
+from codegen.gerador_codigo import GeradorCodigo
+
+# a única atribuição de x está num ramo que a dobra de constantes remove: x começa em zero
+RAMOS_MORTOS = {
+    "if": ("function f() { if (false) { x = 1; } return x; }", 0),
+    "while": ("function f() { while (false) { x = 1; } x = x + 1; return x; }", 1),
+    "for": ("function f() { for (; false; ) { x = 1.5; } return x; }", 0.0),
+}
+
+
+def _executar(fonte, otimizar):
+    programa = LL1Parser().parse_ast(tokenize_buffer(fonte))
+    analisador = SemanticAnalyzer()
+    analisador.analyze(programa)
+    assert analisador.errors == []
+    if otimizar:
+        ASTOptimizer(analisador).optimize(programa)
+    modulo = GeradorCodigo(analisador=analisador).gerar_modulo(programa)
+    programa_jit = contexto_padrao().jit(modulo)
+    try:
+        return programa_jit.funcao("f")()
+    finally:
+        programa_jit.fechar()
+
+
+@pytest.mark.parametrize("comando", sorted(RAMOS_MORTOS))
+def test_dead_branch_keeps_its_locals(comando):
+    fonte, esperado = RAMOS_MORTOS[comando]
+    assert _executar(fonte, otimizar=True) == esperado
+
+
+def test_live_assignment_survives_dead_branch():
+    fonte = "function f() { x = 7; if (false) { x = 1; } return x; }"
+    assert _executar(fonte, otimizar=False) == _executar(fonte, otimizar=True) == 7
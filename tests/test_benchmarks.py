@@ -0,0 +1,44 @@
+import pytest
+
+from benchmarks.generator import SHAPES, generate
+from benchmarks.pipeline import Pipeline, compare, measure
+
+
+@pytest.fixture(scope="module")
+def pipeline(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("STARDUST_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        yield Pipeline()
+
+
+def test_generator_is_deterministic():
+    for shape in SHAPES:
+        assert generate(shape, 8, 3) == generate(shape, 8, 3)
+    assert generate("functions", 8, 3) != generate("functions", 8, 4)
+    with pytest.raises(ValueError, match="forma desconhecida"):
+        generate("nao_existe", 1)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_every_shape_runs_the_pipeline(pipeline, shape):
+    failed, error = pipeline.run(generate(shape, 5, 1))
+    if shape == "comments":
+        # só o lexer de AFD conhece comentários "//"
+        assert failed == "parser"
+    else:
+        assert (failed, error) == (None, None)
+
+
+def test_measure_and_compare(pipeline):
+    result = measure(pipeline, generate("functions", 3, 0), repeat=1)
+    assert result["stopped"] is None
+    assert {"dfa_lexer", "lexer", "parser", "semantic", "codegen", "optimizer"} <= set(result["phases"])
+    current = {"seed": 0, "scale": 1.0, "results": {"functions": result}}
+    assert compare(current, current, tolerance=0.0, memory_tolerance=0.0) == []
+
+    slower = {"seed": 0, "scale": 1.0, "results": {"functions": {
+        "phases": {name: {"seconds": p["seconds"] + 1.0, "peak_bytes": p["peak_bytes"]}
+                   for name, p in result["phases"].items()}}}}
+    assert {name for _, name, _ in compare(slower, current, 0.5, 0.5)} == set(result["phases"])
+    with pytest.raises(ValueError):
+        compare(current, dict(current, seed=1), 0.5, 0.5)
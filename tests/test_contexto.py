@@ -0,0 +1,69 @@
+import pytest
+from llvmlite import binding
+
+from Parser.stardust_ll1 import LL1Parser, tokenize_buffer
+from Parser.stardust_ll1.semantic import SemanticAnalyzer
+from codegen.contexto import ContextoLLVM, contexto_padrao
+from codegen.gerador_codigo import GeradorCodigo
+
+IR = """
+define i32 @"soma"(i32 %"a", i32 %"b") {
+  %"r" = add i32 %"a", %"b"
+  ret i32 %"r"
+}
+define double @"metade"(double %"x") {
+  %"r" = fmul double %"x", 0.5
+  ret double %"r"
+}
+define i1 @"maior"(i32 %"a", i32 %"b") {
+  %"r" = icmp sgt i32 %"a", %"b"
+  ret i1 %"r"
+}
+"""
+
+
+def test_default_context_is_per_process():
+    assert contexto_padrao() is contexto_padrao()
+    ctx = contexto_padrao()
+    assert ctx.motor is ctx.motor
+    modulo = ctx.novo_modulo("m")
+    assert (modulo.triple, modulo.data_layout) == (ctx.triple, ctx.data_layout)
+
+
+def test_para_llvm_converts_once():
+    ctx = contexto_padrao()
+    ref = ctx.para_llvm(IR)
+    assert isinstance(ref, binding.ModuleRef) and ref.triple == ctx.triple
+    assert ctx.para_llvm(ref) is ref
+
+
+def test_jit_calls_functions_with_the_ir_signature():
+    with contexto_padrao().jit(IR) as programa:
+        soma = programa.funcao("soma")
+        assert programa.funcao("soma") is soma
+        assert soma(2, 40) == 42
+        assert programa.funcao("metade")(5.0) == 2.5
+        assert programa.funcao("maior")(3, -1) is True
+
+
+def test_closed_program_is_unloaded():
+    ctx = contexto_padrao()
+    programa = ctx.jit(IR)
+    programa.fechar()
+    programa.fechar()
+    with pytest.raises(RuntimeError):
+        programa.funcao("soma")
+    # uma função de mesmo nome num programa novo resolve para o código novo
+    with ctx.jit(IR.replace("add i32", "sub i32")) as novo:
+        assert novo.funcao("soma")(2, 40) == -38
+
+
+def test_jit_of_a_generated_module():
+    fonte = 'function f(n) { return n * 3; }\nfunction g() { return "oi" + "!"; }'
+    programa = LL1Parser().parse_ast(tokenize_buffer(fonte))
+    analisador = SemanticAnalyzer()
+    analisador.analyze(programa)
+    ctx = ContextoLLVM()
+    with ctx.jit(GeradorCodigo(ctx, analisador=analisador).gerar_modulo(programa)) as jit:
+        assert jit.funcao("f")(14) == 42
+        assert jit.funcao("g")() == b"oi!"
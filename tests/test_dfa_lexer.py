@@ -0,0 +1,106 @@
+import importlib.util
+import io
+import os
+
+import pytest
+
+LEXER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Lexer")
+
+AMOSTRAS = [
+    "x1 = 42 + 3.14; // comentário até o fim da linha\ny = x1 * 2;",
+    "function f(a, b) { if (a <= b) { return a; } return b; }",
+    "_a9 12.5 7 . 8 ! & | : @ # 3.",
+    "a//b\nc / d",
+]
+
+
+@pytest.fixture(scope="module")
+def lexer(tmp_path_factory):
+    # Lexer/ usa imports planos; main.py é carregado com outro nome para não colidir com o da raiz
+    with pytest.MonkeyPatch.context() as mp:
+        mp.syspath_prepend(LEXER_DIR)
+        mp.setenv("STARDUST_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        spec = importlib.util.spec_from_file_location("stardust_dfa_lexer", os.path.join(LEXER_DIR, "main.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+def _um_afd_por_token(lexer, texto):
+    """O tokenizador de antes do AFD combinado: simula o AFD de cada token e fica com o maior lexema."""
+    from afn_to_afd import afn_to_afd
+    from afns_definicao import AFNS
+    afds = {nome: afn_to_afd(afn) for nome, afn in AFNS.items()}
+    tokens, i = [], 0
+    while i < len(texto):
+        if texto[i].isspace():
+            i += 1
+            continue
+        melhor = (None, 0)
+        for nome, afd in afds.items():
+            tamanho = lexer.simulate_afd(afd, texto, i)
+            if tamanho > melhor[1]:
+                melhor = (nome, tamanho)
+        if melhor[1]:
+            if melhor[0] != "COMENT":
+                tokens.append((melhor[0], texto[i:i + melhor[1]]))
+            i += melhor[1]
+        else:
+            tokens.append(("UNKNOWN", texto[i]))
+            i += 1
+    return tokens
+
+
+def test_combined_dfa_tokens(lexer):
+    assert lexer.tokenize("x1 = 42 + 3.14; // fim\ny") == [
+        ("IDENT", "x1"), ("OP", "="), ("INT", "42"), ("OP", "+"), ("REAL", "3.14"),
+        ("PONT", ";"), ("IDENT", "y"),
+    ]
+
+
+@pytest.mark.parametrize("texto", AMOSTRAS)
+def test_combined_dfa_matches_one_dfa_per_token(lexer, texto):
+    assert lexer.tokenize(texto) == _um_afd_por_token(lexer, texto)
+
+
+def test_compiled_dfa_matches_the_dict_dfa(lexer):
+    from afn_to_afd import afn_to_afd, combine_afns
+    from afns_definicao import AFNS
+    from compiled_afd import compile_afd
+    afd = afn_to_afd(combine_afns(AFNS))
+    compilado = compile_afd(afd)
+    assert compilado.num_states <= len(afd["states"])
+    for texto in AMOSTRAS:
+        classes = compilado.classify(texto)
+        for i in range(len(texto)):
+            tipo, tamanho = compilado.match(texto, i, classes)
+            assert tamanho == lexer.simulate_afd(afd, texto, i)
+            assert compilado.match(texto, i) == (tipo, tamanho)
+
+
+def test_minimization_merges_equivalent_states(lexer):
+    from compiled_afd import compile_afd
+    # B e C aceitam o mesmo tipo e não têm saídas: viram um estado só
+    afd = {
+        "states": ["A", "B", "C"],
+        "start": "A",
+        "finals": ["B", "C"],
+        "transitions": {("A", "a"): "B", ("A", "b"): "C"},
+        "tokens": {"B": "X", "C": "X"},
+    }
+    compilado = compile_afd(afd)
+    assert compilado.num_states == 2
+    # a e b levam ao mesmo estado: uma classe só, mais a classe 0 dos caracteres sem transição
+    assert compilado.num_classes == 2
+    assert compilado.class_of["a"] == compilado.class_of["b"]
+    assert compilado.match("ab", 0) == ("X", 1)
+    assert compilado.match("c", 0) == (None, 0)
+    assert compilado.classify("ac") == bytes([compilado.class_of["a"], 0])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_iter_tokens_across_chunk_boundaries(lexer, chunk_size):
+    texto = "\n".join(AMOSTRAS) + "\nidentificador_longo 123.456 // comentário no fim"
+    esperado = lexer.tokenize(texto)
+    assert list(lexer.iter_tokens(io.StringIO(texto), chunk_size)) == esperado
+    assert list(lexer.iter_tokens(io.BytesIO(texto.encode("utf-8")), chunk_size)) == esperado
@@ -0,0 +1,149 @@
+import pytest
+
+from Parser.stardust_ll1 import LL1Parser, tokenize_buffer
+from Parser.stardust_ll1.ast_optimizer import ASTOptimizer
+from Parser.stardust_ll1.semantic import SemanticAnalyzer, FLOAT, STRING
+from codegen.contexto import contexto_padrao
+from codegen.gerador_codigo import GeradorCodigo, CodegenError
+
+# a concatenação gera strings globais e declara strlen/malloc/memcpy antes de x * 2 falhar com string
+FONTE = 'function f(x) { s = "a" + "b"; return x * 2; }'
+
+
+def test_failed_specialization_leaves_module_untouched():
+    programa = LL1Parser().parse_ast(tokenize_buffer(FONTE))
+    analisador = SemanticAnalyzer()
+    analisador.analyze(programa)
+    gerador = GeradorCodigo(analisador=analisador)
+    gerador.registrar(programa)
+    modulo = gerador.novo_modulo()
+    vazio = str(modulo)
+    with pytest.raises(CodegenError):
+        gerador.especializar("f", (STRING,))
+    assert str(modulo) == vazio
+    # o nome fica livre e as strings da próxima instância começam em .str.0
+    assert gerador.especializar("f", (FLOAT,)).name == "f.float"
+    assert sorted(g.name for g in modulo.global_values if g.name.startswith(".str")) == [".str.0", ".str.1"]
+
+
+def _executar(fonte, otimizar, *args):
+    programa = LL1Parser().parse_ast(tokenize_buffer(fonte))
+    analisador = SemanticAnalyzer()
+    analisador.analyze(programa)
+    assert analisador.errors == []
+    if otimizar:
+        ASTOptimizer(analisador).optimize(programa)
+    programa_jit = contexto_padrao().jit(GeradorCodigo(analisador=analisador).gerar_modulo(programa))
+    try:
+        return programa_jit.funcao("f")(*args)
+    finally:
+        programa_jit.fechar()
+
+
+@pytest.mark.parametrize("otimizar", [False, True])
+@pytest.mark.parametrize("corpo, esperado", [
+    ("return true > false;", True),
+    ("return true < false;", False),
+    ("return false < true;", True),
+    ("a = true; b = false; return a < b;", False),
+    ("a = true; b = false; return a > b;", True),
+    ("a = false; b = true; return b > a;", True),
+])
+def test_bool_ordering(corpo, esperado, otimizar):
+    assert _executar("function f() { " + corpo + " }", otimizar) == esperado
+
+
+def _ir(fonte):
+    programa = LL1Parser().parse_ast(tokenize_buffer(fonte))
+    analisador = SemanticAnalyzer()
+    analisador.analyze(programa)
+    return GeradorCodigo(analisador=analisador).gerar_modulo(programa)
+
+
+def test_allocas_hoisted_to_entry_once_per_variable():
+    modulo = _ir("function f(n) {\n"
+                 "  x = 1;\n"
+                 "  while (x < n) { y = x * 2; { z = y; x = z + 1; } }\n"
+                 "  x = x + 1;\n"
+                 "  return x;\n"
+                 "}\n"
+                 "function g(n) { x = 2.5; return n; }\n")
+    for funcao in modulo.functions:
+        entrada, *resto = funcao.blocks
+        allocas = [i for i in entrada.instructions if i.opname == "alloca"]
+        # todas no topo da entrada, antes de qualquer outra instrução
+        assert entrada.instructions[:len(allocas)] == allocas
+        assert not any(i.opname == "alloca" for bloco in resto for i in bloco.instructions)
+        nomes = [a.name for a in allocas]
+        assert len(nomes) == len(set(nomes))
+    f, g = (str(funcao) for funcao in modulo.functions)
+    assert f.count("alloca") == 4 and 'alloca i32' in f
+    # o x de g é outra variável, com o tipo de g
+    assert g.count("alloca") == 2 and 'alloca double' in g
+
+
+@pytest.mark.parametrize("otimizar", [False, True])
+def test_each_function_has_its_own_variables(otimizar):
+    fonte = ("function g(n) { x = n + 100; return x; }\n"
+             "function f(n) { x = n; { x = x * 2; } return x; }\n")
+    assert _executar(fonte, otimizar, 21) == 42
+
+
+CLASSIFICA = ("function f(n) {\n"
+              "  if (n < 0) { return -1; } elsif (n == 0) { return 0; } elsif (n < 10) { r = 1; } else { r = 2; }\n"
+              "  return r * 10;\n"
+              "}\n")
+SOMA_WHILE = "function f(n) { i = 0; s = 0; while (i < n) { i = i + 1; s = s + i; } return s; }"
+# a gramática só aceita expressões no cabeçalho do for: o passo fica no corpo
+FATORIAL_FOR = "function f(n) { p = 1; i = 0; for (; i < n; ) { i = i + 1; p = p * i; } return p; }"
+# for sem condição: só sai pelo return
+PRIMEIRO_MULTIPLO = "function f(n) { i = 1; for (; ; ) { if (i * 7 > n) { return i * 7; } i = i + 1; } }"
+ANINHADO = ("function f(n) {\n"
+            "  c = 0;\n"
+            "  i = 0;\n"
+            "  for (i; i < n; i) {\n"
+            "    j = 0;\n"
+            "    while (j < i) { if ((j != 2) and (i > 1)) { c = c + 1; } j = j + 1; }\n"
+            "    i = i + 1;\n"
+            "  }\n"
+            "  return c;\n"
+            "}\n")
+
+
+@pytest.mark.parametrize("otimizar", [False, True])
+@pytest.mark.parametrize("fonte, casos", [
+    (CLASSIFICA, [(-5, -1), (0, 0), (3, 10), (10, 20), (99, 20)]),
+    (SOMA_WHILE, [(0, 0), (1, 1), (10, 55)]),
+    (FATORIAL_FOR, [(0, 1), (1, 1), (5, 120)]),
+    (PRIMEIRO_MULTIPLO, [(0, 7), (7, 14), (50, 56)]),
+    (ANINHADO, [(0, 0), (3, 2), (5, 7)]),
+], ids=["if_elsif_else", "while", "for", "for_sem_condicao", "aninhado"])
+def test_control_flow_runs(fonte, casos, otimizar):
+    for n, esperado in casos:
+        assert _executar(fonte, otimizar, n) == esperado
+
+
+@pytest.mark.parametrize("otimizar", [False, True])
+@pytest.mark.parametrize("op, esperado", [
+    ("==", [False, True, False]),
+    ("!=", [True, False, True]),
+    ("<", [True, False, False]),
+    (">", [False, False, True]),
+])
+def test_relational_operators_are_signed(op, esperado, otimizar):
+    fonte = f"function f(a, b) {{ return a {op} b; }}"
+    pares = [(-3, 2), (4, 4), (5, -1)]
+    assert [_executar(fonte, otimizar, a, b) for a, b in pares] == esperado
+
+
+@pytest.mark.parametrize("otimizar", [False, True])
+def test_logical_operators_on_comparisons(otimizar):
+    # and/or têm a precedência de + e -: as comparações vão entre parênteses
+    fonte = "function f(a, b) { if ((a > 0) and (b > 0) or (a == b)) { return 1; } return 0; }"
+    assert [_executar(fonte, otimizar, a, b) for a, b in [(1, 1), (1, -1), (-2, -2), (-1, 2)]] == [1, 0, 1, 0]
+
+
+def test_long_expression_does_not_recurse():
+    termos = 3000
+    fonte = "function f(n) { return " + " + ".join(["n"] * termos) + "; }"
+    assert _executar(fonte, False, 2) == 2 * termos
@@ -0,0 +1,96 @@
+import random
+import re
+
+import pytest
+
+from Parser.stardust_ll1 import LL1Parser, CompilationSession, ParseError, tokenize_buffer
+from Parser.stardust_ll1.semantic import SemanticAnalyzer
+from benchmarks.generator import generate
+
+V1 = ("function g(x) { return x; }\n"
+      "function f() { a = g; b = h; a = b; }\n"
+      "function h(y) { y = 1; return y; }\n")
+
+
+def _signatures(program, sym):
+    # as variáveis de tipo são renomeadas na ordem em que aparecem: os ids variam entre análises
+    names = {}
+    text = " | ".join(repr(sym.lookup(func.symbol).type) for func in program.functions)
+    return re.sub(r"t\d+", lambda m: names.setdefault(m.group(), f"t{len(names)}"), text)
+
+
+def _full(text):
+    program = LL1Parser().parse_ast(tokenize_buffer(text))
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(program)
+    return program, analyzer
+
+
+def _assert_matches_full_analysis(session, program, text):
+    expected, analyzer = _full(text)
+    assert program == expected
+    assert sorted(session.errors) == sorted(analyzer.errors)
+    assert _signatures(program, session.global_sym) == _signatures(expected, analyzer.global_sym)
+
+
+@pytest.mark.parametrize("v2", [
+    V1.replace(" a = b;", ""),                 # some a restrição que ligava g a h
+    V1.replace(" a = g;", "").replace(" a = b;", ""),  # f deixa de referenciar g
+    V1.replace("function f() { a = g; b = h; a = b; }\n", ""),  # f é removida
+], ids=["constraint", "reference", "function"])
+def test_edit_that_removes_a_constraint(v2):
+    session = CompilationSession()
+    session.update(V1)
+    assert _signatures(session.program, session.global_sym) == "fn(int) -> int | fn() -> t0 | fn(int) -> int"
+    program = session.update(v2)
+    _assert_matches_full_analysis(session, program, v2)
+
+
+def test_unrelated_functions_are_reused():
+    text = V1 + "function k(z) { return z + 1; }\n"
+    session = CompilationSession()
+    session.update(text)
+    edited = text.replace("z + 1", "z + 2")
+    program = session.update(edited)
+    assert session.reparsed == ["k"]
+    assert session.reanalyzed == ["k"]
+    _assert_matches_full_analysis(session, program, edited)
+
+
+def test_positions_and_errors_follow_the_edit():
+    text = V1 + 'function e() { s = "a"; s = 1; }\n'
+    session = CompilationSession()
+    session.update(text)
+    edited = "\n\n" + text
+    program = session.update(edited)
+    assert session.reparsed == []
+    assert program.functions[-1].line == 6
+    _assert_matches_full_analysis(session, program, edited)
+
+
+def test_syntax_error_then_recovery():
+    session = CompilationSession()
+    session.update(V1)
+    broken = V1.replace("return y;", "return y")
+    with pytest.raises(ParseError):
+        session.update(broken)
+    program = session.update(V1)
+    _assert_matches_full_analysis(session, program, V1)
+
+
+def test_random_edits_match_full_analysis():
+    rng = random.Random(7)
+    text = generate("functions", 6, 2)
+    session = CompilationSession()
+    session.update(text)
+    snippets = ["\n", " ", "x = 1;", 'x = "s";', "z = 2.5;", "return 1.5;", "i0 = fun0;"]
+    for step in range(60):
+        if step % 3 == 0:
+            pos = text.find("function", rng.randrange(len(text)))
+            edited = text[:pos] + f"function h{step}(q) {{ return q; }}\n" + text[pos:] if pos >= 0 else text
+        else:
+            pos = text.find("{", rng.randrange(len(text)))
+            edited = text[:pos + 1] + rng.choice(snippets) + text[pos + 1:] if pos >= 0 else text
+        text = edited
+        program = session.update(text)
+        _assert_matches_full_analysis(session, program, text)
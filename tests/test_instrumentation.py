@@ -0,0 +1,90 @@
+import json
+import re
+import time
+
+import stardust
+from Parser.stardust_ll1 import instrumentation
+from Parser.stardust_ll1.instrumentation import Profiler, profiling
+
+
+def test_nothing_is_measured_without_a_profiler():
+    assert not instrumentation.enabled()
+    assert instrumentation.phase("lexer") is instrumentation.phase("parser")
+    instrumentation.count("lexer.tokens", 3)
+    instrumentation.record("pass", 1.0)
+
+
+def test_nested_phases_counters_and_records():
+    with profiling() as prof:
+        assert instrumentation.active() is prof
+        with instrumentation.phase("compile"):
+            with instrumentation.phase("parser"):
+                instrumentation.count("parser.match", 2)
+                instrumentation.count("parser.match")
+                time.sleep(0.01)
+            with instrumentation.phase("parser"):
+                pass
+            instrumentation.record("passe", 0.5, calls=3)
+            instrumentation.count("compile.files")
+    assert not instrumentation.enabled()
+
+    compile_, parser, passe = prof.stats[("compile",)], prof.stats[("compile", "parser")], prof.stats[("compile", "passe")]
+    assert parser.calls == 2 and parser.counters == {"parser.match": 3}
+    assert (passe.calls, passe.wall) == (3, 0.5)
+    assert compile_.counters == {"compile.files": 1}
+    # o tempo das filhas (inclusive as registradas com record) sai do tempo próprio do pai
+    assert compile_.child_wall >= 0.5 + 0.01
+    assert compile_.wall >= parser.wall >= 0.01
+
+
+def test_phase_peak_memory():
+    with profiling() as prof:
+        with instrumentation.phase("aloca"):
+            dados = [bytes(1000) for _ in range(1000)]
+            del dados
+        with instrumentation.phase("nada"):
+            pass
+    assert prof.stats[("aloca",)].peak_bytes >= 1000 * 1000
+    assert prof.stats[("nada",)].peak_bytes < 100_000
+
+
+def test_merge_sums_under_a_prefix():
+    total = Profiler(memory=False)
+    for _ in range(2):
+        with profiling(Profiler(memory=False)) as prof:
+            with instrumentation.phase("lexer"):
+                instrumentation.count("lexer.tokens", 5)
+        total.merge(prof.stats, prefix=("worker",))
+    lexer = total.stats[("worker", "lexer")]
+    assert lexer.calls == 2 and lexer.counters == {"lexer.tokens": 10}
+
+
+def test_exports():
+    prof = Profiler(memory=False)
+    with profiling(prof):
+        with instrumentation.phase("a"):
+            with instrumentation.phase("b"):
+                instrumentation.count("b.n")
+    fases = prof.to_dict()["phases"]
+    assert [f["phase"] for f in fases] == ["a", "a;b"]
+    assert set(fases[1]) == {"phase", "calls", "wall_s", "self_s", "peak_bytes", "counters"}
+    assert fases[1]["counters"] == {"b.n": 1}
+    linhas = prof.folded().splitlines()
+    assert [linha.split(" ")[0] for linha in linhas] == ["a", "a;b"]
+    assert all(re.fullmatch(r"\S+ \d+", linha) for linha in linhas)
+
+
+def test_driver_profile(tmp_path, capsys):
+    fonte = tmp_path / "ok.sd"
+    fonte.write_text("function f(a) { return a + 1; }\n", encoding="utf-8")
+    saida = tmp_path / "perfil.json"
+    assert stardust.main([str(fonte), "-j", "1", "--profile", str(saida)]) == 0
+    fases = {f["phase"]: f for f in json.loads(saida.read_text(encoding="utf-8"))["phases"]}
+    assert {"warmup", "compile", "compile;lexer", "compile;parser", "compile;semantic",
+            "compile;codegen"} <= set(fases)
+    assert fases["compile;lexer"]["counters"]["lexer.tokens"] == 13
+
+    dobrado = tmp_path / "perfil.folded"
+    assert stardust.main([str(fonte), "-j", "1", "--profile", str(dobrado), "--profile-format", "folded"]) == 0
+    assert "compile;parser " in dobrado.read_text(encoding="utf-8")
+    capsys.readouterr()
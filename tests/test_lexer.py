@@ -0,0 +1,72 @@
+import io
+
+import pytest
+
+from Parser.stardust_ll1.lexer import INTERNER, iter_tokens, tokenize, tokenize_buffer
+
+FONTE = 'function f(x) { y = x + 1.5; s = "abc"; return y and true; }'
+
+
+def test_only_names_are_interned():
+    tokens = tokenize(FONTE)
+    visao = list(tokenize_buffer(FONTE))
+    assert [t.symbol for t in tokens] == [t.symbol for t in visao]
+    for token in tokens:
+        if token.type == "IDENT" or token.type == token.value:
+            assert INTERNER.name(token.symbol) == token.value
+        else:
+            assert token.symbol == -1
+    # 0 é o ID da palavra-chave and: um token que não é nome não pode usá-lo
+    assert [t.value for t in tokens if t.symbol == 0] == ["and"]
+
+
+def test_literals_and_punctuation_do_not_grow_the_interner():
+    [t.symbol for t in tokenize(FONTE)]
+    tamanho = len(INTERNER)
+    for i in range(50):
+        fonte = f'function f(x) {{ y = x + {i}.{i}; s = "texto {i}"; return y >= {i}; }}'
+        # o parser lê symbol de todo token que vira nó
+        [t.symbol for t in tokenize(fonte)]
+        [t.symbol for t in tokenize_buffer(fonte)]
+    assert len(INTERNER) == tamanho
+
+
+CHUNKED = ('function soma(a, b) {\n  total = a + 12.75 / 2;\n'
+           '  nome = "ação com acentos";\n  if (total <= b) { return total; }\n  return b;\n}\n')
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 64])
+def test_iter_tokens_across_chunk_boundaries(chunk_size):
+    esperado = tokenize(CHUNKED)
+    assert list(iter_tokens(io.StringIO(CHUNKED), chunk_size)) == esperado
+    # em bytes um caractere acentuado pode ficar dividido entre dois blocos
+    assert list(iter_tokens(io.BytesIO(CHUNKED.encode("utf-8")), chunk_size)) == esperado
+
+
+def test_iter_tokens_reads_a_path(tmp_path):
+    caminho = tmp_path / "f.sd"
+    caminho.write_text(CHUNKED, encoding="utf-8")
+    assert list(iter_tokens(caminho, 4)) == tokenize(CHUNKED)
+
+
+def test_token_buffer_matches_tokenize():
+    buf = tokenize_buffer(CHUNKED)
+    tokens = tokenize(CHUNKED)
+    assert len(buf) == len(tokens)
+    assert list(buf) == tokens
+    for i, token in enumerate(tokens):
+        assert (buf.type(i), buf.value(i)) == (token.type, token.value)
+    assert buf[-1].type == "EOF"
+    with pytest.raises(IndexError):
+        buf[len(buf)]
+
+
+def test_token_buffer_range_keeps_offsets_relative_to_the_text():
+    texto = "xx function f() { return 1; } yy"
+    inicio = texto.index("function")
+    fim = texto.index(" yy")
+    buf = tokenize_buffer(texto, inicio, fim, line=3, column=4)
+    assert [t.value for t in buf] == ["function", "f", "(", ")", "{", "return", "1", ";", "}", ""]
+    assert (buf[0].line, buf[0].column, buf[1].column) == (3, 4, 13)
+    assert texto[buf.starts[1]:buf.ends[1]] == "f"
+    assert buf.starts[-1] == fim
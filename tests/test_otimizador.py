@@ -0,0 +1,92 @@
+import pytest
+
+import stardust
+from Parser.stardust_ll1 import LL1Parser, instrumentation, tokenize_buffer
+from Parser.stardust_ll1.semantic import SemanticAnalyzer
+from codegen.contexto import contexto_padrao
+from codegen.gerador_codigo import GeradorCodigo
+from codegen.otimizador import NIVEIS, Otimizador, _contar_instrucoes
+
+FONTE = ("function f(n) {\n"
+         "  a = n * 2;\n"
+         "  b = a + 3;\n"
+         "  c = b - n;\n"
+         "  return c + a;\n"
+         "}\n")
+
+
+def _modulo():
+    programa = LL1Parser().parse_ast(tokenize_buffer(FONTE))
+    analisador = SemanticAnalyzer()
+    analisador.analyze(programa)
+    return GeradorCodigo(analisador=analisador).gerar_modulo(programa)
+
+
+def _f(modulo, n):
+    with contexto_padrao().jit(modulo) as programa:
+        return programa.funcao("f")(n)
+
+
+def test_unknown_level_or_pass():
+    with pytest.raises(ValueError, match="nível desconhecido"):
+        Otimizador("O4")
+    with pytest.raises(ValueError, match="passe desconhecido"):
+        Otimizador(passes=["sroa", "nao_existe"])
+
+
+@pytest.mark.parametrize("nivel", list(NIVEIS))
+@pytest.mark.parametrize("por_funcao", [False, True])
+def test_levels_keep_the_result(nivel, por_funcao):
+    modulo = Otimizador(nivel, por_funcao=por_funcao).otimizar_modulo(_modulo())
+    # f(n) = (2n + 3 - n) + 2n = 3n + 3
+    assert _f(modulo, 5) == 18
+    if nivel != "O0":
+        assert "alloca" not in str(modulo)
+
+
+def test_explicit_passes_count_instructions():
+    otimizador = Otimizador(passes=["sroa", "instcombine"], medir=True)
+    modulo = otimizador.otimizar_modulo(_modulo())
+    sroa, instcombine = otimizador.estatisticas["sroa"], otimizador.estatisticas["instcombine"]
+    assert sroa.execucoes == instcombine.execucoes == 1
+    assert sroa.delta < 0 and instcombine.antes == sroa.depois
+    assert instcombine.depois == _contar_instrucoes(modulo)
+    assert [linha.split()[0] for linha in otimizador.relatorio().splitlines()[1:]] == ["sroa", "instcombine"]
+    assert _f(modulo, 5) == 18
+
+
+def test_level_reports_each_llvm_pass():
+    otimizador = Otimizador("O2", medir=True)
+    otimizador.otimizar_modulo(_modulo())
+    etapa = otimizador.estatisticas["modulo:O2"]
+    internos = [e for e in otimizador.estatisticas.values() if e.etapa == "modulo:O2"]
+    assert etapa.execucoes == 1 and etapa.delta < 0
+    assert internos and all(i.execucoes >= 1 and i.segundos >= 0 for i in internos)
+    # os passes internos aparecem recuados sob a etapa
+    linhas = otimizador.relatorio().splitlines()
+    assert linhas[1].startswith("modulo:O2") and linhas[2].startswith("  ")
+
+
+def test_profiler_phases():
+    with instrumentation.profiling(instrumentation.Profiler(memory=False)) as perfil:
+        Otimizador("O1").otimizar_modulo(_modulo())
+    caminhos = {";".join(caminho) for caminho in perfil.stats}
+    assert {"optimizer", "optimizer;pass:modulo:O1"} <= caminhos
+    assert any(c.startswith("optimizer;pass:modulo:O1;") for c in caminhos)
+    assert perfil.stats[("optimizer",)].counters["optimizer.instructions_in"] > 0
+
+
+def test_driver_levels_and_passes(tmp_path, capsys):
+    fonte = tmp_path / "f.sd"
+    fonte.write_text(FONTE, encoding="utf-8")
+    sem, o2, passes = (tmp_path / nome for nome in ("sem", "o2", "passes"))
+    assert stardust.main([str(fonte), "-j", "1", "-o", str(sem)]) == 0
+    assert stardust.main([str(fonte), "-j", "1", "-O", "2", "-o", str(o2)]) == 0
+    assert stardust.main([str(fonte), "-j", "1", "--passes", "sroa,instcombine", "-o", str(passes)]) == 0
+    assert "alloca" in (sem / "f.ll").read_text(encoding="utf-8")
+    assert "alloca" not in (o2 / "f.ll").read_text(encoding="utf-8")
+    assert "alloca" not in (passes / "f.ll").read_text(encoding="utf-8")
+    with pytest.raises(SystemExit) as saida:
+        stardust.main([str(fonte), "--passes", "sroa,nao_existe"])
+    assert saida.value.code == 2
+    assert "passe desconhecido" in capsys.readouterr().err
@@ -0,0 +1,131 @@
+import gc
+import io
+import sys
+
+import pytest
+
+from Parser.stardust_ll1 import LL1Parser, tokenize, tokenize_buffer
+from Parser.stardust_ll1.ast_nodes import (
+    Assignment, BinaryExpr, ForStatement, Identifier, Literal, Parameter, ReturnStatement, UnaryExpr,
+)
+from Parser.stardust_ll1.lexer import INTERNER, iter_tokens
+from Parser.stardust_ll1.parser_table import ParseError
+from benchmarks.generator import SHAPES, generate
+
+FONTE = "function f(a) { if (a > 1) { b = a; } return a; }"
+
+
+def test_parse_leaves_gc_alone_by_default(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(gc, "disable", lambda: chamadas.append("disable"))
+    monkeypatch.setattr(gc, "enable", lambda: chamadas.append("enable"))
+    LL1Parser().parse_ast(tokenize_buffer(FONTE))
+    assert chamadas == []
+
+
+def test_pause_gc_restores_previous_state():
+    parser = LL1Parser(pause_gc=True)
+    parser.parse_ast(tokenize_buffer(FONTE))
+    assert gc.isenabled()
+    gc.disable()
+    try:
+        parser.parse_ast(tokenize_buffer(FONTE))
+        # quem desligou o coletor antes do parse continua dono dele
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def _parse_recursivo(parser, tokens):
+    """O driver recursivo de antes da tabela inteira: busca a produção por (A, tipo) e depois (A, lexema)."""
+    pos = 0
+
+    def nao_terminal(A):
+        nonlocal pos
+        tok = tokens[pos]
+        prod = parser.table.get((A, tok.type))
+        if prod is None:
+            prod = parser.table.get((A, tok.value))
+        if prod is None and tok.type == "EOF":
+            prod = parser.table.get((A, "$"))
+        if prod is None:
+            raise ParseError(f"sem produção para {A} com {tok.type}")
+        filhos = []
+        for X in prod:
+            if X == "ε":
+                continue
+            if X in parser.G:
+                filhos.append(nao_terminal(X))
+            else:
+                assert tokens[pos].type == X or tokens[pos].value == X
+                pos += 1
+                filhos.append((X,))
+        return [A, filhos]
+
+    return nao_terminal("Program")
+
+
+@pytest.mark.parametrize("forma", [f for f in SHAPES if f != "comments"])
+def test_table_driven_parser_matches_recursive_descent(forma):
+    parser = LL1Parser()
+    fonte = generate(forma, 15, 3)
+    tokens = tokenize(fonte)
+    esperado = _parse_recursivo(parser, tokens)
+    assert parser.parse(tokens) == esperado
+    assert parser.parse(tokenize_buffer(fonte)) == esperado
+    assert parser.parse(iter(tokens)) == esperado
+
+
+def test_explicit_stack_handles_deep_nesting():
+    profundidade = sys.getrecursionlimit() * 2
+    fonte = "function f(a) { " + "if (a) { " * profundidade + "a = 1;" + " }" * profundidade + " return a; }"
+    parser = LL1Parser()
+    # o driver recursivo estouraria a pilha do Python aqui
+    assert parser.parse(tokenize_buffer(fonte))[0] == "Program"
+    programa = parser.parse_ast(tokenize_buffer(fonte))
+    corpo = programa.functions[0].body
+    for _ in range(profundidade):
+        corpo = corpo[0].then_body
+    assert corpo[0].name == "a"
+
+
+@pytest.mark.parametrize("fonte, trecho", [
+    ("function f( { }", "token '{'"),
+    ("function f() { return 1 }", "token '}'"),
+    ("function f() { x = ; }", "token ';'"),
+])
+def test_syntax_errors(fonte, trecho):
+    with pytest.raises(ParseError, match=trecho):
+        LL1Parser().parse(tokenize(fonte))
+
+
+def test_parse_ast_builds_the_nodes():
+    fonte = ("function f(a, b) {\n"
+             "  x = a - b - 1;\n"
+             '  if (x > 0) { return -x; } elsif (x == 0) { y = "oi"; } else { z = 2.5; }\n'
+             "  for (; a < 3; ) { a = a + 1; }\n"
+             "  return null;\n"
+             "}")
+    func = LL1Parser().parse_ast(tokenize_buffer(fonte)).functions[0]
+    assert (func.name, func.line, func.column) == ("f", 1, 1)
+    assert func.params == [Parameter(1, 12, "a"), Parameter(1, 15, "b")]
+    atrib, se, para, ret = func.body
+    # subtração associa à esquerda: (a - b) - 1
+    assert atrib == Assignment(2, 3, "x", BinaryExpr(2, 7, BinaryExpr(2, 7, Identifier(2, 7, "a"), "-",
+                                                                      Identifier(2, 11, "b")),
+                                                     "-", Literal(2, 15, 1)))
+    assert se.then_body == [ReturnStatement(3, 16, UnaryExpr(3, 23, "-", Identifier(3, 24, "x")))]
+    assert se.elsifs[0].body == [Assignment(3, 46, "y", Literal(3, 50, "oi"))]
+    assert se.else_body == [Assignment(3, 65, "z", Literal(3, 69, 2.5))]
+    assert isinstance(para, ForStatement) and para.init is None and para.update is None
+    assert ret == ReturnStatement(5, 3, Literal(5, 10, None))
+    # o symbol dos nós com nome é o ID do nome no INTERNER
+    assert INTERNER.name(atrib.symbol) == "x" and atrib.expression.left.left.symbol == func.params[0].symbol
+
+
+def test_parse_ast_is_the_same_from_every_token_source():
+    fonte = generate("if_chain", 10, 1)
+    parser = LL1Parser()
+    esperado = parser.parse_ast(tokenize_buffer(fonte))
+    assert parser.parse_ast(tokenize(fonte)) == esperado
+    assert parser.parse_ast(iter_tokens(io.StringIO(fonte), 16)) == esperado
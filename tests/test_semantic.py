@@ -0,0 +1,77 @@
+import pickle
+import re
+
+from Parser.stardust_ll1 import LL1Parser, CompilationSession, tokenize_buffer
+from Parser.stardust_ll1.lexer import INTERNER
+from Parser.stardust_ll1.semantic import SemanticAnalyzer, TypeVar
+from benchmarks.generator import generate
+
+SOURCE = generate("functions", 20, 0) + "function id(x) { return x; }\n"
+
+
+def test_repeated_analyses_do_not_grow_the_store():
+    program = LL1Parser().parse_ast(tokenize_buffer(SOURCE))
+    sizes, reprs = set(), set()
+    analyzer = SemanticAnalyzer()
+    for _ in range(20):
+        analyzer.analyze(program)
+        sizes.add(len(analyzer.store.vars))
+        reprs.add(repr(analyzer.global_sym.lookup(program.functions[-1].symbol).type))
+    for _ in range(20):
+        fresh = SemanticAnalyzer()
+        fresh.analyze(program)
+        sizes.add(len(fresh.store.vars))
+    assert len(sizes) == 1
+    # os nomes das variáveis de tipo não dependem das análises anteriores
+    assert len(reprs) == 1
+
+
+def test_session_updates_do_not_grow_the_store():
+    session = CompilationSession()
+    reprs = set()
+    for i in range(30):
+        program = session.update(SOURCE + " " * (i % 2))
+        if i == 0:
+            # a primeira análise é completa; as seguintes reaproveitam o cache
+            continue
+        reprs.add(repr(session.global_sym.lookup(program.functions[-1].symbol).type))
+    # os ids das variáveis de tipo recomeçam a cada análise
+    assert len(reprs) == 1
+
+
+def test_types_leaving_the_analysis_do_not_hold_the_store():
+    program = LL1Parser().parse_ast(tokenize_buffer(SOURCE))
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(program)
+    ftype = analyzer.global_sym.lookup(program.functions[-1].symbol).type
+    tv = ftype.return_type
+    assert isinstance(tv, TypeVar) and tv is ftype.param_types[0]
+    assert not hasattr(tv, "store")
+    assert len(pickle.dumps(ftype)) < 200
+
+
+def _normalized(analyzer, program):
+    # os ids das variáveis de tipo dependem da ordem de criação; renomeia pela ordem de aparição
+    names = {}
+    def rename(match):
+        return names.setdefault(match.group(0), f"t{len(names)}")
+    text = repr([(func.name, analyzer.global_sym.lookup(func.symbol).type,
+                  sorted((INTERNER.name(symbol), t) for symbol, t in analyzer.local_types(func).items()))
+                 for func in program.functions])
+    return re.sub(r"\bt\d+\b", rename, text)
+
+
+def test_parallel_inference_matches_sequential():
+    fonte = (generate("functions", 12, 3)
+             + "function ruim(a) { x = 1; x = \"s\"; y = a - \"t\"; return a; }\n"
+             + "function id(x) { return x; }\n"
+             + "function outra(b) { if (b) { return 1; } return 2.5; }\n")
+    program = LL1Parser().parse_ast(tokenize_buffer(fonte))
+    sequential = SemanticAnalyzer()
+    sequential.analyze(program)
+    # min_parallel=2 e dois processos obrigam o uso do pool mesmo com poucas funções
+    parallel = SemanticAnalyzer(parallel=True, max_workers=2, min_parallel=2)
+    parallel.analyze(program)
+    assert parallel._use_pool()
+    assert sequential.errors and parallel.errors == sequential.errors
+    assert _normalized(parallel, program) == _normalized(sequential, program)
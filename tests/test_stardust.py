@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import stardust
+from Parser.stardust_ll1 import LL1Parser
+
+FONTES = {
+    "ok.sd": "function f(a) { return a + 1; }\n",
+    "sintaxe.sd": "function f( { }\n",
+    "lexico.sd": "function f() { x = 1 @ 2; }\n",
+    "semantico.sd": 'function f() { x = 1; x = "s"; }\n',
+    "codegen.sd": 'function f() { x = "a" * 2; return x; }\n',
+}
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    for nome, fonte in FONTES.items():
+        (tmp_path / nome).write_text(fonte, encoding="utf-8")
+    (tmp_path / "leiame.txt").write_text("não é .sd", encoding="utf-8")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / "outro.sd").write_text(FONTES["ok.sd"], encoding="utf-8")
+    return tmp_path
+
+
+def _por_nome(resultados):
+    return {os.path.basename(r.path): r for r in resultados}
+
+
+def test_find_sources_expands_folders_in_order(pasta):
+    fontes = stardust.find_sources([str(pasta), "solto.sd"])
+    assert [os.path.relpath(p, pasta) for p in fontes[:-1]] == sorted(FONTES) + [os.path.join("sub", "outro.sd")]
+    assert fontes[-1] == "solto.sd"
+
+
+def test_each_stage_reports_its_own_errors(pasta):
+    resultados = _por_nome(stardust.compile_paths([str(pasta), str(pasta / "falta.sd")], jobs=1))
+    assert resultados["ok.sd"].ok and 'define i32 @"f"(i32 %"a")' in resultados["ok.sd"].ir
+    assert resultados["sintaxe.sd"].errors[0].startswith("Erro de sintaxe")
+    assert resultados["lexico.sd"].errors == ["Caractere inesperado '@' na linha 1"]
+    assert resultados["semantico.sd"].errors[0].startswith("Type mismatch")
+    assert resultados["codegen.sd"].errors[0].startswith("codegen: ")
+    assert "No such file" in resultados["falta.sd"].errors[0]
+    for nome in ("sintaxe.sd", "lexico.sd", "semantico.sd", "codegen.sd", "falta.sd"):
+        assert resultados[nome].ir is None
+
+
+def test_pool_gives_the_same_results(pasta):
+    parser = LL1Parser()
+    sequencial = _por_nome(stardust.compile_paths([str(pasta)], jobs=1, parser=parser))
+    pool = _por_nome(stardust.compile_paths([str(pasta)], jobs=2, parser=parser))
+    assert {n: (r.errors, r.ir) for n, r in pool.items()} == {n: (r.errors, r.ir) for n, r in sequencial.items()}
+
+
+def test_out_dir_gets_one_ll_per_compiled_file(pasta, tmp_path_factory):
+    saida = tmp_path_factory.mktemp("saida") / "ll"
+    resultados = _por_nome(stardust.compile_paths([str(pasta)], jobs=1, out_dir=str(saida)))
+    assert sorted(os.listdir(saida)) == ["ok.ll", "outro.ll"]
+    assert (saida / "ok.ll").read_text(encoding="utf-8") == resultados["ok.sd"].ir
+
+
+def test_main_exit_code_and_diagnostics(pasta, tmp_path_factory, capsys):
+    saida = tmp_path_factory.mktemp("saida")
+    assert stardust.main([str(pasta / "ok.sd"), "-j", "1", "-o", str(saida)]) == 0
+    assert capsys.readouterr().out.splitlines()[-1].startswith("1 arquivo(s), 0 com erro")
+    assert (saida / "ok.ll").exists()
+
+    assert stardust.main([str(pasta), "-j", "1"]) == 1
+    capturado = capsys.readouterr()
+    assert capturado.out.splitlines()[-1].startswith("6 arquivo(s), 4 com erro")
+    assert f"{pasta / 'codegen.sd'}: erro: codegen: " in capturado.err
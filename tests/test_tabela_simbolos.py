@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from Parser.analisador.tabela_simbolos import TabelaSimbolos
+
+ANALISADOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Parser", "analisador")
+
+
+def test_legacy_analyzer_imports_from_its_own_directory():
+    # analisador_semantico usa imports planos: roda de dentro da pasta, sem a raiz no sys.path
+    resultado = subprocess.run([sys.executable, "-c", "import analisador_semantico"],
+                               cwd=ANALISADOR, capture_output=True, text=True,
+                               env={**os.environ, "PYTHONPATH": ""})
+    assert resultado.returncode == 0, resultado.stderr
+
+
+def test_scopes_shadow_and_restore():
+    tabela = TabelaSimbolos()
+    assert tabela.declarar("x", "int", 1)
+    assert not tabela.declarar("x", "float", 2)
+    tabela.entrar_escopo()
+    assert tabela.declarar("x", "string", 3)
+    assert tabela.buscar("x").tipo == "string"
+    assert [s.tipo for s in tabela.obter_todos_simbolos()] == ["int", "string"]
+    tabela.sair_escopo()
+    assert tabela.buscar("x").tipo == "int"
+    assert tabela.buscar_no_escopo_atual("y") is None
+    # sair do escopo global não faz nada
+    tabela.sair_escopo()
+    assert tabela.buscar("x") is not None
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from Parser.stardust_ll1 import table_cache
+from Parser.stardust_ll1.grammar import make_grammar, build_table
+
+LEXER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Lexer")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("STARDUST_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _contando(build):
+    chamadas = []
+    def contado(spec):
+        chamadas.append(spec)
+        return build(spec)
+    return contado, chamadas
+
+
+def test_ll1_table_is_built_once(cache):
+    G = make_grammar()
+    build, chamadas = _contando(build_table)
+    primeira = table_cache.load_or_build(G, build)
+    segunda = table_cache.load_or_build(G, build)
+    assert len(chamadas) == 1
+    assert segunda == primeira == build_table(G)
+    assert [p.name for p in cache.iterdir()] == [f"ll1-{table_cache.spec_hash(G)}.bin"]
+
+
+def test_ll1_grammar_change_invalidates(cache):
+    G = make_grammar()
+    build, chamadas = _contando(build_table)
+    table_cache.load_or_build(G, build)
+    # uma produção nova muda a chave
+    G["Extra"] = [["IDENT"]]
+    assert table_cache.spec_hash(G) != table_cache.spec_hash(make_grammar())
+    table_cache.load_or_build(G, build)
+    assert len(chamadas) == 2
+
+
+def test_ll1_corrupt_file_is_rebuilt(cache):
+    G = make_grammar()
+    build, chamadas = _contando(build_table)
+    table_cache.load_or_build(G, build)
+    (cache / f"ll1-{table_cache.spec_hash(G)}.bin").write_bytes(b"\x00lixo")
+    assert table_cache.load_or_build(G, build) == build_table(G)
+    assert len(chamadas) == 2
+
+
+def test_ll1_unwritable_cache_falls_back_to_memory(tmp_path, monkeypatch):
+    arquivo = tmp_path / "arquivo"
+    arquivo.write_text("")
+    # um arquivo no lugar do diretório: makedirs falha e a tabela sai da memória
+    monkeypatch.setenv("STARDUST_CACHE_DIR", str(arquivo / "cache"))
+    G = make_grammar()
+    assert table_cache.load_or_build(G, build_table) == build_table(G)
+
+
+def test_lexer_dfa_round_trip_and_invalidation(cache, monkeypatch):
+    monkeypatch.syspath_prepend(LEXER_DIR)
+    import afd_cache
+    from afn_to_afd import AFN, afn_to_afd, combine_afns
+    from afns_definicao import AFNS
+
+    def build(afns):
+        return afn_to_afd(combine_afns(afns), compiled=True)
+
+    build, chamadas = _contando(build)
+    novo = afd_cache.load_or_build(AFNS, build)
+    lido = afd_cache.load_or_build(AFNS, build)
+    assert len(chamadas) == 1
+    assert lido is not novo
+    assert (lido.table, lido.kinds, lido.finals, lido.class_of) == (novo.table, novo.kinds, novo.finals, novo.class_of)
+    assert lido.match("abc = 1", 0) == novo.match("abc = 1", 0) == ("IDENT", 3)
+
+    # outro conjunto de AFNs tem outra chave: o AFD antigo nunca é lido
+    hash_ = AFN(["q0", "q1"], ["#"], {("q0", "#"): {"q1"}}, "q0", {"q1"})
+    afd_cache.load_or_build({**AFNS, "HASH": hash_}, build)
+    assert len(chamadas) == 2